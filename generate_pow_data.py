@@ -10,6 +10,8 @@ sys.path.append(os.getcwd())
 from src.synthetic_generator import SyntheticGenerator
 from src.signal_extractor import SignalExtractor
 from src.scoring_engine import MLScorer, LabelGenerator
+from src.data_store import get_store
+from src.artifact_store import get_artifact_store, row_stamp
 
 def generate_demo_user():
     print("Generating POW Demo User (Generic)...")
@@ -59,16 +61,12 @@ def generate_demo_user():
     # Save
     df = pd.DataFrame([record])
     
-    csv_path = "scored_data.csv"
-    if os.path.exists(csv_path):
-        existing = pd.read_csv(csv_path)
-        # Remove old POW user if exists
-        existing = existing[existing['customer_id'] != "POW-GENERIC-001"]
-        updated = pd.concat([existing, df], ignore_index=True)
-    else:
-        updated = df
-        
-    updated.to_csv(csv_path, index=False)
+    # Appended rows replace any older row with the same customer_id (the old POW user)
+    store = get_store()
+    store.append(df)
+    
+    # Ledger + typed signals for the Scorecard
+    get_artifact_store(store).save(profile['customer_id'], txns_df, signals, stamp=row_stamp(record))
     print(f"Success! Generated user {name} (ID: POW-GENERIC-001)")
     print("Signals keys:", signals.keys())
     
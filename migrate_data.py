@@ -1,36 +1,271 @@
-import pandas as pd
 import sys
 import os
+import time
+import argparse
+import pandas as pd
+import numpy as np
+
+# Add project root to path
+sys.path.append(os.getcwd())
+
+from src.scoring_engine import MLScorer, LabelGenerator, score_population
+from src.signal_vector import FEATURE_COLUMNS
+from src.data_store import get_store
+from src.artifact_store import get_artifact_store, rescore_from_artifacts, row_stamps
+
+# Columns (re)written by a migration
+SCORE_COLUMNS = ['credit_score', 'risk_band', 'stability_score', 'discipline_score', 'volatility_score']
+
+# Legacy bank aggregates (e.g. bank_aggregated_features_fixed.csv) -> scoring signals.
+# Signals with no legacy counterpart (income_volatility, cash_surplus_stability,
+# risky_spend_ratio) are imputed, see impute_signals.
+LEGACY_SIGNALS = {
+    'avg_monthly_inflow': 'average_monthly_account_credit',
+    'avg_monthly_outflow': 'average_monthly_account_debit',
+    'bill_miss_count': 'missed_utility_bill_count'
+}
+
+def derive_signals(df):
+    """
+    Fills signals that are missing (absent or NaN) from the legacy bank aggregates, in place.
+
+    Returns:
+        list: the signal columns that were derived
+    """
+    def legacy(col):
+        return pd.to_numeric(df[col], errors='coerce') if col in df.columns else None
+
+    derived = {signal: legacy(col) for signal, col in LEGACY_SIGNALS.items() if col in df.columns}
+    credit, debit = legacy('average_monthly_account_credit'), legacy('average_monthly_account_debit')
+    if credit is not None and debit is not None:
+        derived['net_cash_retention_ratio'] = ((credit - debit) / credit.where(credit > 0)).fillna(0)
+
+    filled = []
+    for signal, values in derived.items():
+        if signal not in df.columns:
+            df[signal] = values
+        elif df[signal].isna().any():
+            df[signal] = pd.to_numeric(df[signal], errors='coerce').fillna(values)
+        else:
+            continue
+        filled.append(signal)
+    return filled
+
+# Publishing is refused if any signal was observed (present or derived) for fewer rows than this
+MIN_SIGNAL_COVERAGE = 0.5
+
+def signal_coverage(df):
+    """
+    Returns:
+        dict: {signal: share of rows with an observed (finite) value}
+    """
+    coverage = {}
+    for signal in FEATURE_COLUMNS:
+        if signal in df.columns and len(df):
+            coverage[signal] = float(np.isfinite(pd.to_numeric(df[signal], errors='coerce').to_numpy(dtype=np.float64)).mean())
+        else:
+            coverage[signal] = 0.0
+    return coverage
+
+def impute_signals(df, reference=None):
+    """
+    Fills signals that no row has (e.g. income_volatility in the legacy bank file) with the reference
+    population's median, in place. The scorer defaults for missing signals are worst cases
+    (income_volatility 1.0, cash_surplus_stability 0) and would push every row into High Risk.
+    Signals missing for only some rows are left alone (those rows get the fallback score).
+
+    Returns:
+        dict: {signal: imputed value}
+    """
+    imputed = {}
+    if reference is None:
+        return imputed
+    for signal in FEATURE_COLUMNS:
+        observed = signal in df.columns and pd.to_numeric(df[signal], errors='coerce').notna().any()
+        if observed or signal not in reference.columns:
+            continue
+        median = pd.to_numeric(reference[signal], errors='coerce').median()
+        if pd.notna(median):
+            df[signal] = float(median)
+            imputed[signal] = float(median)
+    return imputed
+
+def score_drift(previous, scored):
+    """
+    Compares the new scores against the ones the population was stored with.
 
-# Ensure src is in path
-sys.path.append(os.path.join(os.getcwd(), 'src'))
-
-from src.scoring_engine import CreditScorer
-
-def migrate():
-    print("Loading merged data...")
-    try:
-        # Try to load merged data first
-        df = pd.read_csv("merged_full_data.csv")
-    except FileNotFoundError:
-        print("merged_full_data.csv not found. Trying scored_data.csv...")
-        try:
-            df = pd.read_csv("scored_data.csv")
-            # If we load scored_data, we might have old score columns. 
-            # CreditScorer.score_population handles dropping them usually, but being explicit is good.
-        except FileNotFoundError:
-            print("No data found to migrate.")
-            return
-
-    print(f"Data loaded: {len(df)} rows.")
-    
-    print("Applying new 3-Pillar Scoring Logic...")
-    scorer = CreditScorer()
-    new_scored_df = scorer.score_population(df)
-    
-    print("Saving to scored_data.csv...")
-    new_scored_df.to_csv("scored_data.csv", index=False)
-    print("Migration complete.")
+    Returns:
+        dict or None (no previous scores)
+    """
+    if 'credit_score' not in previous.columns:
+        return None
+    old = pd.to_numeric(previous['credit_score'], errors='coerce').to_numpy(dtype=np.float64)
+    new = scored['credit_score'].to_numpy(dtype=np.float64)
+    known = np.isfinite(old)
+    if not known.any():
+        return None
+
+    delta = new[known] - old[known]
+    drift = {
+        'compared': int(known.sum()),
+        'old_mean': float(old[known].mean()),
+        'new_mean': float(new[known].mean()),
+        'mean_delta': float(delta.mean()),
+        'mean_abs_delta': float(np.abs(delta).mean()),
+        'p95_abs_delta': float(np.percentile(np.abs(delta), 95)),
+        'max_abs_delta': float(np.abs(delta).max()),
+        'changed': int((delta != 0).sum())
+    }
+    if 'risk_band' in previous.columns:
+        drift['band_changes'] = int((previous['risk_band'].to_numpy()[known] != scored['risk_band'].to_numpy()[known]).sum())
+    return drift
+
+def apply_rescored(scored, rescored):
+    """
+    Overwrites the rows of scored whose customer is in rescored (signals and scores), in place.
+
+    Returns:
+        int: rows replaced
+    """
+    rows = pd.Index(rescored['customer_id'].astype(str)).get_indexer(scored['customer_id'].astype(str))
+    hit = rows >= 0
+    if not hit.any():
+        return 0
+    for col in rescored.columns.drop('customer_id'):
+        values = pd.Series(rescored[col].to_numpy()[np.where(hit, rows, 0)], index=scored.index)
+        scored[col] = scored[col].mask(hit, values) if col in scored.columns else values.where(hit)
+    return int(hit.sum())
+
+def migrate(input_path=None, backend=None, publish=False, scorer=None, labeler=None, artifacts=None,
+            allow_imputed=False, store=None):
+    """
+    Re-scores the stored population (or a population CSV) and writes it as a new versioned table
+    next to the source: <name>.v<timestamp>-<model version>.<ext>. The stored population is
+    replaced only if publish is set, and then only if every signal was observed for at least
+    MIN_SIGNAL_COVERAGE of the rows (unless allow_imputed).
+
+    Signals a CSV lacks entirely are imputed with the stored population's medians.
+
+    Customers with a stored ledger built for their current row (artifact store, see
+    regenerate_full_population.py --artifacts) are re-extracted from it; everyone else is
+    re-scored from their stored signals.
+
+    Returns:
+        dict: rows, output path, timings (seconds), rows/sec and score drift
+    """
+    scorer = scorer or MLScorer()
+    labeler = labeler or LabelGenerator()
+
+    start = time.perf_counter()
+    store = store or get_store(backend)
+    if artifacts is None and os.path.isdir(os.path.join(os.path.dirname(store.path), "artifacts")):
+        artifacts = get_artifact_store(store)
+    if input_path:
+        df = pd.read_csv(input_path)
+        root, name = os.path.split(os.path.abspath(input_path))
+        name = os.path.splitext(name)[0]
+        reference = store.read(columns=['customer_id'] + FEATURE_COLUMNS) if store.exists() else None
+    else:
+        if not store.exists():
+            return None
+        df = store.read()
+        root, name = os.path.split(os.path.splitext(store.path)[0])
+        reference = df
+    load_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    derived = derive_signals(df)
+    coverage = signal_coverage(df)
+    imputed = impute_signals(df, reference)
+    scores = score_population(df, scorer, labeler)
+    scored = df.copy()
+    for col in SCORE_COLUMNS:
+        scored[col] = scores[col].to_numpy()
+    from_ledgers = 0
+    if artifacts is not None:
+        # Only ledgers stamped for these very rows (a reused id may hold someone else's)
+        stamps = row_stamps(scored)
+        stored = [(cid, stamp) for cid, stamp in zip(scored['customer_id'], stamps) if artifacts.has(cid, stamp)]
+        if stored:
+            ids, stamps = zip(*stored)
+            from_ledgers = apply_rescored(scored, rescore_from_artifacts(list(ids), artifacts, scorer=scorer,
+                                                                         labeler=labeler, stamps=list(stamps)))
+    score_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    model_version = (scorer.model_info or {}).get('version') or "rules"
+    version = f"v{time.strftime('%Y%m%d-%H%M%S')}-{model_version}"
+    output = get_store(backend or store.backend, root=root, name=f"{name}.{version}")
+    output.write(scored)
+    sparse = [signal for signal, share in coverage.items() if share < MIN_SIGNAL_COVERAGE]
+    published = publish and (allow_imputed or not sparse)
+    if published:
+        store.write(scored)
+    write_seconds = time.perf_counter() - start
+
+    total_seconds = load_seconds + score_seconds + write_seconds
+    return {
+        'rows': len(scored),
+        'version': version,
+        'output': output.path,
+        'derived_signals': derived,
+        'imputed_signals': imputed,
+        'coverage': coverage,
+        'sparse_signals': sparse,
+        'published': published,
+        'from_ledgers': from_ledgers,
+        'fallback_rows': int((~scores['model_used']).sum()) if scorer.model else 0,
+        'load_seconds': load_seconds,
+        'score_seconds': score_seconds,
+        'write_seconds': write_seconds,
+        'rows_per_sec': len(scored) / max(score_seconds, 1e-9),
+        'total_rows_per_sec': len(scored) / max(total_seconds, 1e-9),
+        'drift': score_drift(df, scored)
+    }
 
 if __name__ == "__main__":
-    migrate()
+    parser = argparse.ArgumentParser(description="Re-score the whole population with the current model and rules.")
+    parser.add_argument("--input", metavar="CSV", help="Population CSV to re-score instead of the stored population "
+                                                       "(e.g. bank_aggregated_features_fixed.csv)")
+    parser.add_argument("--backend", default=None, help="Store backend (defaults to HELIX_STORE, else csv)")
+    parser.add_argument("--publish", action="store_true", help="Also replace the stored population with the result")
+    parser.add_argument("--allow-imputed", action="store_true",
+                        help="Publish even if some signals were missing for most rows (imputed or defaulted)")
+    cli_args = parser.parse_args()
+
+    print("Applying 3-Pillar Scoring Logic to the population...")
+    result = migrate(cli_args.input, cli_args.backend, cli_args.publish, allow_imputed=cli_args.allow_imputed)
+    if result is None:
+        print("❌ No data found to migrate.")
+        sys.exit(1)
+
+    print(f"✅ Re-scored {result['rows']} rows as {result['version']} -> {result['output']}")
+    if result['derived_signals']:
+        print(f"ℹ️ Derived from legacy aggregates: {', '.join(result['derived_signals'])}")
+    if result['imputed_signals']:
+        print("ℹ️ Imputed with the stored population's medians: " +
+              ", ".join(f"{signal}={value:.4g}" for signal, value in result['imputed_signals'].items()))
+    if result['sparse_signals']:
+        print("⚠️ Signals observed for under {:.0%} of rows: {}".format(MIN_SIGNAL_COVERAGE, ", ".join(
+            f"{signal} ({result['coverage'][signal]:.0%})" for signal in result['sparse_signals'])))
+    if result['from_ledgers']:
+        print(f"📒 {result['from_ledgers']} customers re-extracted from their stored ledgers.")
+    if result['fallback_rows']:
+        print(f"⚠️ {result['fallback_rows']} rows had incomplete signals and got the fallback score.")
+    print(f"⚡ Scoring: {result['score_seconds'] * 1000:.1f} ms ({result['rows_per_sec']:,.0f} rows/sec) | "
+          f"load {result['load_seconds'] * 1000:.1f} ms, write {result['write_seconds'] * 1000:.1f} ms | "
+          f"end to end {result['total_rows_per_sec']:,.0f} rows/sec")
+
+    drift = result['drift']
+    if drift is None:
+        print("📊 Score drift: no previous scores to compare against.")
+    else:
+        print(f"📊 Score drift over {drift['compared']} rows: mean {drift['old_mean']:.1f} -> {drift['new_mean']:.1f} "
+              f"({drift['mean_delta']:+.1f}), |delta| mean {drift['mean_abs_delta']:.1f}, "
+              f"p95 {drift['p95_abs_delta']:.1f}, max {drift['max_abs_delta']:.0f}; "
+              f"{drift['changed']} scores changed" +
+              (f", {drift['band_changes']} risk bands changed" if 'band_changes' in drift else ""))
+    if result['published']:
+        print("💾 Published to the stored population.")
+    elif cli_args.publish:
+        print("❌ Not published: scores rest on imputed/default signals (use --allow-imputed to publish anyway).")
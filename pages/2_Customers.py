@@ -1,6 +1,5 @@
 import streamlit as st
 import pandas as pd
-import numpy as np
 
 st.set_page_config(layout="wide", page_title="Helix: Customers", page_icon="👥")
 
@@ -20,26 +19,47 @@ keep_alive()
 
 # --- Logic ---
 
-# @st.cache_data  <-- Removing cache to ensure real-time updates
+@st.cache_resource(show_spinner=False, max_entries=2)
+def load_customer_table(data_version):
+    """
+    Ready-to-display Customers table, shared by every session.
+    Keyed on the store's change token, so any write (new application, regeneration) invalidates it.
+    Treat the returned frame as read-only.
+    """
+    from src.customer_directory import load_customer_list
+    return load_customer_list()
+
+@st.cache_resource(show_spinner=False, max_entries=2)
+def load_search_index(data_version):
+    """
+    Search index over the cached Customers table (rebuilt with it).
+    """
+    from src.search_index import CustomerSearchIndex
+    return CustomerSearchIndex(load_customer_table(data_version))
+
+@st.cache_resource(show_spinner=False, max_entries=2)
+def load_pager(data_version):
+    """
+    Pages/sorts the cached Customers table (sort ranks are kept per version).
+    """
+    from src.customer_directory import CustomerPager
+    return CustomerPager(load_customer_table(data_version))
+
 def load_data():
     try:
-        # Load from the scored data artifact
-        # construct path dynamically to be safe
-        from pathlib import Path
-        import os
+        # Scored data store (CSV or Parquet, see src/data_store.py)
+        from src.data_store import get_store
         
-        # Robustly find the project root (one level up from pages/)
-        project_root = Path(__file__).parent.parent
-        data_path = project_root / "scored_data.csv"
-        
-        if not data_path.exists():
+        store = get_store()
+        if not store.exists():
              raise ValueError("File not found")
              
-        df = pd.read_csv(data_path)
+        # Only a stat() per rerun - the table itself comes from the cache
+        version = store.version()
+        df = load_customer_table(version)
         if df.empty:
             raise ValueError("Empty CSV")
-        sorted_df = df.sort_values(by='customer_id', ascending=True)
-        return sorted_df
+        return df, load_search_index(version), load_pager(version)
     except Exception as e:
         st.toast(f"Using Mock Data: {str(e)}", icon="⚠️")
         # Generate MOCK DATA for Demo
@@ -47,9 +67,12 @@ def load_data():
             {'customer_id': 'CUST-001', 'customer_name': 'Rajesh Kumar', 'employment_type': 'Salaried', 'declared_monthly_income': 85000, 'risk_band': 'Low Risk', 'credit_score': 780},
             {'customer_id': 'CUST-002', 'customer_name': 'Sneha Gupta', 'employment_type': 'Self_Employed', 'declared_monthly_income': 120000, 'risk_band': 'Low Risk', 'credit_score': 765},
         ]
-        return pd.DataFrame(mock_data)
+        from src.customer_directory import prepare_customer_list, CustomerPager
+        from src.search_index import CustomerSearchIndex
+        mock_df = prepare_customer_list(pd.DataFrame(mock_data))
+        return mock_df, CustomerSearchIndex(mock_df), CustomerPager(mock_df)
 
-df = load_data()
+df, search_index, pager = load_data()
 
 # --- Header ---
 c1, c2 = st.columns([3, 1])
@@ -63,48 +86,46 @@ with c2:
 st.divider()
 
 # --- Customer Filter ---
-search = st.text_input("Search by Name or ID", placeholder="Search...")
+search = st.text_input("Search by Name or ID", placeholder='Search... (or filter: employment:Gig band:"High Risk")')
 
 if not df.empty:
-    # 1. Backfill Names if missing
-    if 'customer_name' not in df.columns:
-        df['customer_name'] = np.nan
-        
-    demo_names = [
-        "Aarav", "Vivaan", "Aditya", "Vihaan", "Arjun", "Sai", "Reyansh", "Ayaan", "Krishna", 
-        "Ishaan", "Diya", "Saanvi", "Anya", "Aadhya", "Pari", "Ananya", "Myra", "Rohan", 
-        "Vikram", "Suresh", "Priya", "Rahul", "Neha", "Amit", "Sneha", "Rajesh", "Pooja", 
-        "Ankit", "Meera", "Varun", "Karan", "Simran", "Deepak", "Kavita"
-    ]
-    def assign_demo_name(row):
-        val = row['customer_name']
-        if pd.isna(val) or str(val).lower() in ['nan', 'n/a', 'none']:
-            idx = hash(str(row['customer_id'])) % len(demo_names)
-            return demo_names[idx]
-        return val
-
-    df['customer_name'] = df.apply(assign_demo_name, axis=1)
-
-    # 2. Filter
-    if search:
-        mask = df.astype(str).apply(lambda x: x.str.contains(search, case=False)).any(axis=1)
-        filtered_df = df[mask].copy()
-    else:
-        filtered_df = df.copy()
-        
-    # Styling the dataframe (Native Streamlit Table handles Dark Mode well)
+    # 1. Names are backfilled by the data layer (src/customer_directory.py)
+
+    # 2. Filter (row positions from the search index - nothing is copied yet)
+    # Index lookup over ID/name plus field filters (see src/search_index.py)
+    positions = search_index.search(search) if search else None
+    
+    # 3. Sort + paginate: only the current page is sent to the browser
+    from src.customer_directory import SORT_COLUMNS
+    col_sort, col_order, col_size, col_page = st.columns([2, 1, 1, 1])
+    with col_sort:
+        sort_label = st.selectbox("Sort by", list(SORT_COLUMNS))
+    with col_order:
+        descending = st.toggle("Descending", value=False)
+    with col_size:
+        page_size = st.selectbox("Rows per page", [25, 50, 100])
+    total = len(df) if positions is None else len(positions)
+    n_pages = max(-(-total // page_size), 1)
+    with col_page:
+        # Fresh search -> back to page 1
+        if st.session_state.get('customers_last_search') != search:
+            st.session_state['customers_last_search'] = search
+            st.session_state['customers_page'] = 1
+        # Keep the page in range when the page size changes
+        st.session_state['customers_page'] = min(st.session_state.get('customers_page', 1), n_pages)
+        page = st.number_input("Page", min_value=1, max_value=n_pages, step=1, key='customers_page')
+    
+    page_df, total, page = pager.page(positions, sort_by=SORT_COLUMNS[sort_label], ascending=not descending,
+                                      page=page, page_size=page_size)
+    
     # Styling the dataframe (Native Streamlit Table handles Dark Mode well)
-    # Check for verification flag
-    if 'docs_verified_flag' not in filtered_df.columns:
-        filtered_df['docs_verified_flag'] = False
-        
-    filtered_df['status'] = filtered_df['docs_verified_flag'].apply(lambda x: "✅ Verified" if x == True else "⚠️ Pending")
+    # (Docs status column comes from the data layer)
     
-    # 3. Verified Filter (Removed per user request - Show All)
+    # 4. Verified Filter (Removed per user request - Show All)
     # filtered_df = filtered_df # No filter applied
     
     st.dataframe(
-        filtered_df[['customer_id', 'customer_name', 'employment_type', 'declared_monthly_income', 'status', 'risk_band', 'credit_score']],
+        page_df[['customer_id', 'customer_name', 'employment_type', 'declared_monthly_income', 'status', 'risk_band', 'credit_score']],
         use_container_width=True,
         hide_index=True,
         column_config={
@@ -117,18 +138,21 @@ if not df.empty:
             "credit_score": "Score"
         }
     )
+    first_row = (page - 1) * page_size + 1 if total else 0
+    st.caption(f"Showing {first_row}–{first_row + len(page_df) - 1 if total else 0} of {total:,} customers (page {page} of {n_pages})")
     
     st.write("### Actions")
     col_sel, col_btn = st.columns([3, 1])
     with col_sel:
-        # Display Name in dropdown for easier selection
+        # Picker follows the search box and the current page (bounded list, not every customer)
         # FIX: Ensure everything is string before adding
-        filtered_df['display_label'] = filtered_df['customer_name'].astype(str) + " (" + filtered_df['customer_id'].astype(str) + ")"
+        labels = page_df['customer_name'].astype(str) + " (" + page_df['customer_id'].astype(str) + ")"
         
         # We need to map back to ID
-        label_to_id = dict(zip(filtered_df['display_label'], filtered_df['customer_id']))
+        label_to_id = dict(zip(labels, page_df['customer_id']))
         
-        selected_label = st.selectbox("Select Customer to View Scorecard", filtered_df['display_label'].unique())
+        selected_label = st.selectbox("Select Customer to View Scorecard", labels.unique(),
+                                      help="Narrow the list with the search box above.")
         selected_id = label_to_id.get(selected_label)
     with col_btn:
         st.write("") # Spacer
@@ -102,21 +102,11 @@ if submitted:
     
     try:
         # --- Auto-Increment ID Logic ---
-        project_root = find_project_root(os.getcwd()) or os.getcwd()
-        data_path = os.path.join(project_root, "scored_data.csv")
-        next_id = "ACS001" # Default
-        
-        if os.path.exists(data_path):
-            try:
-                existing_df = pd.read_csv(data_path)
-                if not existing_df.empty and 'customer_id' in existing_df.columns:
-                    # Filter for ACS IDs
-                    acs_ids = existing_df['customer_id'].astype(str).str.extract(r'ACS(\d+)').dropna().astype(int)
-                    if not acs_ids.empty:
-                        max_id = acs_ids[0].max()
-                        next_id = f"ACS{max_id + 1:03d}"
-            except Exception:
-                pass # Fallback to default if read fails
+        # Ids come from a persistent, locked counter (O(1); concurrent submits never collide)
+        from src.data_store import get_store
+        from src.id_sequence import get_id_sequence
+        store = get_store()
+        next_id = get_id_sequence(store).next_id()
                 
         # 1. Generate Profile
         status_text.text(f"Generating digital footprint for ID: {next_id}...")
@@ -137,14 +127,14 @@ if submitted:
         # A. Signal Extraction
         from src.signal_extractor import SignalExtractor
         extractor = SignalExtractor()
-        signals = extractor.extract_signals(txns_df, profile)
+        signals = extractor.extract_vector(txns_df, profile) # Typed SignalVector
         
         # B. ML Scoring
         status_text.text("Running ML prediction model...")
         bar.progress(70)
         
         from src.scoring_engine import MLScorer
-        scorer = MLScorer() # Loads model_v1.pkl
+        scorer = MLScorer() # model_v1.pkl (loaded once per process by the model registry)
         prediction = scorer.predict_score(signals)
         
         final_score = prediction['credit_score']
@@ -154,8 +144,8 @@ if submitted:
         status_text.text("Finalizing profile...")
         bar.progress(90)
         
-        # Create Flattened Record for CSV (Signals + Score)
-        record = signals.copy()
+        # Create Flattened Record for CSV (Signals + Score) - text-encoded only here, for storage
+        record = signals.to_signals()
         
         # Map Signals to Schema expected by Scorecard/UI
         record['average_monthly_account_credit'] = signals.get('avg_monthly_inflow', 0)
@@ -190,15 +180,15 @@ if submitted:
         
         scored_row = pd.DataFrame([record])
         
-        data_path = os.path.join(project_root if project_root else os.getcwd(), "scored_data.csv")
-        if os.path.exists(data_path):
-            existing_df = pd.read_csv(data_path)
-            # Ensure columns match (concat handles this by adding NaNs if needed)
-            updated_df = pd.concat([existing_df, scored_row], ignore_index=True)
-        else:
-            updated_df = scored_row
-            
-        updated_df.to_csv(data_path, index=False)
+        # Append to the store's write-ahead log (constant time; compacted into the table in the background)
+        store.append(scored_row)
+        
+        # Keep the ledger and typed signals (Scorecard renders from them; rescoring reuses the ledger)
+        try:
+            from src.artifact_store import get_artifact_store, row_stamp
+            get_artifact_store(store).save(profile['customer_id'], txns_df, signals, stamp=row_stamp(record))
+        except Exception as e:
+            st.toast(f"Scoring artifacts not saved: {e}", icon="⚠️")
         
         bar.progress(100)
         status_text.text("Complete!")
@@ -155,17 +155,14 @@ if 'selected_customer_id' not in st.session_state:
 cid = st.session_state['selected_customer_id']
 
 @st.cache_data
-def get_data(customer_id):
+def get_data(customer_id, data_version=None):
+    # data_version (the store's change token) is part of the cache key, so a rewritten customer is re-fetched
     try:
-        # Dynamic path resolution to fix deployment issue
-        base_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-        csv_path = os.path.join(base_dir, "scored_data.csv")
-        df = pd.read_csv(csv_path)
-        # Ensure ID is string for matching
-        df['customer_id'] = df['customer_id'].astype(str)
-        row = df[df['customer_id'] == str(customer_id)]
-        if not row.empty:
-            return row.iloc[0]
+        # Primary-key lookup (SQLite index over the scored data store, see src/customer_index.py)
+        from src.customer_index import CustomerIndex
+        row = CustomerIndex().get(customer_id)
+        if row is not None:
+            return row
     except Exception:
         pass
     
@@ -190,7 +187,27 @@ def get_data(customer_id):
         
     return None
 
-customer = get_data(cid)
+from src.data_store import get_store
+customer = get_data(cid, get_store().version())
+
+@st.cache_resource(max_entries=2)
+def load_explanations(data_version):
+    """
+    Precomputed explanations for a data version (memory-mapped; see src/explanation_store.py), or None.
+    """
+    from src.explanation_store import ExplanationStore
+    return ExplanationStore().load(data_version)
+
+def get_signal_record(customer):
+    """
+    Typed signals saved when this customer row was scored (see src/artifact_store.py),
+    or None for older customers and for artifacts left by whoever held the id before.
+    """
+    try:
+        from src.artifact_store import get_artifact_store, row_stamp
+        return get_artifact_store(get_store()).load_signals(customer['customer_id'], row_stamp(customer))
+    except Exception:
+        return None
 
 if customer is None:
     st.error(f"Customer {cid} not found.")
@@ -203,19 +220,9 @@ with st.sidebar:
     st.subheader("Customer Profile")
     st.markdown("---")
     
-    # Name Display
-    name = customer.get('customer_name', 'Unknown')
-    
-    # Deterministic Backfill for Legacy Data
-    if pd.isna(name) or str(name).lower() in ['nan', 'n/a', 'unknown', 'none']:
-        demo_names = [
-            "Aarav", "Vivaan", "Aditya", "Vihaan", "Arjun", "Sai", "Reyansh", "Ayaan", "Krishna", 
-            "Ishaan", "Diya", "Saanvi", "Anya", "Aadhya", "Pari", "Ananya", "Myra", "Rohan", 
-            "Vikram", "Suresh", "Priya", "Rahul", "Neha", "Amit", "Sneha", "Rajesh", "Pooja", 
-            "Ankit", "Meera", "Varun", "Karan", "Simran", "Deepak", "Kavita"
-        ]
-        idx = hash(str(cid)) % len(demo_names)
-        name = demo_names[idx]
+    # Name Display (legacy rows without a name get the same demo name as on the Customers page)
+    from src.customer_directory import display_name
+    name = display_name(cid, customer.get('customer_name'))
     
     st.markdown(f"**Name:** {name}")
     st.caption(f"ID: {cid}")
@@ -420,16 +427,24 @@ st.subheader("🛍️ Spending & Lifestyle Analysis")
 
 try:
     import json
-    # Parse Data (Handle existing/legacy rows gracefully)
-    spend_json = customer.get('spending_breakdown', '{}')
-    life_json = customer.get('lifestyle_scores', '{}')
-    
-    # Handle NaN/Float case if CSV read as slightly wrong type
-    if pd.isna(spend_json) or isinstance(spend_json, float): spend_json = '{}'
-    if pd.isna(life_json) or isinstance(life_json, float): life_json = '{}'
-    
-    spend_data = json.loads(str(spend_json).replace("'", '"'))
-    life_data = json.loads(str(life_json).replace("'", '"'))
+    # Typed signal record saved at scoring time (memory-mapped, nothing to parse)
+    signal_record = get_signal_record(customer)
+    if signal_record is not None:
+        from src.artifact_store import record_struct
+        spend_data = record_struct(signal_record, 'spending_breakdown')
+        life_data = record_struct(signal_record, 'lifestyle_scores')
+    else:
+        # Parse Data (Handle existing/legacy rows gracefully)
+        spend_json = customer.get('spending_breakdown', '{}')
+        life_json = customer.get('lifestyle_scores', '{}')
+        
+        # Handle NaN/Float case if CSV read as slightly wrong type
+        if pd.isna(spend_json) or isinstance(spend_json, float): spend_json = '{}'
+        if pd.isna(life_json) or isinstance(life_json, float): life_json = '{}'
+        
+        # Columnar store returns native dicts; CSV returns JSON text
+        spend_data = spend_json if isinstance(spend_json, dict) else json.loads(str(spend_json).replace("'", '"'))
+        life_data = life_json if isinstance(life_json, dict) else json.loads(str(life_json).replace("'", '"'))
     
     col_life_1, col_life_2 = st.columns([1, 1])
     
@@ -601,7 +616,42 @@ with col_pipe_7:
 
 st.divider()
 
-
+# 2. Feature Contributions (precomputed explanations - a lookup, never a model fit)
+st.markdown("#### 2. Feature Contributions")
+explanation, explanation_status = None, None
+try:
+    from src.explanation_store import ExplanationStore, data_version_key
+    from src.explanation_service import get_explanation_service
+    from src.scoring_engine import MLScorer
+    explain_store, explain_scorer = get_store(), MLScorer()
+    explain_version = data_version_key(explain_store, explain_scorer)
+    if ExplanationStore().has(explain_version):
+        explanations = load_explanations(explain_version)
+        # Customers scored after the build are explained with the saved explainer
+        explanation = explanations.get(cid) or explanations.explain(customer)
+    else:
+        # Not built for this data version yet: queue it in the background instead of blocking the page
+        service = get_explanation_service()
+        service.submit(explain_store, explain_scorer)
+        explanation = service.get(explain_version, cid)
+        explanation_status = service.status(explain_version)
+except Exception:
+    explanation = None
+
+if explanation:
+    contrib_df = pd.DataFrame(explanation['contributions'])
+    contrib_df['Impact'] = contrib_df['impact'].map(lambda v: f"{v:+.1f} pts")
+    st.dataframe(contrib_df.rename(columns={'feature': 'Feature', 'value': 'Value'})[['Feature', 'Value', 'Impact']],
+                 use_container_width=True, hide_index=True)
+    st.caption(f"Relative to a population baseline of {explanation['base_value']:.0f} points.")
+elif explanation_status and explanation_status['state'] == 'failed':
+    st.warning(f"Explanations could not be computed: {explanation_status['error']}")
+elif explanation_status:
+    st.info(f"⏳ Explanation pending - computing in the background "
+            f"({explanation_status['done']}/{explanation_status['total'] or '?'} chunks done).")
+    st.button("🔄 Refresh Explanation")
+else:
+    st.info("Explanations are not available for this customer.")
 
 st.divider()
 
@@ -1,6 +1,10 @@
 
 import sys
 import os
+import json
+import time
+import argparse
+from datetime import datetime
 import pandas as pd
 import numpy as np
 
@@ -10,20 +14,29 @@ sys.path.append(os.getcwd())
 from src.synthetic_generator import SyntheticGenerator
 from src.signal_extractor import SignalExtractor
 from src.scoring_engine import MLScorer, LabelGenerator
+from src.data_store import get_store, atomic_write
+from src.id_sequence import get_id_sequence
+from src.artifact_store import get_artifact_store, row_stamps
 
-def regenerate_population(n=50):
-    print(f"Regenerating data for {n} users (Scenario-Based)...")
-    
-    gen = SyntheticGenerator()
-    extractor = SignalExtractor()
-    scorer = MLScorer()
-    lg = LabelGenerator()
-    
-    all_scored_records = []
-    
-    # Pools for random generation
-    first_names = ["Aarav", "Vihaan", "Aditya", "Sai", "Arjun", "Reyansh", "Vivaan", "Krishna", "Ishaan", 
-                   "Diya", "Ananya", "Pari", "Myra", "Saanvi", "Aadhya", "Kiara", "Riya", "Sneha", "Pooja", "Neha"]
+# Pools for random generation
+FIRST_NAMES = ["Aarav", "Vihaan", "Aditya", "Sai", "Arjun", "Reyansh", "Vivaan", "Krishna", "Ishaan", 
+               "Diya", "Ananya", "Pari", "Myra", "Saanvi", "Aadhya", "Kiara", "Riya", "Sneha", "Pooja", "Neha"]
+
+def _write_checkpoint(checkpoint_path, state):
+    def write_fn(tmp_path):
+        with open(tmp_path, "w") as f:
+            json.dump(state, f)
+    atomic_write(checkpoint_path, write_fn, fsync=True)
+
+def score_chunk(start, end, rng, gen, extractor, scorer, lg, id_sequence, artifacts=None, end_date=None):
+    """
+    Generates, extracts and scores customers [start, end) and returns their records as a DataFrame.
+    Everything random is drawn from rng, so a chunk is reproducible from its seed (and end_date).
+    If an ArtifactStore is given, each customer's ledger and typed signals are saved to it (stamped with the profile).
+    """
+    profiles = []
+    ledgers = []
+    silent_records = []
     
     # Scenario Definitions (Weighted)
     # 0 = Verma (Approved/Stable) - 35%
@@ -31,54 +44,68 @@ def regenerate_population(n=50):
     # 2 = Devi (NTC/Proprietor) - 25%
     # 3 = Singh (Fraud) - 15%
     
-    for i in range(n):
-        scenario_idx = np.random.choice([0, 1, 2, 3], p=[0.35, 0.25, 0.25, 0.15])
-        first_name = np.random.choice(first_names)
+    for i in range(start, end):
+        scenario_idx = rng.choice([0, 1, 2, 3], p=[0.35, 0.25, 0.25, 0.15])
+        first_name = rng.choice(FIRST_NAMES)
         
-        # Sequential ID Generation
-        cid = f"ACS{i+1:03d}" # ACS001, ACS002...
+        # Sequential ID Generation (same format as the shared id sequence)
+        cid = id_sequence.format(i + 1) # ACS001, ACS002...
         
         if scenario_idx == 0:
             # Scenario 1: Mr. Verma (Software Developer - Safe)
             surname = "Verma"
             emp_type = "Salaried"
-            income = np.random.randint(60000, 150000)
+            income = rng.integers(60000, 150000)
             
         elif scenario_idx == 1:
             # Scenario 2: Mr. Khan (Sales Executive - Risky/Gambling)
             surname = "Khan"
-            emp_type = "Gig" if np.random.random() > 0.5 else "Salaried" # Mixed
-            income = np.random.randint(35000, 55000)
+            emp_type = "Gig" if rng.random() > 0.5 else "Salaried" # Mixed
+            income = rng.integers(35000, 55000)
             
         elif scenario_idx == 2:
             # Scenario 3: Mrs. Devi (Proprietor - NTC but Good)
             surname = "Devi"
             emp_type = "Self_Employed"
-            income = np.random.randint(20000, 45000)
+            income = rng.integers(20000, 45000)
             
         elif scenario_idx == 3:
             # Scenario 4: Mr. Singh (Fraud - New SIM/Emulator)
             surname = "Singh"
             emp_type = "Gig"
-            income = np.random.randint(40000, 80000)
+            income = rng.integers(40000, 80000)
             
         name = f"{first_name} {surname}"
-        print(f"[{i+1}/{n}] Processing {name} ({emp_type}) ID: {cid}...")
         
         # 1. Profile with Custom ID
-        profile = gen.generate_profile(name, emp_type, income, customer_id=cid)
+        profile = gen.generate_profile(name, emp_type, income, customer_id=cid, rng=rng)
         
         # 2. Transactions
-        txns_df = gen.generate_transactions(profile['customer_id'], emp_type, income, name=name)
-        silent_data = gen.generate_silent_data(profile['customer_id'], name=name)
-        
-        # 3. Signals
-        signals = extractor.extract_signals(txns_df, profile)
+        txns_df = gen.generate_transactions(profile['customer_id'], emp_type, income, name=name, rng=rng, end_date=end_date)
+        silent_data = gen.generate_silent_data(profile['customer_id'], name=name, rng=rng)
         
-        # 4. Score
-        prediction = scorer.predict_score(signals)
-        _, subscores = lg.generate_label(signals)
+        profiles.append(profile)
+        ledgers.append(txns_df)
+        silent_records.append(silent_data)
         
+    # 3. Signals (one grouped pass over the chunk ledger)
+    ledger_df = pd.concat(ledgers, ignore_index=True)
+    profiles_df = pd.DataFrame(profiles)
+    batch = extractor.extract_batch(ledger_df, profiles_df)
+    if artifacts is not None:
+        artifacts.save_batch(ledger_df, batch, stamps=row_stamps(profiles_df))
+    
+    # 4. Score (one vectorized prediction + labelling pass over the feature matrix)
+    predictions = scorer.predict_scores(batch)
+    labels = lg.generate_labels(batch)
+    
+    # Text-encoded signal columns for the CSV rows
+    signals_df = batch.to_frame()
+    
+    scored_records = []
+    for profile, silent_data, signals, prediction, subscores in zip(
+            profiles, silent_records, signals_df.to_dict('records'),
+            predictions.to_dict('records'), labels.to_dict('records')):
         # 5. Record
         record = signals.copy()
         record.update(silent_data)
@@ -97,12 +124,113 @@ def regenerate_population(n=50):
         record['volatility_score'] = subscores['volatility_label']
         
         # Add to list
-        all_scored_records.append(record)
+        scored_records.append(record)
+        
+    return pd.DataFrame(scored_records)
+
+def regenerate_population(n=50, chunk_size=1000, store=None, seed=None, resume=True, save_artifacts=False):
+    """
+    Streams a synthetic population of n customers through the scoring pipeline in fixed-size chunks.
+    
+    Each finished chunk is appended to '<table>.partial.csv' and recorded in '<table>.checkpoint'
+    (the partial file's byte size after the append). A restarted run truncates any half-written
+    chunk and resumes after the last completed one. The finished file is published to the store
+    atomically, so readers never see a half-written population. The seed and the ledger end date
+    are kept in the checkpoint, so a resumed run writes the same bytes as an uninterrupted one.
+    
+    With save_artifacts (off by default: one directory and two files per customer), every customer's
+    ledger and typed signals also go to the artifact store (src/artifact_store.py), so migrate_data.py
+    re-scores them from their ledgers. A fresh run always clears the old artifacts (with or without
+    save_artifacts): the ids ACS001..n are reused for new people.
+    """
+    store = store or get_store()
+    partial_path = store.path + ".partial.csv"
+    checkpoint_path = store.path + ".checkpoint"
+    
+    state = None
+    if resume and os.path.exists(checkpoint_path) and os.path.exists(partial_path):
+        with open(checkpoint_path) as f:
+            state = json.load(f)
+        if state.get('n') != n or state.get('chunk_size') != chunk_size:
+            print("Checkpoint does not match this run (n/chunk_size changed). Starting fresh.")
+            state = None
+            
+    if state is None:
+        state = {
+            'n': n,
+            'chunk_size': chunk_size,
+            'seed': seed if seed is not None else int(np.random.SeedSequence().entropy % (2**32)),
+            'as_of': datetime.now().strftime('%Y-%m-%d'),
+            'next_index': 0,
+            'bytes': 0,
+            'columns': None
+        }
+        open(partial_path, "w").close()
+        get_artifact_store(store).clear()
+    else:
+        print(f"Resuming from customer {state['next_index'] + 1} (checkpoint found).")
+        state.setdefault('as_of', datetime.now().strftime('%Y-%m-%d'))
+        # Drop anything written after the last completed chunk
+        with open(partial_path, "r+") as f:
+            f.truncate(state['bytes'])
+        
+    print(f"Regenerating data for {n} users (Scenario-Based) in chunks of {chunk_size}...")
+    
+    gen = SyntheticGenerator()
+    extractor = SignalExtractor()
+    scorer = MLScorer()
+    lg = LabelGenerator()
+    id_sequence = get_id_sequence(store)
+    artifacts = get_artifact_store(store) if save_artifacts else None
+    
+    end_date = datetime.strptime(state['as_of'], '%Y-%m-%d')
+    start_time = time.perf_counter()
+    done_at_start = state['next_index']
+    
+    while state['next_index'] < n:
+        start = state['next_index']
+        end = min(start + chunk_size, n)
+        
+        # Per-chunk random stream keyed on (seed, chunk number)
+        rng = np.random.default_rng([state['seed'], start // chunk_size])
+        chunk_df = score_chunk(start, end, rng, gen, extractor, scorer, lg, id_sequence, artifacts, end_date)
+        
+        # Keep every chunk on the header written by the first one
+        if state['columns'] is None:
+            state['columns'] = list(chunk_df.columns)
+            write_header = True
+        else:
+            chunk_df = chunk_df.reindex(columns=state['columns'])
+            write_header = False
+            
+        with open(partial_path, "a", newline="") as f:
+            chunk_df.to_csv(f, index=False, header=write_header)
+            f.flush()
+            os.fsync(f.fileno())
+            state['bytes'] = f.tell()
+            
+        state['next_index'] = end
+        _write_checkpoint(checkpoint_path, state)
+        
+        elapsed = time.perf_counter() - start_time
+        rate = (end - done_at_start) / elapsed if elapsed > 0 else 0
+        print(f"[{end}/{n}] chunk saved ({rate:,.0f} customers/sec)")
         
-    # Save to CSV
-    df = pd.DataFrame(all_scored_records)
-    df.to_csv("scored_data.csv", index=False)
-    print(f"Successfully saved {len(df)} records to scored_data.csv")
+    # Publish the finished population atomically (streamed into the columnar format if configured)
+    store.import_csv(partial_path)
+    os.remove(checkpoint_path)
+    # The population now holds ACS001..n - new applications continue from there
+    id_sequence.reset(n)
+    print(f"Successfully saved {n} records to {store.path}")
 
 if __name__ == "__main__":
-    regenerate_population(50)
+    parser = argparse.ArgumentParser(description="Regenerate and score the synthetic customer population.")
+    parser.add_argument("--n", type=int, default=50, help="Number of customers")
+    parser.add_argument("--chunk-size", type=int, default=1000, help="Customers per chunk (bounds memory)")
+    parser.add_argument("--backend", default=None, choices=["csv", "parquet"], help="Store backend (default: HELIX_STORE or csv)")
+    parser.add_argument("--seed", type=int, default=None, help="Seed for reproducible populations")
+    parser.add_argument("--fresh", action="store_true", help="Ignore any checkpoint and start over")
+    parser.add_argument("--artifacts", action="store_true", help="Also save per-customer ledgers/signals (slow for large n)")
+    cli_args = parser.parse_args()
+    regenerate_population(cli_args.n, chunk_size=cli_args.chunk_size, store=get_store(cli_args.backend),
+                          seed=cli_args.seed, resume=not cli_args.fresh, save_artifacts=cli_args.artifacts)
@@ -0,0 +1,244 @@
+import os
+import re
+import shutil
+import numpy as np
+import pandas as pd
+
+from src.data_store import PROJECT_ROOT, atomic_write, get_store, SPENDING_CATEGORIES, LIFESTYLE_FIELDS, decode_value
+from src.synthetic_generator import TXN_COLUMNS
+from src.signal_vector import SignalVector, SignalBatch, FEATURE_COLUMNS
+
+# Scalar signals, in extract_signals order
+SCALAR_SIGNALS = FEATURE_COLUMNS
+
+# Trends keep the most recent months (the ledgers span ~6)
+MAX_TREND_MONTHS = 24
+
+# One customer's signals as a fixed-layout record (NaN = not present)
+SIGNAL_DTYPE = np.dtype(
+    [(name, 'f8') for name in SCALAR_SIGNALS] +
+    [('trend_months', 'i4'),
+     ('inflow_trend', 'f8', (MAX_TREND_MONTHS,)),
+     ('outflow_trend', 'f8', (MAX_TREND_MONTHS,)),
+     ('spending_breakdown', [(c, 'f8') for c in SPENDING_CATEGORIES]),
+     ('lifestyle_scores', [(f, 'f8') for f in LIFESTYLE_FIELDS]),
+     ('stamp', 'u8')]
+)
+
+# Profile fields an artifact is stamped with: a reused customer id (e.g. after a regeneration)
+# belongs to a different person, and that person's row no longer matches the stamp
+STAMP_FIELDS = ['customer_id', 'customer_name', 'employment_type', 'declared_monthly_income', 'city_tier']
+TEXT_STAMP_FIELDS = ['customer_id', 'customer_name', 'employment_type', 'city_tier']
+
+def row_stamps(df):
+    """
+    Stable fingerprints of customer rows (or profiles) over STAMP_FIELDS, one uint64 per row.
+    Missing fields hash as blanks, so a row and the profile it was built from always agree.
+    """
+    frame = pd.DataFrame(index=range(len(df)))
+    for field in TEXT_STAMP_FIELDS:
+        values = df[field].to_numpy() if field in df.columns else np.full(len(df), "", dtype=object)
+        frame[field] = pd.Series(values, dtype=object).fillna("").astype(str).to_numpy()
+    income = df['declared_monthly_income'] if 'declared_monthly_income' in df.columns else np.nan
+    frame['declared_monthly_income'] = pd.to_numeric(pd.Series(income, index=range(len(df))), errors='coerce').astype(np.float64).round(2).to_numpy()
+    return pd.util.hash_pandas_object(frame[STAMP_FIELDS], index=False).to_numpy()
+
+def row_stamp(row):
+    """
+    Fingerprint of one customer row (dict or Series), see row_stamps.
+    """
+    return int(row_stamps(pd.DataFrame([dict(row)]))[0])
+
+def _trend_array(values):
+    values = decode_value(values) or []
+    return np.asarray(values, dtype=np.float64)[-MAX_TREND_MONTHS:]
+
+class ArtifactStore:
+    """
+    Per-customer scoring artifacts, written once at scoring time.
+
+    <root>/<customer_id>/ledger.parquet   the raw transaction ledger (zstd-compressed, columnar)
+    <root>/<customer_id>/signals.npy      the signals as one SIGNAL_DTYPE record (memory-mapped on read)
+
+    The Scorecard renders from the typed record instead of re-parsing text columns,
+    and rescoring re-extracts from the stored ledger instead of synthesizing a new one.
+    Every record carries the row_stamp of the customer row it was built for; readers pass the
+    stamp of the row they hold and get nothing back for another person's artifacts.
+    """
+    def __init__(self, root=None):
+        self.root = root or os.path.join(PROJECT_ROOT, "artifacts")
+        try:
+            import pyarrow
+            import pyarrow.parquet
+        except ImportError:
+            raise ImportError("The artifact store requires pyarrow (pip install pyarrow).")
+        self.pa = pyarrow
+        self.pq = pyarrow.parquet
+
+    def customer_dir(self, customer_id):
+        # Ids are used as directory names - keep them filesystem-safe
+        return os.path.join(self.root, re.sub(r'[^A-Za-z0-9_.-]', '_', str(customer_id)))
+
+    def has(self, customer_id, stamp=None):
+        """
+        True if the customer has artifacts (built for the row with this stamp, if given).
+        """
+        return self.load_signals(customer_id, stamp) is not None
+
+    def save(self, customer_id, ledger_df, signals, stamp=None):
+        """
+        Writes one customer's ledger and signals.
+
+        Args:
+            ledger_df: transactions (extra working columns such as 'month' are dropped)
+            signals: SignalVector, dict (extract_signals) or Series (a row of extract_signals_batch)
+            stamp: row_stamp of the customer row (0 if not given: never matches a stamped lookup)
+        """
+        path = self.customer_dir(customer_id)
+        os.makedirs(path, exist_ok=True)
+
+        ledger = ledger_df[[c for c in TXN_COLUMNS if c in ledger_df.columns]].reset_index(drop=True)
+        table = self.pa.Table.from_pandas(ledger, preserve_index=False)
+        atomic_write(os.path.join(path, "ledger.parquet"),
+                     lambda tmp_path: self.pq.write_table(table, tmp_path, compression='zstd'))
+
+        record = self.to_record(signals)
+        record['stamp'] = stamp or 0
+        def write_record(tmp_path):
+            with open(tmp_path, "wb") as f:
+                np.save(f, record)
+        atomic_write(os.path.join(path, "signals.npy"), write_record)
+
+    def save_batch(self, ledger_df, signals_df, stamps=None):
+        """
+        Writes artifacts for every customer in signals_df (a SignalBatch or DataFrame; ledger rows matched on customer_id).
+
+        Args:
+            stamps: row stamps in signals_df order (see row_stamps)
+        """
+        ledgers = dict(tuple(ledger_df.groupby('customer_id', sort=False))) if not ledger_df.empty else {}
+        empty = ledger_df.iloc[:0]
+        if stamps is None:
+            stamps = [None] * len(signals_df)
+        if isinstance(signals_df, SignalBatch):
+            for i in range(len(signals_df)):
+                signals = signals_df[i]
+                self.save(signals.customer_id, ledgers.get(signals.customer_id, empty), signals, stamps[i])
+            return
+        for (_, signals), stamp in zip(signals_df.iterrows(), stamps):
+            self.save(signals['customer_id'], ledgers.get(signals['customer_id'], empty), signals, stamp)
+
+    def load_signals(self, customer_id, stamp=None):
+        """
+        Returns the customer's signal record (read-only, memory-mapped), or None.
+        With a stamp, records built for a different row (or unstamped ones) count as missing.
+        """
+        path = os.path.join(self.customer_dir(customer_id), "signals.npy")
+        if not os.path.exists(path):
+            return None
+        record = np.load(path, mmap_mode='r')[0]
+        if stamp is not None and ('stamp' not in record.dtype.names or int(record['stamp']) != int(stamp)):
+            return None
+        return record
+
+    def load_ledger(self, customer_id, columns=None):
+        """
+        Returns the customer's stored ledger as a DataFrame, or None.
+        """
+        path = os.path.join(self.customer_dir(customer_id), "ledger.parquet")
+        if not os.path.exists(path):
+            return None
+        return self.pq.read_table(path, columns=columns, memory_map=True).to_pandas()
+
+    def load_ledgers(self, customer_ids):
+        """
+        Concatenated ledgers for several customers (customers without a ledger are skipped).
+        """
+        ledgers = [df for df in (self.load_ledger(cid) for cid in customer_ids) if df is not None]
+        if not ledgers:
+            return pd.DataFrame(columns=TXN_COLUMNS)
+        return pd.concat(ledgers, ignore_index=True)
+
+    def clear(self):
+        if os.path.exists(self.root):
+            shutil.rmtree(self.root)
+
+    def to_record(self, signals):
+        """
+        Packs a SignalVector, or a signals dict/Series (text-encoded trends and breakdowns are decoded here),
+        into a SIGNAL_DTYPE record.
+        """
+        record = np.zeros(1, dtype=SIGNAL_DTYPE)
+        if isinstance(signals, SignalVector):
+            for name, value in zip(SCALAR_SIGNALS, signals.features):
+                record[name] = value
+            months = min(len(signals.inflow_trend), MAX_TREND_MONTHS)
+            record['trend_months'] = months
+            record['inflow_trend'] = np.nan
+            record['outflow_trend'] = np.nan
+            record['inflow_trend'][0, :months] = signals.inflow_trend[len(signals.inflow_trend) - months:]
+            record['outflow_trend'][0, :months] = signals.outflow_trend[len(signals.outflow_trend) - months:]
+            for field, value in zip(SPENDING_CATEGORIES, signals.spending):
+                record['spending_breakdown'][field] = value
+            for field, value in zip(LIFESTYLE_FIELDS, signals.lifestyle):
+                record['lifestyle_scores'][field] = value
+            return record
+        for name in SCALAR_SIGNALS:
+            value = signals.get(name)
+            record[name] = np.nan if value is None else value
+
+        inflow, outflow = _trend_array(signals.get('inflow_trend')), _trend_array(signals.get('outflow_trend'))
+        record['trend_months'] = len(inflow)
+        record['inflow_trend'] = np.nan
+        record['outflow_trend'] = np.nan
+        record['inflow_trend'][0, :len(inflow)] = inflow
+        record['outflow_trend'][0, :len(outflow)] = outflow
+
+        for column, fields in [('spending_breakdown', SPENDING_CATEGORIES), ('lifestyle_scores', LIFESTYLE_FIELDS)]:
+            values = decode_value(signals.get(column)) or {}
+            for field in fields:
+                value = values.get(field)
+                record[column][field] = np.nan if value is None else value
+        return record
+
+
+def record_struct(record, column):
+    """
+    Returns a breakdown struct of a signal record as {field: value} (absent fields left out).
+    """
+    struct = record[column]
+    return {field: float(struct[field]) for field in struct.dtype.names if not np.isnan(struct[field])}
+
+def get_artifact_store(store=None):
+    """
+    Returns the artifact store kept next to a data store ('<table dir>/artifacts').
+    """
+    store = store or get_store()
+    return ArtifactStore(root=os.path.join(os.path.dirname(store.path), "artifacts"))
+
+def rescore_from_artifacts(customer_ids, artifacts=None, extractor=None, scorer=None, labeler=None, stamps=None):
+    """
+    Re-extracts and re-scores customers from their stored ledgers (nothing is re-synthesized).
+    With stamps (row stamps in customer_ids order) only artifacts built for those rows are used.
+
+    Returns:
+        pd.DataFrame: one row per customer with a stored ledger - signals plus
+                      credit_score, risk_band and the stability/discipline/volatility scores
+    """
+    from src.signal_extractor import SignalExtractor
+    from src.scoring_engine import score_population
+
+    artifacts = artifacts or ArtifactStore()
+    extractor = extractor or SignalExtractor()
+
+    if stamps is None:
+        stamps = [None] * len(customer_ids)
+    customer_ids = [cid for cid, stamp in zip(customer_ids, stamps) if artifacts.has(cid, stamp)]
+    ledger = artifacts.load_ledgers(customer_ids)
+    batch = extractor.extract_batch(ledger, pd.DataFrame({'customer_id': customer_ids}))
+
+    scores = score_population(batch, scorer, labeler)
+    scored = batch.to_frame()
+    for col in ['credit_score', 'risk_band', 'stability_score', 'discipline_score', 'volatility_score']:
+        scored[col] = scores[col].to_numpy()
+    return scored
@@ -0,0 +1,121 @@
+import numpy as np
+import pandas as pd
+
+from src.data_store import get_store, CUSTOMER_LIST_COLUMNS
+
+# Shown for customers without a stored name
+DEMO_NAMES = [
+    "Aarav", "Vivaan", "Aditya", "Vihaan", "Arjun", "Sai", "Reyansh", "Ayaan", "Krishna",
+    "Ishaan", "Diya", "Saanvi", "Anya", "Aadhya", "Pari", "Ananya", "Myra", "Rohan",
+    "Vikram", "Suresh", "Priya", "Rahul", "Neha", "Amit", "Sneha", "Rajesh", "Pooja",
+    "Ankit", "Meera", "Varun", "Karan", "Simran", "Deepak", "Kavita"
+]
+
+# Columns of the Customers table, in display order
+DISPLAY_COLUMNS = ['customer_id', 'customer_name', 'employment_type', 'declared_monthly_income',
+                   'status', 'risk_band', 'credit_score']
+
+# Stored names that count as missing
+MISSING_NAMES = ['nan', 'n/a', 'unknown', 'none']
+
+def demo_names(customer_ids):
+    """
+    Demo names for customer ids, picked from a stable hash of the id
+    (the same id gets the same name on every page and in every process).
+    """
+    ids = pd.Series(customer_ids, dtype=object).astype(str)
+    picks = pd.util.hash_pandas_object(ids, index=False).to_numpy() % len(DEMO_NAMES)
+    return np.asarray(DEMO_NAMES, dtype=object)[picks]
+
+def display_name(customer_id, name):
+    """
+    The stored name, or the customer's demo name if it is missing.
+    """
+    if pd.isna(name) or str(name).lower() in MISSING_NAMES:
+        return demo_names([customer_id])[0]
+    return name
+
+def backfill_names(df):
+    """
+    Fills missing customer names with their demo names (vectorized, see demo_names).
+    """
+    if 'customer_name' not in df.columns:
+        df['customer_name'] = np.nan
+    names = df['customer_name']
+    missing = names.isna() | names.astype(str).str.lower().isin(MISSING_NAMES)
+    if missing.any():
+        df['customer_name'] = names.astype(object)
+        df.loc[missing, 'customer_name'] = demo_names(df.loc[missing, 'customer_id'])
+    return df
+
+def prepare_customer_list(df):
+    """
+    Turns raw store rows into the Customers table: sorted by id, names backfilled and a docs status column.
+    """
+    df = df.sort_values(by='customer_id', ascending=True).reset_index(drop=True)
+    df = backfill_names(df)
+    if 'docs_verified_flag' not in df.columns:
+        df['docs_verified_flag'] = False
+    df['status'] = np.where(df['docs_verified_flag'] == True, "✅ Verified", "⚠️ Pending")
+    return df
+
+def load_customer_list(store=None):
+    """
+    Reads the Customers table from the store (projected columns only).
+
+    Returns:
+        DataFrame ready for display (empty if the store has no rows)
+    """
+    store = store or get_store()
+    if not store.exists():
+        return pd.DataFrame()
+    df = store.read(columns=CUSTOMER_LIST_COLUMNS)
+    if df.empty:
+        return df
+    return prepare_customer_list(df)
+
+# Sortable columns of the Customers table (label -> column)
+SORT_COLUMNS = {'ID': 'customer_id', 'Name': 'customer_name', 'Income': 'declared_monthly_income',
+                'Score': 'credit_score', 'Risk Band': 'risk_band'}
+
+class CustomerPager:
+    """
+    Serves one page of the Customers table at a time.
+    Filtering (row positions from the search index) and sorting happen here, so only
+    page_size rows ever reach the UI. Sort ranks are computed once per column.
+    """
+    def __init__(self, df):
+        self.df = df
+        self._ranks = {}
+
+    def rank(self, column):
+        """
+        Position of every row in the table sorted by column (missing values last).
+        """
+        if column not in self._ranks:
+            order = self.df[column].reset_index(drop=True).sort_values(kind='stable', na_position='last').index.to_numpy()
+            ranks = np.empty(len(order), dtype=np.int64)
+            ranks[order] = np.arange(len(order))
+            self._ranks[column] = ranks
+        return self._ranks[column]
+
+    def page(self, positions=None, sort_by='customer_id', ascending=True, page=1, page_size=25):
+        """
+        Args:
+            positions: row positions to show (None = all rows)
+            page: 1-based page number (clamped to the available pages)
+
+        Returns:
+            tuple: (page DataFrame, total matching rows, page number actually served)
+        """
+        if positions is None:
+            positions = np.arange(len(self.df))
+        total = len(positions)
+        n_pages = max(-(-total // page_size), 1)
+        page = min(max(int(page), 1), n_pages)
+
+        if sort_by in self.df.columns and total:
+            ranks = self.rank(sort_by)[positions]
+            positions = positions[np.argsort(ranks if ascending else -ranks, kind='stable')]
+        start = (page - 1) * page_size
+        return self.df.iloc[positions[start:start + page_size]], total, page
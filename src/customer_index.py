@@ -0,0 +1,101 @@
+import os
+import json
+import sqlite3
+from contextlib import contextmanager
+import pandas as pd
+
+from src.data_store import FileLock, get_store, json_default
+
+class CustomerIndex:
+    """
+    Single-customer lookups over the scored population.
+
+    The main table is mirrored into SQLite ('<table>.idx.sqlite') with customer_id as the
+    primary key, so get() is a B-tree lookup instead of a full read + scan. The index
+    records the table version it was built from and is rebuilt when the table changes
+    (write, regeneration, compaction). Rows still in the store's write-ahead log (new
+    applications) are checked first, so a new customer is visible immediately.
+    """
+    def __init__(self, store=None, path=None):
+        self.store = store or get_store()
+        self.path = path or self.store.path + ".idx.sqlite"
+        # Serializes rebuilds across processes
+        self.lock = FileLock(self.path + ".lock")
+
+    def get(self, customer_id):
+        """
+        Returns one customer's row as a pd.Series (same values as store.read()), or None.
+        """
+        customer_id = str(customer_id)
+
+        # 1. Write-ahead log (bounded - compaction keeps it small)
+        pending = self.store.read_log()
+        if pending is not None and 'customer_id' in pending.columns:
+            match = pending[pending['customer_id'].astype(str) == customer_id]
+            if not match.empty:
+                return match.iloc[-1]
+
+        # 2. Primary-key lookup in the index
+        self.refresh()
+        with self._connect() as conn:
+            found = conn.execute("SELECT record FROM customers WHERE customer_id = ?", (customer_id,)).fetchone()
+        if found is None:
+            return None
+        return pd.Series(json.loads(found[0]))
+
+    def refresh(self, force=False):
+        """
+        Rebuilds the index if the main table changed since it was built.
+
+        Returns:
+            bool: True if the index was rebuilt
+        """
+        version = self.store.table_version()
+        if not force and self._built_version() == self._encode_version(version):
+            return False
+
+        with self.lock.hold():
+            # Another process may have rebuilt it while we waited
+            version = self.store.table_version()
+            if not force and self._built_version() == self._encode_version(version):
+                return False
+
+            table = self.store.read_table()
+            rows = []
+            if 'customer_id' in table.columns:
+                # First row per id (what the Scorecard's mask + iloc[0] used to return)
+                table = table.drop_duplicates('customer_id', keep='first')
+                columns = list(table.columns)
+                rows = [(str(values[columns.index('customer_id')]),
+                         json.dumps(dict(zip(columns, values)), default=json_default))
+                        for values in table.itertuples(index=False, name=None)]
+
+            # One transaction: readers see either the old or the new index, never a mix
+            with self._connect() as conn:
+                conn.execute("DELETE FROM customers")
+                conn.executemany("INSERT INTO customers (customer_id, record) VALUES (?, ?)", rows)
+                conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('table_version', ?)",
+                             (self._encode_version(version),))
+            return True
+
+    def _built_version(self):
+        if not os.path.exists(self.path):
+            return None
+        with self._connect() as conn:
+            found = conn.execute("SELECT value FROM meta WHERE key = 'table_version'").fetchone()
+        return found[0] if found else None
+
+    def _encode_version(self, version):
+        return json.dumps(version)
+
+    @contextmanager
+    def _connect(self):
+        # One short-lived connection per call (safe across Streamlit threads); commits on success
+        conn = sqlite3.connect(self.path, timeout=30)
+        try:
+            with conn:
+                conn.execute("CREATE TABLE IF NOT EXISTS customers (customer_id TEXT PRIMARY KEY, record TEXT NOT NULL)")
+                conn.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)")
+                yield conn
+        finally:
+            conn.close()
@@ -0,0 +1,531 @@
+import os
+import ast
+import json
+import threading
+from contextlib import contextmanager
+import numpy as np
+import pandas as pd
+
+try:
+    import fcntl
+except ImportError: # Windows
+    fcntl = None
+    import msvcrt
+
+from src.transaction_categorizer import CATEGORY_RULES, DEFAULT_CATEGORY
+
+# Project root (one level up from src/) - where scored_data.* lives
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Nested columns: CSV stores them as text, the columnar backend as native list/struct columns
+LIST_COLUMNS = ['inflow_trend', 'outflow_trend', 'installed_apps', 'verified_documents']
+STRUCT_COLUMNS = ['spending_breakdown', 'lifestyle_scores']
+BOOL_COLUMNS = ['docs_verified_flag', 'is_rooted']
+
+SPENDING_CATEGORIES = [category for category, _ in CATEGORY_RULES] + [DEFAULT_CATEGORY]
+LIFESTYLE_FIELDS = ['stability_affinity', 'digital_savviness', 'luxury_index', 'essential_ratio', 'discretionary_ratio']
+
+# Columns shown on the Customers page (column projection)
+CUSTOMER_LIST_COLUMNS = ['customer_id', 'customer_name', 'employment_type', 'declared_monthly_income',
+                         'docs_verified_flag', 'risk_band', 'credit_score']
+
+def decode_value(value):
+    """
+    Parses a text-encoded list/dict (JSON or Python repr) into a native object.
+    Native objects pass through; missing values become None.
+    """
+    if isinstance(value, (list, dict)):
+        return value
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    if value is None or (isinstance(value, float) and np.isnan(value)):
+        return None
+    if isinstance(value, str):
+        try:
+            return json.loads(value)
+        except ValueError:
+            try:
+                return ast.literal_eval(value)
+            except (ValueError, SyntaxError):
+                return None
+    return value
+
+def encode_value(value):
+    """
+    Encodes a native list/dict the way the CSV has always stored it
+    (str(list) for lists, JSON for dicts). Text passes through.
+    """
+    if isinstance(value, np.ndarray):
+        value = value.tolist()
+    if isinstance(value, dict):
+        return json.dumps({k: v for k, v in value.items() if v is not None})
+    if isinstance(value, list):
+        return str(value)
+    return value
+
+
+def json_default(value):
+    # numpy scalars/arrays that json can't serialize natively
+    if isinstance(value, np.integer):
+        return int(value)
+    if isinstance(value, np.floating):
+        return float(value)
+    if isinstance(value, np.bool_):
+        return bool(value)
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    if value is pd.NA:
+        return None
+    return str(value)
+
+
+def atomic_write(path, write_fn, fsync=False):
+    """
+    Writes a file through write_fn(tmp_path) next to it, then renames it into place,
+    so readers never see a half-written file and a crash never leaves a torn one.
+
+    Args:
+        path: final file path
+        write_fn: callable writing the full contents to the temp path it is given
+        fsync: flush the temp file to disk before the rename (small state files)
+    """
+    tmp_path = path + ".tmp"
+    write_fn(tmp_path)
+    if fsync:
+        with open(tmp_path, "rb+") as f:
+            os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+class FileLock:
+    """
+    Advisory inter-process lock held on a side file.
+    Readers take it shared, writers exclusive (on Windows every lock is exclusive).
+    """
+    def __init__(self, path):
+        self.path = path
+
+    @contextmanager
+    def hold(self, shared=False, blocking=True):
+        """
+        Holds the lock for the duration of the with-block.
+        With blocking=False it yields False instead of waiting if the lock is taken.
+        """
+        f = open(self.path, "a+")
+        try:
+            try:
+                if fcntl is not None:
+                    mode = fcntl.LOCK_SH if shared else fcntl.LOCK_EX
+                    fcntl.flock(f.fileno(), mode if blocking else mode | fcntl.LOCK_NB)
+                else:
+                    f.seek(0)
+                    msvcrt.locking(f.fileno(), msvcrt.LK_LOCK if blocking else msvcrt.LK_NBLCK, 1)
+            except OSError:
+                if blocking:
+                    raise
+                yield False
+                return
+            yield True
+        finally:
+            # Closing the file releases the lock
+            f.close()
+
+
+class DataStore:
+    """
+    Storage backend for the scored population.
+
+    The main table is only ever replaced atomically. New rows go to an append-only
+    write-ahead log ('<table>.wal', one JSON record per line), so append() costs the same
+    however large the population is. read() returns the table merged with the log, and
+    compact() folds the log into the table (run in the background once the log grows).
+    Log rows replace table rows with the same customer_id.
+    """
+    backend = None
+    extension = None
+
+    # Log size that triggers a background compaction
+    compact_log_bytes = 512 * 1024
+
+    def __init__(self, path):
+        self.path = path
+        self.log_path = path + ".wal"
+        # The log being folded in by a running (or interrupted) compaction
+        self.compacting_path = path + ".wal.compacting"
+        # Lock order is always compaction -> table -> log
+        self.compact_lock = FileLock(path + ".compact.lock")
+        self.table_lock = FileLock(path + ".lock")
+        self.log_lock = FileLock(path + ".wal.lock")
+
+    def exists(self):
+        return os.path.exists(self.path) or self._has_log()
+
+    def version(self):
+        """
+        Cheap change token (mtime, size of the table and its logs) - changes on every write.
+        """
+        if not self.exists():
+            return None
+        token = []
+        for path in [self.path, self.compacting_path, self.log_path]:
+            if os.path.exists(path):
+                stat = os.stat(path)
+                token.extend([stat.st_mtime_ns, stat.st_size])
+            else:
+                token.extend([0, 0])
+        return tuple(token)
+
+    def table_version(self):
+        """
+        Change token of the main table alone (changes on write, import and compaction, not on append).
+        """
+        if not os.path.exists(self.path):
+            return None
+        stat = os.stat(self.path)
+        # The table is replaced by rename, so the inode tells apart same-size rewrites within one mtime tick
+        return (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+
+    def columns(self):
+        columns = self._table_columns() if os.path.exists(self.path) else []
+        pending = self._read_log()
+        if pending is not None:
+            columns += [c for c in pending.columns if c not in columns]
+        return columns
+
+    def read(self, columns=None):
+        with self.table_lock.hold(shared=True), self.log_lock.hold(shared=True):
+            table = self._read_table(columns) if os.path.exists(self.path) else None
+            pending = self._read_log(columns)
+        return self._merge(table, pending)
+
+    def read_table(self, columns=None):
+        """
+        Reads the main table only (rows still in the write-ahead log are not included).
+        """
+        with self.table_lock.hold(shared=True):
+            return self._read_table(columns) if os.path.exists(self.path) else pd.DataFrame()
+
+    def snapshot(self, columns=None):
+        """
+        Reads the main table together with the table_version() it was read at (one consistent pair).
+
+        Returns:
+            tuple: (table_version, pd.DataFrame)
+        """
+        with self.table_lock.hold(shared=True):
+            if not os.path.exists(self.path):
+                return None, pd.DataFrame()
+            return self.table_version(), self._read_table(columns)
+
+    def read_log(self, columns=None):
+        """
+        Reads the rows still in the write-ahead log (None if it is empty).
+        """
+        with self.log_lock.hold(shared=True):
+            return self._read_log(columns)
+
+    def write(self, df):
+        """
+        Replaces the whole table (and discards the log).
+        """
+        with self.table_lock.hold(), self.log_lock.hold():
+            self._write_table(df)
+            self._clear_log()
+
+    def append(self, df):
+        """
+        Appends rows to the write-ahead log: one locked, fsynced write, independent of table size.
+        """
+        records = df.to_dict('records')
+        payload = "".join(json.dumps(record, default=json_default) + "\n" for record in records)
+        with self.log_lock.hold():
+            with open(self.log_path, "ab+") as f:
+                # A crashed append can leave a torn last record - start on a fresh line so this one survives
+                end = f.seek(0, os.SEEK_END)
+                if end:
+                    f.seek(end - 1)
+                    if f.read(1) != b"\n":
+                        payload = "\n" + payload
+                f.write(payload.encode())
+                f.flush()
+                os.fsync(f.fileno())
+                log_size = f.tell()
+        if log_size >= self.compact_log_bytes:
+            self.compact_async()
+
+    def compact(self, blocking=True):
+        """
+        Folds the write-ahead log into the main table.
+
+        Returns:
+            int: rows folded in (None if another compaction is running and blocking=False)
+        """
+        # Only another compaction makes a non-blocking call give up (readers just delay it)
+        with self.compact_lock.hold(blocking=blocking) as acquired:
+            if not acquired:
+                return None
+            with self.table_lock.hold():
+                with self.log_lock.hold():
+                    # Freeze the current log; appends carry on into a fresh one.
+                    # (A leftover from an interrupted compaction is finished first.)
+                    if not os.path.exists(self.compacting_path) and self._has_log():
+                        os.replace(self.log_path, self.compacting_path)
+                if not os.path.exists(self.compacting_path):
+                    return 0
+                pending = self._normalize_log(self._read_records(self.compacting_path))
+                if pending is not None:
+                    table = self._read_table() if os.path.exists(self.path) else None
+                    self._write_table(self._merge(table, pending))
+                # Re-running after a crash here is harmless: log rows replace rows with the same id
+                os.remove(self.compacting_path)
+                return 0 if pending is None else len(pending)
+
+    def compact_async(self):
+        """
+        Compacts in a background thread (skipped if a compaction is already running).
+        """
+        thread = threading.Thread(target=self.compact, kwargs={'blocking': False}, daemon=True)
+        thread.start()
+        return thread
+
+    def import_csv(self, csv_path, chunksize=50000):
+        """
+        Publishes a finished CSV file as this store's table (atomically) and discards the log.
+        """
+        with self.table_lock.hold(), self.log_lock.hold():
+            self._import_csv(csv_path, chunksize)
+            self._clear_log()
+
+    def _table_columns(self):
+        raise NotImplementedError
+
+    def _read_table(self, columns=None):
+        raise NotImplementedError
+
+    def _write_table(self, df):
+        raise NotImplementedError
+
+    def _import_csv(self, csv_path, chunksize):
+        raise NotImplementedError
+
+    def _normalize_log(self, df):
+        """
+        Converts log rows (decoded from JSON) to the types this backend's read() returns.
+        """
+        return df
+
+    def _has_log(self):
+        return any(os.path.exists(p) and os.path.getsize(p) > 0 for p in [self.log_path, self.compacting_path])
+
+    def _clear_log(self):
+        for path in [self.compacting_path, self.log_path]:
+            if os.path.exists(path):
+                os.remove(path)
+
+    def _read_records(self, path):
+        if not os.path.exists(path):
+            return None
+        records = []
+        with open(path) as f:
+            for line in f:
+                try:
+                    records.append(json.loads(line))
+                except ValueError:
+                    # Torn last line from a crashed append - the write never completed
+                    continue
+        return pd.DataFrame(records) if records else None
+
+    def _read_log(self, columns=None):
+        frames = [df for df in [self._read_records(self.compacting_path), self._read_records(self.log_path)]
+                  if df is not None]
+        if not frames:
+            return None
+        pending = pd.concat(frames, ignore_index=True) if len(frames) > 1 else frames[0]
+        if columns is not None:
+            pending = pending[[c for c in columns if c in pending.columns]]
+        return self._normalize_log(pending)
+
+    def _merge(self, table, pending):
+        if pending is None or pending.empty:
+            return table if table is not None else pd.DataFrame()
+        if 'customer_id' in pending.columns:
+            pending = pending.drop_duplicates('customer_id', keep='last')
+        if table is None or table.empty:
+            return pending.reset_index(drop=True)
+        if 'customer_id' in table.columns and 'customer_id' in pending.columns:
+            table = table[~table['customer_id'].isin(pending['customer_id'])]
+        return pd.concat([table, pending], ignore_index=True)
+
+    def _project(self, columns):
+        if columns is None:
+            return None
+        available = set(self._table_columns())
+        return [c for c in columns if c in available]
+
+
+class CsvStore(DataStore):
+    """
+    Row-oriented CSV backend (compatible with every existing reader).
+    Nested columns are kept as text.
+    """
+    backend = 'csv'
+    extension = '.csv'
+
+    def _table_columns(self):
+        return list(pd.read_csv(self.path, nrows=0).columns)
+
+    def _read_table(self, columns=None):
+        return pd.read_csv(self.path, usecols=self._project(columns))
+
+    def _write_table(self, df):
+        df = self._normalize_log(df.copy())
+        atomic_write(self.path, lambda tmp_path: df.to_csv(tmp_path, index=False))
+
+    def _normalize_log(self, df):
+        for col in LIST_COLUMNS + STRUCT_COLUMNS:
+            if col in df.columns:
+                df[col] = [encode_value(v) for v in df[col]]
+        return df
+
+    def _import_csv(self, csv_path, chunksize):
+        os.replace(csv_path, self.path)
+
+
+class ParquetStore(DataStore):
+    """
+    Columnar Parquet/Arrow backend.
+    Columns are typed, trends/app lists are native list columns and the
+    breakdowns are struct columns; read(columns=...) only touches the projected columns.
+    """
+    backend = 'parquet'
+    extension = '.parquet'
+
+    def __init__(self, path):
+        super().__init__(path)
+        try:
+            import pyarrow
+            import pyarrow.parquet
+        except ImportError:
+            raise ImportError("The parquet store requires pyarrow (pip install pyarrow).")
+        self.pa = pyarrow
+        self.pq = pyarrow.parquet
+        
+        # Fixed column types so every chunk/file shares one schema (unknown columns are inferred)
+        pa = pyarrow
+        self.column_types = {
+            **{c: pa.string() for c in ['customer_id', 'customer_name', 'employment_type', 'city_tier', 'risk_band',
+                                        'device_model', 'utility_bill_payment_history', 'model_version']},
+            **{c: pa.float64() for c in ['avg_monthly_inflow', 'income_volatility', 'avg_monthly_outflow',
+                                         'net_cash_retention_ratio', 'cash_surplus_stability', 'risky_spend_ratio',
+                                         'geo_variance', 'declared_monthly_income', 'average_monthly_account_credit',
+                                         'average_monthly_account_debit', 'txn_count_6m']},
+            **{c: pa.int64() for c in ['bill_miss_count', 'sim_age_days', 'credit_score',
+                                       'stability_score', 'discipline_score', 'volatility_score']}
+        }
+        self.nested_types = {
+            'inflow_trend': pa.list_(pa.float64()),
+            'outflow_trend': pa.list_(pa.float64()),
+            'installed_apps': pa.list_(pa.string()),
+            'verified_documents': pa.list_(pa.string()),
+            'spending_breakdown': pa.struct([(c, pa.float64()) for c in SPENDING_CATEGORIES]),
+            'lifestyle_scores': pa.struct([(f, pa.float64()) for f in LIFESTYLE_FIELDS])
+        }
+
+    def _table_columns(self):
+        return list(self.pq.read_schema(self.path).names)
+
+    def _read_table(self, columns=None):
+        table = self.pq.read_table(self.path, columns=self._project(columns))
+        df = table.to_pandas()
+        for col in STRUCT_COLUMNS:
+            if col in df.columns:
+                # Struct fields absent for a row come back as None - drop them
+                df[col] = [None if v is None else {k: x for k, x in v.items() if x is not None} for v in df[col]]
+        for col in LIST_COLUMNS:
+            if col in df.columns:
+                df[col] = [None if v is None else list(v.tolist() if isinstance(v, np.ndarray) else v) for v in df[col]]
+        return df
+
+    def to_table(self, df):
+        pa = self.pa
+        arrays = []
+        for col in df.columns:
+            values = df[col]
+            arrow_type = self.column_types.get(col)
+            if col in self.nested_types:
+                array = pa.array([decode_value(v) for v in values], type=self.nested_types[col])
+            elif col in BOOL_COLUMNS:
+                flags = values.map({True: True, False: False, 'True': True, 'False': False})
+                array = pa.array(flags.astype('boolean'), type=pa.bool_(), from_pandas=True)
+            elif arrow_type == pa.string() or (arrow_type is None and values.dtype == object):
+                # Text columns (mixed object columns, e.g. NaN + text, are stored as strings too)
+                array = pa.array(values.where(values.isna(), values.astype(str)).astype(object),
+                                 type=pa.string(), from_pandas=True)
+            else:
+                array = pa.array(values, type=arrow_type, from_pandas=True)
+            arrays.append(array)
+        return pa.Table.from_arrays(arrays, names=list(df.columns))
+
+    def _normalize_log(self, df):
+        for col in LIST_COLUMNS + STRUCT_COLUMNS:
+            if col in df.columns:
+                df[col] = [decode_value(v) for v in df[col]]
+        return df
+
+    def _write_table(self, df):
+        table = self.to_table(df)
+        atomic_write(self.path, lambda tmp_path: self.pq.write_table(table, tmp_path))
+
+    def _import_csv(self, csv_path, chunksize):
+        # Stream the CSV into row groups so memory stays bounded by one chunk
+        def write_fn(tmp_path):
+            writer = None
+            try:
+                for chunk in pd.read_csv(csv_path, chunksize=chunksize):
+                    table = self.to_table(chunk)
+                    if writer is None:
+                        writer = self.pq.ParquetWriter(tmp_path, table.schema)
+                    writer.write_table(table.cast(writer.schema))
+            finally:
+                if writer is not None:
+                    writer.close()
+        atomic_write(self.path, write_fn)
+        os.remove(csv_path)
+
+
+STORE_BACKENDS = {'csv': CsvStore, 'parquet': ParquetStore}
+
+def get_store(backend=None, root=None, name="scored_data"):
+    """
+    Returns the configured store for the scored population.
+    The backend comes from the argument, else the HELIX_STORE env var, else 'csv'.
+    """
+    backend = (backend or os.environ.get("HELIX_STORE", "csv")).lower()
+    if backend not in STORE_BACKENDS:
+        raise ValueError(f"Unknown store backend '{backend}' (expected one of {list(STORE_BACKENDS)})")
+    store_cls = STORE_BACKENDS[backend]
+    return store_cls(os.path.join(root or PROJECT_ROOT, name + store_cls.extension))
+
+def convert_store(source_backend, target_backend, root=None):
+    """
+    Copies the scored population from one backend to another.
+    """
+    source = get_store(source_backend, root)
+    target = get_store(target_backend, root)
+    df = source.read()
+    target.write(df)
+    return len(df)
+
+if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser(description="Convert scored_data between storage backends, or compact its write-ahead log.")
+    parser.add_argument("--source", default="csv", choices=list(STORE_BACKENDS))
+    parser.add_argument("--target", default="parquet", choices=list(STORE_BACKENDS))
+    parser.add_argument("--compact", action="store_true", help="Fold the source store's write-ahead log into its table")
+    cli_args = parser.parse_args()
+    if cli_args.compact:
+        rows = get_store(cli_args.source).compact()
+        print(f"Compacted {rows} logged rows into {cli_args.source}.")
+    else:
+        rows = convert_store(cli_args.source, cli_args.target)
+        print(f"Converted {rows} rows from {cli_args.source} to {cli_args.target}.")
@@ -1,12 +1,170 @@
-import shap
 import pandas as pd
 import numpy as np
-import xgboost as xgb
+
+from src.signal_vector import FEATURE_DEFAULTS, FEATURE_COLUMNS
+
+# Features used in scoring (union of 3-pillar inputs)
+SURROGATE_FEATURES = [
+    'affordability_ratio', 'income_volatility', 'declared_monthly_income',
+    'txn_count_6m', 'missed_utility_bill_count', 'flag_salary_detected',
+    'average_monthly_account_credit', 'average_monthly_account_debit'
+]
+
+def format_explanation(feature_names, impacts, values, base_value):
+    """
+    Builds the explanation dict for one customer (contributions sorted by absolute impact).
+    """
+    contributions = []
+    for name, value, data_val in zip(feature_names, impacts, values):
+        contributions.append({
+            "feature": name,
+            "impact": float(value),
+            "value": float(data_val)
+        })
+
+    contributions.sort(key=lambda x: abs(x['impact']), reverse=True)
+
+    return {
+        "base_value": float(base_value),
+        "contributions": contributions
+    }
+
+def top_k_indices(impacts, k):
+    """
+    Column indices of each row's k largest |impact|, largest first.
+    argpartition finds the k per row in linear time; only those k are sorted.
+    """
+    magnitude = np.abs(np.asarray(impacts, dtype=np.float64))
+    k = min(k, magnitude.shape[1])
+    if k < magnitude.shape[1]:
+        top = np.argpartition(-magnitude, k - 1, axis=1)[:, :k]
+    else:
+        top = np.broadcast_to(np.arange(k), magnitude.shape)
+    order = np.argsort(-np.take_along_axis(magnitude, top, axis=1), axis=1, kind='stable')
+    return np.take_along_axis(top, order, axis=1)
+
+def explanations_frame(customer_ids, positions, feature_names, impacts, inputs, base_value, top_k=3):
+    """
+    Top-k contributions for many customers in one pass (e.g. reason codes for adverse-action letters).
+
+    Args:
+        positions: row of each customer in impacts/inputs (-1 = not found, left out)
+
+    Returns:
+        pd.DataFrame: one row per (customer, rank) - customer_id, rank, feature, impact, value, base_value
+    """
+    customer_ids = np.asarray(customer_ids, dtype=object)
+    positions = np.asarray(positions, dtype=np.int64)
+    found = positions >= 0
+    customer_ids, positions = customer_ids[found], positions[found]
+
+    impacts = np.asarray(impacts)[positions]
+    inputs = np.asarray(inputs)[positions]
+    top = top_k_indices(impacts, top_k) if len(positions) else np.empty((0, 0), dtype=np.int64)
+    k = top.shape[1]
+
+    return pd.DataFrame({
+        'customer_id': np.repeat(customer_ids, k),
+        'rank': np.tile(np.arange(1, k + 1), len(positions)),
+        'feature': np.asarray(feature_names, dtype=object)[top].ravel(),
+        'impact': np.take_along_axis(impacts, top, axis=1).ravel(),
+        'value': np.take_along_axis(inputs, top, axis=1).ravel(),
+        'base_value': float(base_value) if base_value is not None else np.nan
+    })
+
+class RowIndex:
+    """
+    customer_id -> row position (first occurrence), built once. Ids are compared as strings.
+    """
+    def __init__(self, customer_ids):
+        ids = pd.Series(np.asarray(customer_ids, dtype=object)).astype(str)
+        first = ~ids.duplicated().to_numpy()
+        self.index = pd.Index(ids[first].to_numpy())
+        self.rows = np.flatnonzero(first)
+
+    def get(self, customer_id):
+        """
+        Row of one customer, or None.
+        """
+        i = self.index.get_indexer([str(customer_id)])[0]
+        return int(self.rows[i]) if i >= 0 else None
+
+    def positions(self, customer_ids):
+        """
+        Rows of many customers (-1 where not found).
+        """
+        found = self.index.get_indexer(pd.Index(np.asarray(customer_ids, dtype=object)).astype(str))
+        return np.where(found >= 0, self.rows[found], -1)
+
+def surrogate_matrix(df, feature_names):
+    """
+    Surrogate model inputs (missing values as 0, like training).
+    """
+    return df[feature_names].copy().apply(pd.to_numeric, errors='coerce').fillna(0)
+
+def scoring_matrix(df):
+    """
+    The scorer's feature matrix (FEATURE_COLUMNS order, missing values take their defaults).
+    """
+    X = np.empty((len(df), len(FEATURE_COLUMNS)), dtype=np.float64)
+    for i, (col, default) in enumerate(FEATURE_DEFAULTS.items()):
+        X[:, i] = pd.to_numeric(df[col], errors='coerce').fillna(default) if col in df.columns else default
+    return X
+
+def is_linear_model(model):
+    """
+    True for linear regressors (a single coef_ vector plus intercept_), e.g. model_v1.pkl.
+    """
+    coef = getattr(model, 'coef_', None)
+    return coef is not None and hasattr(model, 'intercept_') and np.ndim(coef) == 1
+
+class LinearExplainer:
+    """
+    Exact explanations for a linear scorer: contribution_i = coef_i * (x_i - mean_i).
+    The contributions sum to prediction - base_value, where base_value is the
+    prediction at the population means. No surrogate, no sampling.
+    """
+    def __init__(self, coef, intercept, means, feature_names):
+        self.coef = np.asarray(coef, dtype=np.float64)
+        self.intercept = float(intercept)
+        self.means = np.asarray(means, dtype=np.float64)
+        self.feature_names = list(feature_names)
+        self.base_value = self.intercept + float(self.coef @ self.means)
+
+    @classmethod
+    def from_model(cls, model, X, feature_names=FEATURE_COLUMNS):
+        """
+        Args:
+            model: fitted linear model
+            X: background population (rows x features) the means are taken over
+        """
+        return cls(model.coef_, model.intercept_, np.asarray(X, dtype=np.float64).mean(axis=0), feature_names)
+
+    def contributions(self, X):
+        """
+        Per-feature contributions for every row of X, as one matrix operation.
+        """
+        return (np.asarray(X, dtype=np.float64) - self.means) * self.coef
+
+    def to_dict(self):
+        return {'coef': self.coef.tolist(), 'intercept': self.intercept,
+                'means': self.means.tolist(), 'feature_names': self.feature_names}
+
+    @classmethod
+    def from_dict(cls, state):
+        return cls(state['coef'], state['intercept'], state['means'], state['feature_names'])
 
 class Explainer:
-    def __init__(self, data_path: str):
+    """
+    Explains the scores of a population.
+    With a linear scoring model (see MLScorer) the explanations are exact (LinearExplainer);
+    otherwise an XGBoost surrogate is fitted to the scores and explained with tree SHAP.
+
+    After fit(): impacts/inputs are (rows x features) matrices aligned to self.df, base_value a float.
+    """
+    def __init__(self, data_path: str = None, df=None, model=None):
         try:
-            self.df = pd.read_csv(data_path)
+            self.df = df.copy() if df is not None else pd.read_csv(data_path)
             # Ensure basic numeric conversions
             cols_to_numeric = ['credit_score', 'income_volatility', 'discipline_score']
             for c in cols_to_numeric:
@@ -14,81 +172,129 @@ class Explainer:
                     self.df[c] = pd.to_numeric(self.df[c], errors='coerce')
         except:
             self.df = pd.DataFrame()
-            
+
+        # Built once at load time; explanation matrices are aligned to these row positions
+        self.rows = RowIndex(self.df['customer_id'] if 'customer_id' in self.df.columns else [])
+        self.scoring_model = model
         self.model = None
         self.explainer = None
         self.shap_values = None
-        
+        self.feature_names = []
+        self.method = None
+        self.impacts = None
+        self.inputs = None
+        self.base_value = None
+
+    def fit(self):
+        """
+        Computes explanations for every row (exact for linear models, surrogate SHAP otherwise).
+        """
+        if is_linear_model(self.scoring_model):
+            return self.fit_linear()
+        return self.train_surrogate_model()
+
+    def fit_linear(self):
+        """
+        Exact contributions from the scoring model's coefficients.
+        """
+        if self.df.empty:
+            return None
+        X = scoring_matrix(self.df)
+        self.explainer = LinearExplainer.from_model(self.scoring_model, X)
+        self.feature_names = list(FEATURE_COLUMNS)
+        self.impacts = self.explainer.contributions(X)
+        self.inputs = X
+        self.base_value = self.explainer.base_value
+        self.method = 'linear'
+        return self.explainer
+
     def train_surrogate_model(self):
         """
         Trains a surrogate XGBoost model to interpret the rule-based scores.
         """
-        if self.df.empty:
+        X = self.fit_surrogate()
+        if X is None:
             return None, None
-            
-        # Features used in scoring (union of 3-pillar inputs)
-        features = [
-            'affordability_ratio', 'income_volatility', 'declared_monthly_income', 
-            'txn_count_6m', 'missed_utility_bill_count', 'flag_salary_detected',
-            'average_monthly_account_credit', 'average_monthly_account_debit'
-        ]
-        
+
+        self.shap_values = self.explainer(X)
+        self.impacts, self.inputs, self.base_value = self.explain_surrogate(X, self.shap_values)
+        self.method = 'surrogate'
+
+        return self.explainer, self.shap_values
+
+    def fit_surrogate(self):
+        """
+        Trains the surrogate only (no SHAP values yet).
+
+        Returns:
+            pd.DataFrame: the surrogate's input matrix (explain it whole or in chunks), or None
+        """
+        if self.df.empty:
+            return None
+
         # Filter to available features
-        available_feats = [f for f in features if f in self.df.columns]
-        
+        available_feats = [f for f in SURROGATE_FEATURES if f in self.df.columns]
+
         if not available_feats or 'credit_score' not in self.df.columns:
-            return None, None
-            
-        X = self.df[available_feats].copy().fillna(0)
+            return None
+
+        X = surrogate_matrix(self.df, available_feats)
         y = self.df['credit_score'].fillna(300)
-        
+
+        # Imported here so the linear path never loads them
+        import shap
+        import xgboost as xgb
+
         # Train
         self.model = xgb.XGBRegressor(objective='reg:squarederror', n_estimators=50)
         self.model.fit(X, y)
-        
+
         self.explainer = shap.Explainer(self.model)
-        self.shap_values = self.explainer(X)
         self.feature_names = available_feats
-        
-        return self.explainer, self.shap_values
+        return X
+
+    def explain_surrogate(self, X, shap_values=None):
+        """
+        Tree SHAP values of the fitted surrogate for rows of X (safe to call from several threads).
+
+        Returns:
+            tuple: (impacts, inputs, base_value)
+        """
+        shap_values = shap_values if shap_values is not None else self.explainer(X)
+        return (np.asarray(shap_values.values, dtype=np.float64), np.asarray(shap_values.data, dtype=np.float64),
+                float(np.ravel(shap_values.base_values)[0]))
 
     def get_explanation_for_customer(self, customer_id):
         """
         Returns explanation for a specific customer.
         """
         if self.explainer is None:
-            self.train_surrogate_model()
-            
+            self.fit()
+
         if self.explainer is None:
             return None
-            
-        try:
-            # Find index
-            # Support both mock IDs and real IDs by string matching
-            mask = self.df['customer_id'].astype(str) == str(customer_id)
-            if not mask.any():
-                return None
-                
-            idx = mask.idxmax() # Get first match
-            
-            shap_vals = self.shap_values[idx]
-            
-            contributions = []
-            for name, value, data_val in zip(self.feature_names, shap_vals.values, shap_vals.data):
-                contributions.append({
-                    "feature": name,
-                    "impact": float(value),
-                    "value": float(data_val)
-                })
-                
-            contributions.sort(key=lambda x: abs(x['impact']), reverse=True)
-            
-            return {
-                "base_value": float(shap_vals.base_values),
-                "contributions": contributions
-            }
-        except Exception as e:
+
+        # Support both mock IDs and real IDs (ids are compared as strings)
+        idx = self.rows.get(customer_id)
+        if idx is None:
             return None
+        return format_explanation(self.feature_names, self.impacts[idx], self.inputs[idx], self.base_value)
+
+    def get_explanations(self, customer_ids, top_k=3):
+        """
+        Top-k contributions for many customers in one vectorized pass (unknown ids are left out).
+
+        Returns:
+            pd.DataFrame: customer_id, rank, feature, impact, value, base_value
+        """
+        if self.explainer is None:
+            self.fit()
+
+        if self.explainer is None:
+            return explanations_frame([], [], [], np.empty((0, 0)), np.empty((0, 0)), None, top_k)
+
+        return explanations_frame(customer_ids, self.rows.positions(customer_ids), self.feature_names,
+                                  self.impacts, self.inputs, self.base_value, top_k)
 
 if __name__ == "__main__":
     pass
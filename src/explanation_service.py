@@ -0,0 +1,203 @@
+import os
+import time
+import threading
+import numpy as np
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from src.data_store import get_store
+from src.explainability import Explainer, format_explanation, is_linear_model
+from src.explanation_store import ExplanationStore, data_version_key
+
+# Rows per tree SHAP task
+CHUNK_ROWS = 2000
+
+class ExplanationJob:
+    """
+    One background build. Chunks become readable (get()) as soon as they finish;
+    the whole set is published to the ExplanationStore at the end.
+    """
+    def __init__(self, version):
+        self.version = version
+        self.state = 'queued' # queued -> running -> ready | failed
+        self.done = 0
+        self.total = 0
+        self.error = None
+        self.started_at = time.time()
+        self.finished_at = None
+        self.explainer = None
+        self.rows = None
+        self.completed = None
+
+    def progress(self):
+        return {'state': self.state, 'done': self.done, 'total': self.total, 'error': self.error}
+
+    def get(self, customer_id):
+        """
+        The customer's explanation if their chunk has finished, else None.
+        """
+        if self.rows is None or self.completed is None:
+            return None
+        row = self.rows.get(customer_id)
+        if row is None or not self.completed[row]:
+            return None
+        explainer = self.explainer
+        return format_explanation(explainer.feature_names, explainer.impacts[row], explainer.inputs[row],
+                                  explainer.base_value)
+
+
+class ExplanationService:
+    """
+    Builds explanation sets in the background so no request waits for a surrogate fit.
+
+    One job runs at a time (later submissions queue); a job's tree SHAP work is split into
+    CHUNK_ROWS-row chunks on a bounded pool of `workers` threads (xgboost releases the GIL,
+    so chunks run in parallel across cores). Linear models need no pool - their exact
+    explanations are one matrix operation.
+
+    A job is dropped once its set is published (the ExplanationStore answers from then on).
+    It is published under the key of the table it actually read, which differs from the
+    submitted key if the table changed in between (callers re-submit with the current key).
+    """
+    def __init__(self, explanations=None, workers=None, chunk_rows=CHUNK_ROWS):
+        self.explanations = explanations or ExplanationStore()
+        self.workers = workers or os.cpu_count() or 1
+        self.chunk_rows = chunk_rows
+        self.jobs = {}
+        self._sets = {}
+        self._lock = threading.Lock()
+        self._job_pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="explain-job")
+        self._chunk_pool = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="explain-chunk")
+
+    def submit(self, store=None, scorer=None):
+        """
+        Queues a build for the store's current data version (no-op if it is built or already queued).
+
+        Returns:
+            str: the data version key
+        """
+        from src.scoring_engine import MLScorer
+
+        store = store or get_store()
+        scorer = scorer or MLScorer()
+        version = data_version_key(store, scorer)
+        if self.explanations.has(version):
+            return version
+
+        with self._lock:
+            job = self.jobs.get(version)
+            if job is not None and job.state != 'failed':
+                return version
+            # Failed jobs are kept only until the next submission (their error is shown meanwhile)
+            for key in [key for key, other in self.jobs.items() if other.state == 'failed']:
+                del self.jobs[key]
+            job = self.jobs[version] = ExplanationJob(version)
+        self._job_pool.submit(self._run, job, store, scorer)
+        return version
+
+    def status(self, version):
+        """
+        Returns:
+            dict: state ('ready', 'queued', 'running', 'failed' or 'missing'), done/total chunks, error
+        """
+        if self.explanations.has(version):
+            return {'state': 'ready', 'done': 1, 'total': 1, 'error': None}
+        job = self.jobs.get(version)
+        if job is None:
+            return {'state': 'missing', 'done': 0, 'total': 0, 'error': None}
+        return job.progress()
+
+    def get(self, version, customer_id):
+        """
+        The customer's explanation from the published set, or from a running job's finished chunks; else None.
+        """
+        if self.explanations.has(version):
+            explanations = self._sets.get(version)
+            if explanations is None:
+                explanations = self.explanations.load(version)
+                with self._lock:
+                    # Forget sets that have been pruned from disk
+                    self._sets = {key: loaded for key, loaded in self._sets.items() if self.explanations.has(key)}
+                    self._sets[version] = explanations
+            return explanations.get(customer_id)
+        job = self.jobs.get(version)
+        return job.get(customer_id) if job is not None else None
+
+    def wait(self, version, timeout=None):
+        """
+        Blocks until the version's job finishes (for scripts/tests). Returns the final status.
+        """
+        deadline = None if timeout is None else time.time() + timeout
+        while self.status(version)['state'] in ('queued', 'running'):
+            if deadline is not None and time.time() > deadline:
+                break
+            time.sleep(0.05)
+        return self.status(version)
+
+    def shutdown(self):
+        self._job_pool.shutdown(wait=True)
+        self._chunk_pool.shutdown(wait=True)
+
+    def _run(self, job, store, scorer):
+        job.state = 'running'
+        start = time.perf_counter()
+        try:
+            # The key is taken from the table as read (not as it was at submit time)
+            table_version, df = store.snapshot()
+            version = data_version_key(store, scorer, table_version)
+            model = scorer.model
+            explainer = Explainer(df=df, model=model)
+            if is_linear_model(model):
+                explainer.fit_linear()
+                job.total = job.done = 1
+            else:
+                self._run_surrogate(job, explainer)
+
+            if explainer.explainer is None:
+                raise ValueError("Nothing to explain (no scored data)")
+            self.explanations.publish(version, explainer, time.perf_counter() - start)
+            job.state = 'ready'
+            with self._lock:
+                self.jobs.pop(job.version, None)
+        except Exception as e:
+            job.error = str(e)
+            job.state = 'failed'
+        finally:
+            job.finished_at = time.time()
+
+    def _run_surrogate(self, job, explainer):
+        X = explainer.fit_surrogate()
+        if X is None:
+            return
+
+        n_rows, n_features = len(X), len(explainer.feature_names)
+        explainer.impacts = np.zeros((n_rows, n_features))
+        explainer.inputs = np.zeros((n_rows, n_features))
+        explainer.method = 'surrogate'
+        job.explainer = explainer
+        job.rows = explainer.rows
+        job.completed = np.zeros(n_rows, dtype=bool)
+
+        starts = range(0, n_rows, self.chunk_rows)
+        job.total = len(starts)
+        futures = {self._chunk_pool.submit(explainer.explain_surrogate, X.iloc[s:s + self.chunk_rows]): s for s in starts}
+        for future in as_completed(futures):
+            s = futures[future]
+            impacts, inputs, base_value = future.result()
+            explainer.impacts[s:s + len(impacts)] = impacts
+            explainer.inputs[s:s + len(inputs)] = inputs
+            explainer.base_value = base_value
+            # Readable from here on
+            job.completed[s:s + len(impacts)] = True
+            job.done += 1
+
+
+# One per process (shared by every Streamlit session)
+_service = None
+_service_lock = threading.Lock()
+
+def get_explanation_service():
+    global _service
+    with _service_lock:
+        if _service is None:
+            _service = ExplanationService()
+        return _service
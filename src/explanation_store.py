@@ -0,0 +1,239 @@
+import os
+import json
+import time
+import shutil
+import hashlib
+import numpy as np
+
+from src.data_store import PROJECT_ROOT, FileLock, get_store
+from src.explainability import (Explainer, LinearExplainer, RowIndex, format_explanation, explanations_frame,
+                                surrogate_matrix, scoring_matrix)
+
+# Explanation sets kept on disk (older data versions are pruned after a build)
+KEEP_VERSIONS = 2
+
+def data_version_key(store, scorer=None, table_version=None):
+    """
+    Short key for the store's main table (and the scoring model, if given). Explanations are built
+    per key; rows still in the write-ahead log are explained from the saved explainer instead.
+
+    Args:
+        table_version: the table's version token if already known (e.g. from store.snapshot())
+    """
+    model_version = (scorer.model_info or {}).get('version') if scorer is not None else None
+    table_version = table_version if table_version is not None else store.table_version()
+    return hashlib.sha1(repr((table_version, model_version)).encode()).hexdigest()[:12]
+
+class ExplanationSet:
+    """
+    Precomputed explanations for one data version (read-only, memory-mapped).
+
+    customer_ids.npy     ids in row order
+    shap_values.npy      (rows x features) contributions (exact linear ones, or surrogate SHAP values)
+    feature_values.npy   (rows x features) the inputs those values explain
+    surrogate.json       the XGBoost surrogate, for customers added after the build (surrogate method only)
+    meta.json            method, feature names, base value, data version, build stats
+                         (plus coefficients and means for the linear method)
+    """
+    def __init__(self, path):
+        self.path = path
+        with open(os.path.join(path, "meta.json")) as f:
+            self.meta = json.load(f)
+        self.feature_names = self.meta['feature_names']
+        self.base_value = self.meta['base_value']
+        self.method = self.meta.get('method', 'surrogate')
+        self.linear = LinearExplainer.from_dict(self.meta['linear']) if self.method == 'linear' else None
+        self.customer_ids = np.load(os.path.join(path, "customer_ids.npy"), mmap_mode='r')
+        self.shap_values = np.load(os.path.join(path, "shap_values.npy"), mmap_mode='r')
+        self.feature_values = np.load(os.path.join(path, "feature_values.npy"), mmap_mode='r')
+        self._rows = None
+        self._surrogate = None
+
+    def __len__(self):
+        return len(self.customer_ids)
+
+    def row(self, customer_id):
+        """
+        Row position of a customer, or None. The id -> row index is built on first use.
+        """
+        return self.row_index().get(customer_id)
+
+    def row_index(self):
+        if self._rows is None:
+            self._rows = RowIndex(self.customer_ids)
+        return self._rows
+
+    def get(self, customer_id):
+        """
+        Returns the precomputed explanation (same shape as Explainer.get_explanation_for_customer), or None.
+        """
+        row = self.row(customer_id)
+        if row is None:
+            return None
+        return format_explanation(self.feature_names, self.shap_values[row], self.feature_values[row], self.base_value)
+
+    def get_explanations(self, customer_ids=None, top_k=3):
+        """
+        Top-k contributions for many customers (default: all) in one vectorized pass.
+
+        Returns:
+            pd.DataFrame: customer_id, rank, feature, impact, value, base_value
+        """
+        if customer_ids is None:
+            customer_ids = np.asarray(self.customer_ids).astype(object)
+            positions = np.arange(len(customer_ids))
+        else:
+            positions = self.row_index().positions(customer_ids)
+        return explanations_frame(customer_ids, positions, self.feature_names, self.shap_values,
+                                  self.feature_values, self.base_value, top_k)
+
+    def explain(self, customer):
+        """
+        Explains a customer row that is not in the set (e.g. scored after the build)
+        with the saved coefficients (linear) or the saved surrogate.
+
+        Args:
+            customer: Series/dict with the explained input columns
+        """
+        import pandas as pd
+        row = pd.DataFrame([{f: customer.get(f) for f in self.feature_names}])
+        if self.linear is not None:
+            X = scoring_matrix(row)
+            return format_explanation(self.feature_names, self.linear.contributions(X)[0], X[0], self.base_value)
+
+        if self._surrogate is None:
+            import shap
+            import xgboost as xgb
+            model = xgb.XGBRegressor()
+            model.load_model(os.path.join(self.path, "surrogate.json"))
+            self._surrogate = shap.Explainer(model)
+        values = self._surrogate(surrogate_matrix(row, self.feature_names))[0]
+        return format_explanation(self.feature_names, values.values, values.data, values.base_values)
+
+
+class ExplanationStore:
+    """
+    Explanation sets on disk, one directory per data version, next to the model (src/explanations/).
+    Built offline (python -m src.explanation_store) so that the Scorecard only does lookups.
+    """
+    def __init__(self, root=None):
+        self.root = root or os.path.join(PROJECT_ROOT, "src", "explanations")
+
+    def path(self, version):
+        return os.path.join(self.root, version)
+
+    def has(self, version):
+        return os.path.exists(os.path.join(self.path(version), "meta.json"))
+
+    def load(self, version):
+        """
+        Returns the ExplanationSet for version, or None if it has not been built.
+        """
+        if not self.has(version):
+            return None
+        return ExplanationSet(self.path(version))
+
+    def build(self, df, version, model=None):
+        """
+        Explains every row of df and publishes the result as version.
+        With a linear scoring model the contributions are exact; otherwise a surrogate is fitted and explained with SHAP.
+
+        Returns:
+            ExplanationSet, or None if df has nothing to explain
+        """
+        start = time.perf_counter()
+        explainer = Explainer(df=df, model=model)
+        explainer.fit()
+        if explainer.explainer is None:
+            return None
+        return self.publish(version, explainer, time.perf_counter() - start)
+
+    def publish(self, version, explainer, build_seconds=None):
+        """
+        Writes a fitted Explainer's matrices as version.
+
+        Returns:
+            ExplanationSet
+        """
+        os.makedirs(self.root, exist_ok=True)
+        with FileLock(os.path.join(self.root, ".lock")).hold():
+            # Write a private directory, then rename it into place (readers never see a partial set)
+            tmp_path = self.path(version) + f".tmp{os.getpid()}"
+            shutil.rmtree(tmp_path, ignore_errors=True)
+            os.makedirs(tmp_path)
+
+            ids = explainer.df['customer_id'].astype(str).to_numpy()
+            np.save(os.path.join(tmp_path, "customer_ids.npy"), ids.astype(str))
+            np.save(os.path.join(tmp_path, "shap_values.npy"), explainer.impacts)
+            np.save(os.path.join(tmp_path, "feature_values.npy"), explainer.inputs)
+            meta = {
+                'data_version': version,
+                'method': explainer.method,
+                'feature_names': explainer.feature_names,
+                'base_value': explainer.base_value,
+                'rows': len(ids),
+                'build_seconds': round(build_seconds, 3) if build_seconds is not None else None,
+                'built_at': time.time()
+            }
+            if explainer.method == 'linear':
+                meta['linear'] = explainer.explainer.to_dict()
+            else:
+                explainer.model.save_model(os.path.join(tmp_path, "surrogate.json"))
+            with open(os.path.join(tmp_path, "meta.json"), "w") as f:
+                json.dump(meta, f)
+
+            shutil.rmtree(self.path(version), ignore_errors=True)
+            os.replace(tmp_path, self.path(version))
+            self.prune(keep=version)
+        return ExplanationSet(self.path(version))
+
+    def prune(self, keep):
+        """
+        Removes old versions, keeping `keep` and the newest others (KEEP_VERSIONS in total).
+        """
+        versions = [v for v in os.listdir(self.root) if self.has(v) and v != keep]
+        versions.sort(key=lambda v: os.path.getmtime(self.path(v)), reverse=True)
+        for version in versions[KEEP_VERSIONS - 1:]:
+            shutil.rmtree(self.path(version), ignore_errors=True)
+
+
+def build_explanations(store=None, explanations=None, scorer=None, force=False):
+    """
+    Builds the explanation set for the store's current table and scoring model (no-op if it already exists).
+
+    Returns:
+        ExplanationSet or None
+    """
+    from src.scoring_engine import MLScorer
+
+    store = store or get_store()
+    explanations = explanations or ExplanationStore()
+    scorer = scorer or MLScorer()
+    if not store.exists():
+        return None
+    version = data_version_key(store, scorer)
+    if explanations.has(version) and not force:
+        return explanations.load(version)
+    # Key the set on the table it is actually built from (the table may change meanwhile)
+    table_version, df = store.snapshot()
+    return explanations.build(df, data_version_key(store, scorer, table_version), model=scorer.model)
+
+if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser(description="Precompute SHAP explanations for the scored population.")
+    parser.add_argument("--force", action="store_true", help="Rebuild even if this data version is already explained")
+    parser.add_argument("--export", metavar="CSV", help="Also write every customer's top reason codes to this CSV")
+    parser.add_argument("--top-k", type=int, default=3, help="Reason codes per customer for --export")
+    cli_args = parser.parse_args()
+
+    start = time.time()
+    result = build_explanations(force=cli_args.force)
+    if result is None:
+        print("❌ Nothing to explain (no scored data).")
+    else:
+        print(f"✅ {len(result)} explanations for data version {result.meta['data_version']} "
+              f"({result.method}) in {time.time() - start:.2f}s ({result.path})")
+        if cli_args.export:
+            reasons = result.get_explanations(top_k=cli_args.top_k)
+            reasons.to_csv(cli_args.export, index=False)
+            print(f"📄 Exported {len(reasons)} reason codes to {cli_args.export}")
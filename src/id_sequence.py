@@ -0,0 +1,93 @@
+import os
+import re
+
+from src.data_store import FileLock, atomic_write, get_store
+
+class IdSequence:
+    """
+    Persistent customer-id counter.
+    The file holds the last number issued; allocate() is one locked
+    read-increment-write of that file, so concurrent submits never get the same id.
+    """
+    def __init__(self, path, prefix="ACS", width=3, initial_value=None):
+        """
+        Args:
+            path: counter file
+            prefix/width: id format (ACS001, ACS002, ...)
+            initial_value: callable returning the last number already in use,
+                           called once if the counter file does not exist yet
+        """
+        self.path = path
+        self.prefix = prefix
+        self.width = width
+        self.initial_value = initial_value
+        self.lock = FileLock(path + ".lock")
+
+    def format(self, number):
+        return f"{self.prefix}{number:0{self.width}d}"
+
+    def next_id(self):
+        return self.allocate(1)[0]
+
+    def allocate(self, count=1):
+        """
+        Reserves count consecutive ids.
+
+        Returns:
+            list: the ids, in order
+        """
+        with self.lock.hold():
+            last = self._load()
+            if last is None:
+                last = int(self.initial_value()) if self.initial_value else 0
+            self._save(last + count)
+        return [self.format(n) for n in range(last + 1, last + count + 1)]
+
+    def current(self):
+        """
+        Returns the last number issued (None if the counter was never initialized).
+        """
+        with self.lock.hold(shared=True):
+            return self._load()
+
+    def reset(self, last):
+        """
+        Sets the last number issued (e.g. after the whole population is regenerated).
+        """
+        with self.lock.hold():
+            self._save(int(last))
+
+    def _load(self):
+        if not os.path.exists(self.path):
+            return None
+        with open(self.path) as f:
+            text = f.read().strip()
+        return int(text) if text else None
+
+    def _save(self, last):
+        def write_fn(tmp_path):
+            with open(tmp_path, "w") as f:
+                f.write(str(last))
+        atomic_write(self.path, write_fn, fsync=True)
+
+
+def max_id_number(store, prefix="ACS"):
+    """
+    Highest number used by '<prefix>nnn' ids in the store (0 if none) - one full scan.
+    """
+    if not store.exists():
+        return 0
+    ids = store.read(columns=['customer_id'])
+    if ids.empty or 'customer_id' not in ids.columns:
+        return 0
+    numbers = ids['customer_id'].astype(str).str.extract(rf'^{re.escape(prefix)}(\d+)$')[0].dropna()
+    return int(numbers.astype(int).max()) if not numbers.empty else 0
+
+def get_id_sequence(store=None, prefix="ACS"):
+    """
+    Returns the id sequence for a store ('<table>.<prefix>.seq').
+    On first use it starts after the highest id already in the store.
+    """
+    store = store or get_store()
+    return IdSequence(f"{store.path}.{prefix.lower()}.seq", prefix=prefix,
+                      initial_value=lambda: max_id_number(store, prefix))
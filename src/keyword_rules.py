@@ -0,0 +1,68 @@
+import re
+import numpy as np
+import pandas as pd
+from functools import lru_cache
+
+# Flag families evaluated against transaction descriptions (case-insensitive regex fragments)
+FLAG_RULES = {
+    # Keywords: bounce, return, penalty, late, decline
+    'bill_miss': ['bounce', 'return', 'penalty', 'late', 'decline'],
+    # Keywords: Dream11, Bet365, Crypto, BNPL, etc.
+    'risky_spend': ['Dream11', 'Gaming_Wallet', 'Crypto', 'Betting', 'Bet365', 'Rummy',
+                    'Poker', 'Binance', 'Coinbase', 'Uni.Cards', 'Slice', 'Lazypay', 'Simpl'],
+    # Digital payments
+    'upi': ['UPI'],
+    # Payroll credits
+    'salary': ['Salary'],
+}
+
+
+class KeywordRuleRegistry:
+    """
+    Shared registry of keyword flag rules.
+    All families are compiled into one anchored regex (one optional lookahead per family),
+    so a single match call tells which families appear anywhere in a description.
+    """
+    def __init__(self, rules=FLAG_RULES, cache_size=65536):
+        self.rules = {name: list(keywords) for name, keywords in rules.items()}
+        self.cache_size = cache_size
+        self._compile()
+
+    def _compile(self):
+        self.families = list(self.rules.keys())
+        lookaheads = [
+            f"(?:(?=.*?(?P<{name}>{'|'.join(keywords)})))?"
+            for name, keywords in self.rules.items()
+        ]
+        self.pattern = re.compile('^' + ''.join(lookaheads), re.IGNORECASE | re.DOTALL)
+        # Memoize per description - merchant strings repeat heavily
+        self.flags = lru_cache(maxsize=self.cache_size)(self._flags)
+
+    def register(self, name, keywords):
+        """
+        Adds (or replaces) a flag family and recompiles the matcher.
+        """
+        self.rules[name] = list(keywords)
+        self._compile()
+
+    def _flags(self, description):
+        match = self.pattern.match(description)
+        return tuple(match.group(name) is not None for name in self.families)
+
+    def evaluate(self, descriptions):
+        """
+        Evaluates every flag family over a description column in one pass.
+
+        Returns:
+            pd.DataFrame: Boolean matrix (one column per family) aligned to descriptions
+        """
+        codes, uniques = pd.factorize(descriptions)
+        matrix = np.zeros((len(uniques) + 1, len(self.families)), dtype=bool)
+        for i, description in enumerate(uniques):
+            matrix[i] = self.flags(description)
+        # Missing descriptions (code -1) land on the last, all-False row
+        return pd.DataFrame(matrix[codes], index=descriptions.index, columns=self.families)
+
+
+# Compiled once at import and shared by all SignalExtractor instances
+keyword_rules = KeywordRuleRegistry()
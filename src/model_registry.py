@@ -0,0 +1,77 @@
+import os
+import io
+import time
+import hashlib
+import threading
+import joblib
+
+class ModelRegistry:
+    """
+    Process-wide cache of loaded model artifacts.
+    Each artifact is loaded once per (path, file identity) and shared by every MLScorer
+    (and every Streamlit session) in the process. If the file changes on disk,
+    the next lookup loads the new version. Deploy a model by writing it next to the old
+    one and renaming it into place: the new inode is noticed even within one mtime tick.
+
+    This module is deliberately kept separate from scoring_engine so that
+    importlib.reload(src.scoring_engine) does not throw the cache away.
+    """
+    def __init__(self):
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    def get(self, model_path):
+        """
+        Returns the loaded model for model_path, loading it only if it is new or changed.
+        """
+        return self._get_entry(model_path)['model']
+
+    def info(self, model_path):
+        """
+        Returns metadata about the loaded artifact (version, load latency, etc.) or None.
+        """
+        entry = self._entries.get(os.path.abspath(model_path))
+        if entry is None:
+            return None
+        return {k: v for k, v in entry.items() if k != 'model'}
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def _get_entry(self, model_path):
+        full_path = os.path.abspath(model_path)
+        stat = os.stat(full_path)
+        file_key = (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+
+        entry = self._entries.get(full_path)
+        if entry is not None and entry['file_key'] == file_key:
+            return entry
+
+        with self._lock:
+            # Another thread may have loaded it while we waited
+            entry = self._entries.get(full_path)
+            if entry is not None and entry['file_key'] == file_key:
+                return entry
+
+            start = time.perf_counter()
+            with open(full_path, 'rb') as f:
+                payload = f.read()
+            model = joblib.load(io.BytesIO(payload))
+            load_seconds = time.perf_counter() - start
+
+            entry = {
+                'model': model,
+                'model_path': full_path,
+                'file_key': file_key,
+                'version': hashlib.sha256(payload).hexdigest()[:12],
+                'load_seconds': load_seconds,
+                'loaded_at': time.time(),
+                'load_count': (self._entries[full_path]['load_count'] + 1) if full_path in self._entries else 1
+            }
+            self._entries[full_path] = entry
+            return entry
+
+
+# Shared by every MLScorer in the process
+model_registry = ModelRegistry()
@@ -2,75 +2,138 @@ import pandas as pd
 import numpy as np
 import joblib
 import os
+import sys
+import time
+import argparse
+from datetime import datetime
+from concurrent.futures import ProcessPoolExecutor
 from sklearn.linear_model import LinearRegression
 from sklearn.ensemble import RandomForestRegressor
-from synthetic_generator import SyntheticGenerator
-from signal_extractor import SignalExtractor
-from scoring_engine import LabelGenerator
 
-def train_model():
-    print("🚀 Starting Model Training Pipeline...")
-    
-    # 1. Generate Synthetic Training Data
-    print("generating synthetic applicants...")
-    gen = SyntheticGenerator()
+# Project root on the path, so `python src/model_trainer.py` resolves the src.* imports too
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.synthetic_generator import SyntheticGenerator
+from src.signal_extractor import SignalExtractor
+from src.scoring_engine import LabelGenerator
+from src.data_store import atomic_write
+
+# Mix of profiles
+TRAINING_PROFILES = [
+    ("Salaried", 80000),
+    ("Salaried", 30000),
+    ("Gig", 60000),
+    ("Gig", 20000),
+    ("Self_Employed", 150000)
+]
+
+# Rounds (one sample per profile each) per shard - fixed so results don't depend on worker count
+SHARD_ROUNDS = 50
+
+# Date the training ledgers end on (YYYY-MM-DD) unless --as-of is given: fixed, so a seed
+# reproduces the same X/y (and model) on any day
+TRAINING_AS_OF = "2026-01-01"
+
+def generate_training_shard(shard_id, n_rounds, seed, end_date):
+    """
+    Generates one shard of training data (generate -> extract -> label).
+    The shard's random stream depends only on (seed, shard_id).
+
+    Returns:
+        tuple: (X, y) as numpy arrays
+    """
+    rng = np.random.default_rng([seed, shard_id])
+    gen = SyntheticGenerator(rng=rng)
     extractor = SignalExtractor()
     labeler = LabelGenerator()
-    
-    X = []
-    y = []
-    
-    # Mix of profiles
-    profiles = [
-        ("Salaried", 80000), 
-        ("Salaried", 30000), 
-        ("Gig", 60000),
-        ("Gig", 20000),
-        ("Self_Employed", 150000)
-    ]
-    
-    for _ in range(200): # 200 * 5 = 1000 samples
-        for emp_type, base_income in profiles:
+
+    applicants = []
+    ledgers = []
+
+    for _ in range(n_rounds):
+        for emp_type, base_income in TRAINING_PROFILES:
             # Add some variance
-            income = base_income * np.random.uniform(0.8, 1.2)
-            
-            # Generate Raw Data
-            profile = gen.generate_profile("Train User", emp_type, income)
-            txns = gen.generate_transactions(profile['customer_id'], emp_type, income)
-            
-            # Extract Signals (Features)
-            signals = extractor.extract_signals(txns, profile)
-            
-            # Generate Label (Ground Truth)
-            score, _ = labeler.generate_label(signals)
-            
-            # Feature Vector (Must match MLScorer in scoring_engine.py)
-            feat_vec = [
-                signals.get('avg_monthly_inflow', 0),
-                signals.get('income_volatility', 1.0),
-                signals.get('avg_monthly_outflow', 0),
-                signals.get('net_cash_retention_ratio', 0),
-                signals.get('cash_surplus_stability', 0),
-                signals.get('bill_miss_count', 0),
-                signals.get('risky_spend_ratio', 0)
-            ]
-            
-            X.append(feat_vec)
-            y.append(score)
-            
+            income = base_income * rng.uniform(0.8, 1.2)
+
+            # Generate Raw Data (sequential IDs keep the batch ledger keys unique)
+            profile = gen.generate_profile("Train User", emp_type, income, customer_id=f"TRAIN{len(applicants):05d}")
+            txns = gen.generate_transactions(profile['customer_id'], emp_type, income, end_date=end_date)
+
+            applicants.append(profile)
+            ledgers.append(txns)
+
+    # Extract Signals (Features) for the shard in one grouped pass
+    batch = extractor.extract_batch(pd.concat(ledgers, ignore_index=True), pd.DataFrame(applicants))
+
+    # Generate Labels (Ground Truth)
+    y = labeler.generate_labels(batch)['label_score'].to_numpy()
+
+    # Feature Vector (FEATURE_COLUMNS order - the same matrix MLScorer predicts on)
+    X = batch.features
+
+    return X, y
+
+def build_training_data(n_samples=1000, seed=42, workers=None, as_of=None):
+    """
+    Generates n_samples training rows, sharded across a process pool.
+    The same seed and as_of give identical X/y for any number of workers, on any day.
+
+    Args:
+        as_of: date the ledgers end on ('YYYY-MM-DD' or datetime, default TRAINING_AS_OF)
+    """
+    n_rounds = -(-n_samples // len(TRAINING_PROFILES))
+    shard_rounds = [min(SHARD_ROUNDS, n_rounds - start) for start in range(0, n_rounds, SHARD_ROUNDS)]
+
+    # One reference date for every shard (ledgers must not depend on when or where a worker runs)
+    as_of = as_of or TRAINING_AS_OF
+    end_date = datetime.strptime(as_of, '%Y-%m-%d') if isinstance(as_of, str) else as_of
+    end_date = end_date.replace(hour=0, minute=0, second=0, microsecond=0)
+    workers = workers or os.cpu_count() or 1
+
+    args = [(shard_id, rounds, seed, end_date) for shard_id, rounds in enumerate(shard_rounds)]
+    if workers == 1 or len(args) == 1:
+        results = [generate_training_shard(*a) for a in args]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            # map() returns results in shard order
+            results = list(pool.map(generate_training_shard, *zip(*args)))
+
+    X = np.vstack([r[0] for r in results])[:n_samples]
+    y = np.concatenate([r[1] for r in results])[:n_samples]
+    return X, y
+
+def train_model(n_samples=1000, seed=42, workers=None, as_of=None):
+    print("🚀 Starting Model Training Pipeline...")
+
+    # 1. Generate Synthetic Training Data
+    as_of = as_of or TRAINING_AS_OF
+    print(f"generating {n_samples} synthetic applicants (seed {seed}, ledgers as of {as_of}) "
+          f"on {workers or os.cpu_count()} worker(s)...")
+    start = time.perf_counter()
+    X, y = build_training_data(n_samples, seed=seed, workers=workers, as_of=as_of)
+    elapsed = time.perf_counter() - start
+    print(f"Generated {len(X)} samples in {elapsed:.1f}s ({len(X) / elapsed:,.0f} samples/sec)")
+
     # 2. Train Model
     print(f"Training on {len(X)} samples...")
     # Using Linear Regression for transparency in this POC, or RF for better fit
-    model = LinearRegression() 
+    model = LinearRegression()
     model.fit(X, y)
-    
+
     score_r2 = model.score(X, y)
     print(f"✅ Model Trained. R2 Score: {score_r2:.4f}")
-    
-    # 3. Save Artifact
+
+    # 3. Save Artifact (write-then-rename: running apps hot-swap on the new file, never a half-written one)
     model_path = os.path.join(os.path.dirname(__file__), "model_v1.pkl")
-    joblib.dump(model, model_path)
+    atomic_write(model_path, lambda tmp_path: joblib.dump(model, tmp_path), fsync=True)
     print(f"💾 Model saved to: {model_path}")
 
 if __name__ == "__main__":
-    train_model()
+    parser = argparse.ArgumentParser(description="Train the Helix ML scoring model on synthetic applicants.")
+    parser.add_argument("--samples", type=int, default=1000, help="Number of synthetic training samples")
+    parser.add_argument("--seed", type=int, default=42, help="Base seed (same seed -> identical training data)")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: all cores)")
+    parser.add_argument("--as-of", default=TRAINING_AS_OF, metavar="YYYY-MM-DD",
+                        help=f"Date the synthetic ledgers end on (default: {TRAINING_AS_OF})")
+    cli_args = parser.parse_args()
+    train_model(cli_args.samples, seed=cli_args.seed, workers=cli_args.workers, as_of=cli_args.as_of)
@@ -0,0 +1,131 @@
+import re
+import numpy as np
+import pandas as pd
+
+# Free text and name:/id: terms are substring matches over these columns
+TEXT_FIELDS = {'id': 'customer_id', 'name': 'customer_name'}
+# Field-scoped filters over low-cardinality columns (case-insensitive substring of the value)
+CATEGORY_FIELDS = {'employment': 'employment_type', 'band': 'risk_band', 'status': 'status'}
+
+# field:value, field:"quoted value", "quoted phrase" or a bare word
+QUERY_TOKEN = re.compile(r'(\w+):"([^"]*)"|(\w+):(\S+)|"([^"]*)"|(\S+)')
+
+class Postings:
+    """
+    Inverted index: sorted distinct keys, and for each key an ascending slice of row positions.
+    """
+    def __init__(self, keys, rows, n_rows):
+        codes, uniques = pd.factorize(np.asarray(keys, dtype=object), sort=True)
+        # One integer sort orders by (key, row); then drop duplicate pairs
+        pairs = np.sort(codes.astype(np.int64) * max(n_rows, 1) + np.asarray(rows, dtype=np.int64))
+        pairs = pairs[np.concatenate([[True], pairs[1:] != pairs[:-1]])] if len(pairs) else pairs
+        self.keys = np.asarray(uniques, dtype=str)
+        self.rows = pairs % max(n_rows, 1)
+        self.offsets = np.searchsorted(pairs // max(n_rows, 1), np.arange(len(self.keys) + 1))
+
+    def get(self, key):
+        i = np.searchsorted(self.keys, key)
+        if i < len(self.keys) and self.keys[i] == key:
+            return self.rows[self.offsets[i]:self.offsets[i + 1]]
+        return np.array([], dtype=np.int64)
+
+class TextFieldIndex:
+    """
+    Trigram index over one text column. Every term is a substring match:
+    terms of 3+ characters intersect trigram postings and check the few candidates,
+    shorter ones (e.g. "5" or "01" from a customer id) scan the column with np.char.find.
+    """
+    def __init__(self, values):
+        values = values.reset_index(drop=True).fillna('').astype(str).str.lower()
+        self.texts = np.asarray(values.tolist(), dtype=str)
+        n_rows = len(values)
+        rows = np.arange(n_rows)
+        lengths = values.str.len().to_numpy()
+
+        gram_keys, gram_rows = [], []
+        for start in range(int(lengths.max()) - 2 if n_rows else 0):
+            has_gram = lengths >= start + 3
+            gram_keys.append(values[has_gram].str.slice(start, start + 3).to_numpy())
+            gram_rows.append(rows[has_gram])
+
+        self.grams = Postings(np.concatenate(gram_keys) if gram_keys else [], np.concatenate(gram_rows) if gram_rows else [], n_rows)
+
+    def match(self, term):
+        """
+        Returns the sorted row positions whose value contains term.
+        """
+        term = term.lower()
+        if term == '':
+            return np.arange(len(self.texts), dtype=np.int64)
+        if len(term) < 3:
+            # Too short for trigrams - scan every value
+            return np.flatnonzero(np.char.find(self.texts, term) >= 0)
+        candidates = None
+        for start in range(len(term) - 2):
+            rows = self.grams.get(term[start:start + 3])
+            candidates = rows if candidates is None else np.intersect1d(candidates, rows, assume_unique=True)
+            if len(candidates) == 0:
+                return candidates
+        if len(term) == 3:
+            return candidates
+        # Trigrams can all be present without the whole term being - check the candidates
+        return candidates[np.char.find(self.texts[candidates], term) >= 0]
+
+class CustomerSearchIndex:
+    """
+    Search index over the Customers table.
+
+    Queries are space-separated terms, all of which must match:
+        verma                free text - customer_id or customer_name contains it
+        "amit verma"         quoted phrase
+        name:amit  id:ACS01  scoped to one text field
+        employment:Gig  band:"High Risk"  status:pending   category filters
+    """
+    def __init__(self, df):
+        self.size = len(df)
+        self.text = {field: TextFieldIndex(df[col]) for field, col in TEXT_FIELDS.items() if col in df.columns}
+        # value -> rows, for each category field
+        self.categories = {}
+        for field, col in CATEGORY_FIELDS.items():
+            if col in df.columns:
+                groups = pd.Series(np.arange(len(df))).groupby(df[col].fillna('').astype(str).str.lower().to_numpy())
+                self.categories[field] = {value: rows.to_numpy() for value, rows in groups}
+
+    def search(self, query):
+        """
+        Returns:
+            np.ndarray: ascending row positions (into the indexed frame) matching every term
+        """
+        result = None
+        for field, term in self.parse(query):
+            rows = self._match_term(field, term)
+            result = rows if result is None else np.intersect1d(result, rows, assume_unique=True)
+            if len(result) == 0:
+                break
+        return np.arange(self.size, dtype=np.int64) if result is None else result
+
+    def parse(self, query):
+        """
+        Splits a query into (field, term) pairs; field is None for free text.
+        Unknown field names are treated as free text.
+        """
+        terms = []
+        for quoted_field, quoted_value, field, value, phrase, word in QUERY_TOKEN.findall(query or ''):
+            field = (quoted_field or field).lower()
+            value = quoted_value if quoted_field else value
+            if field and (field in self.text or field in self.categories):
+                terms.append((field, value))
+            elif field:
+                terms.append((None, f"{field}:{value}"))
+            else:
+                terms.append((None, phrase or word))
+        return terms
+
+    def _match_term(self, field, term):
+        if field in self.categories:
+            term = term.lower()
+            matches = [rows for value, rows in self.categories[field].items() if term in value]
+            return np.unique(np.concatenate(matches)) if matches else np.array([], dtype=np.int64)
+        fields = [field] if field else list(self.text)
+        matches = [self.text[f].match(term) for f in fields]
+        return np.unique(np.concatenate(matches)) if matches else np.array([], dtype=np.int64)
@@ -1,36 +1,23 @@
 import pandas as pd
 import numpy as np
+import json
+
+from src.transaction_categorizer import categorizer
+from src.keyword_rules import keyword_rules
+from src.signal_vector import SignalBatch, FEATURE_DEFAULTS, FEATURE_COLUMNS, FEATURE_INDEX
+from src.data_store import SPENDING_CATEGORIES, LIFESTYLE_FIELDS
 
 class SignalExtractor:
     """
     Transforms raw transaction data into interpretable financial signals.
     These signals serve as the features (X) for the ML model.
     """
+
+    ESSENTIALS = ['Groceries', 'Utilities', 'Housing', 'Financial Services', 'Health & Medical']
+    DISCRETIONARY = ['Dining & Food', 'Entertainment', 'Shopping', 'Travel & Commute']
     
     def _categorize_transaction(self, description):
-        description = description.lower()
-        if any(x in description for x in ['swiggy', 'zomato', 'restaurant', 'cafe', 'food', 'mcdonalds', 'dominos', 'dining']):
-            return 'Dining & Food'
-        elif any(x in description for x in ['uber', 'ola', 'fuel', 'petrol', 'parking', 'toll', 'irctc', 'flight', 'airline', 'travel', 'cab']):
-            return 'Travel & Commute'
-        elif any(x in description for x in ['netflix', 'spotify', 'movie', 'cinema', 'bookmyshow', 'hotstar', 'prime', 'game', 'entertainment']):
-            return 'Entertainment'
-        elif any(x in description for x in ['amazon', 'flipkart', 'myntra', 'shopping', 'retail', 'store', 'zara', 'h&m']):
-            return 'Shopping'
-        elif any(x in description for x in ['grocery', 'supermarket', 'mart', 'bigbasket', 'blinkit', 'zepto']):
-            return 'Groceries'
-        elif any(x in description for x in ['bill', 'electricity', 'water', 'gas', 'broadband', 'jio', 'airtel', 'vi ', 'bsnl', 'utilities']):
-            return 'Utilities'
-        elif any(x in description for x in ['emi', 'loan', 'finance', 'insurance', 'premium', 'sip', 'mutual fund', 'zerodha']):
-            return 'Financial Services'
-        elif any(x in description for x in ['atm', 'withdrawal', 'cash']):
-            return 'Cash Withdrawal'
-        elif any(x in description for x in ['rent', 'maintenance']):
-            return 'Housing'
-        elif any(x in description for x in ['medical', 'pharmacy', 'doctor', 'hospital', 'medicine', 'drug']):
-            return 'Health & Medical'
-        else:
-            return 'Others'
+        return categorizer.categorize(description)
 
     def extract_signals(self, transactions_df, profile):
         """
@@ -48,9 +35,13 @@ class SignalExtractor:
         transactions_df['transaction_date'] = pd.to_datetime(transactions_df['transaction_date'])
         transactions_df['month'] = transactions_df['transaction_date'].dt.to_period('M')
         
+        # Keyword flags (bill miss, risky spend, UPI, salary) in one pass over descriptions
+        flags = keyword_rules.evaluate(transactions_df['description'])
+        
         # Split Streams
         credits = transactions_df[transactions_df['transaction_direction'] == 'CREDIT']
         debits = transactions_df[transactions_df['transaction_direction'] == 'DEBIT']
+        debit_flags = flags.loc[debits.index]
         
         # 1. Income Analysis (Stability)
         if not credits.empty:
@@ -99,19 +90,13 @@ class SignalExtractor:
             cash_surplus_stability = 0.0 # Unstable or negative flow
 
         # 5. Bill Miss Count
-        # Keywords: bounce, return, penalty, late, decline
-        missed_keywords = ['bounce', 'return', 'penalty', 'late', 'decline']
-        bill_miss_count = transactions_df[
-            transactions_df['description'].str.contains('|'.join(missed_keywords), case=False, na=False) |
+        bill_miss_count = int((
+            flags['bill_miss'] |
             transactions_df['transaction_category'].str.contains('Penalty', case=False, na=False)
-        ].shape[0]
+        ).sum())
 
         # 6. Risky Spend Ratio
-        # Keywords: Dream11, Bet365, Crypto, BNPL, etc.
-        risky_keywords = ['Dream11', 'Gaming_Wallet', 'Crypto', 'Betting', 'Bet365', 'Rummy', 
-                          'Poker', 'Binance', 'Coinbase', 'Uni.Cards', 'Slice', 'Lazypay', 'Simpl']
-        
-        risky_txns = debits[debits['description'].str.contains('|'.join(risky_keywords), case=False, na=False)]
+        risky_txns = debits[debit_flags['risky_spend']]
         risky_spend_vol = risky_txns['transaction_amount'].sum()
         
         risky_spend_ratio = 0.0
@@ -140,28 +125,24 @@ class SignalExtractor:
         if not debits.empty:
             # 1. Categorization
             debits = debits.copy()
-            debits['category'] = debits['description'].apply(self._categorize_transaction)
+            debits['category'] = categorizer.categorize_series(debits['description'])
             spending_breakdown = debits.groupby('category')['transaction_amount'].sum().astype(float).to_dict()
             
             # 2. Lifestyle Logic
             total_spend = debits['transaction_amount'].sum()
             if total_spend > 0:
                 # Essential vs Discretionary
-                essentials = ['Groceries', 'Utilities', 'Housing', 'Financial Services', 'Health & Medical']
-                discretionary = ['Dining & Food', 'Entertainment', 'Shopping', 'Travel & Commute']
-                
-                essential_spend = debits[debits['category'].isin(essentials)]['transaction_amount'].sum()
-                discretionary_spend = debits[debits['category'].isin(discretionary)]['transaction_amount'].sum()
+                essential_spend = debits[debits['category'].isin(self.ESSENTIALS)]['transaction_amount'].sum()
+                discretionary_spend = debits[debits['category'].isin(self.DISCRETIONARY)]['transaction_amount'].sum()
                 
                 lifestyle_scores['essential_ratio'] = round(essential_spend / total_spend, 2)
                 lifestyle_scores['discretionary_ratio'] = round(discretionary_spend / total_spend, 2)
                 
                 # Digital Savviness (UPI usage)
-                upi_txns = debits[debits['description'].str.contains('UPI', case=False, na=False)].shape[0]
+                upi_txns = int(debit_flags['upi'].sum())
                 total_txns = debits.shape[0]
                 lifestyle_scores['digital_savviness'] = round((upi_txns / total_txns) * 100, 1) if total_txns > 0 else 0
-                
-        import json
+
         return {
             "customer_id": profile.get('customer_id'),
             "avg_monthly_inflow": avg_inflow,
@@ -177,6 +158,162 @@ class SignalExtractor:
             "lifestyle_scores": json.dumps(lifestyle_scores)      # JSON String for CSV
         }
 
+    def extract_signals_batch(self, ledger_df, profiles_df):
+        """
+        Batch version of extract_signals for many customers at once.
+
+        Args:
+            ledger_df (pd.DataFrame): Raw transaction ledger for many customers (keyed by customer_id)
+            profiles_df (pd.DataFrame): One row per customer (must contain customer_id)
+
+        Returns:
+            pd.DataFrame: One row of signals per profile, same values (and text encoding) as extract_signals
+        """
+        return self.extract_batch(ledger_df, profiles_df).to_frame()
+
+    def extract_vector(self, transactions_df, profile):
+        """
+        extract_signals as a typed SignalVector (no text encoding; feed it straight to the scorer).
+        """
+        ledger = transactions_df.assign(customer_id=profile.get('customer_id'))
+        return self.extract_batch(ledger, pd.DataFrame({'customer_id': [profile.get('customer_id')]}))[0]
+
+    def extract_batch(self, ledger_df, profiles_df):
+        """
+        Signals for many customers as a SignalBatch (feature matrix plus numeric trends/breakdowns).
+
+        All signals are computed with grouped passes over one long ledger
+        instead of one pandas pipeline per customer.
+
+        Args:
+            ledger_df (pd.DataFrame): Raw transaction ledger for many customers (keyed by customer_id)
+            profiles_df (pd.DataFrame): One row per customer (must contain customer_id)
+
+        Returns:
+            SignalBatch: one row per profile, in profile order
+        """
+        customer_ids = pd.Index(profiles_df['customer_id'], name='customer_id')
+        n_customers = len(customer_ids)
+        features = np.empty((n_customers, len(FEATURE_COLUMNS)), dtype=np.float64)
+        spending = np.full((n_customers, len(SPENDING_CATEGORIES)), np.nan)
+        lifestyle = np.full((n_customers, len(LIFESTYLE_FIELDS)), np.nan)
+
+        if ledger_df.empty:
+            features[:] = [FEATURE_DEFAULTS[col] for col in FEATURE_COLUMNS]
+            return SignalBatch(customer_ids, features, np.zeros(n_customers + 1), [], [], spending, lifestyle)
+
+        ledger = ledger_df[['customer_id', 'transaction_date', 'transaction_amount',
+                            'transaction_direction', 'transaction_category', 'description']].copy()
+        ledger['transaction_amount'] = ledger['transaction_amount'].astype(float)
+
+        # Integer month key (year * 12 + month) - cheaper to group on than Periods
+        dates = pd.to_datetime(ledger['transaction_date'])
+        ledger['month'] = dates.dt.year * 12 + dates.dt.month - 1
+
+        # Keyword flags (bill miss, risky spend, UPI, salary) in one pass over descriptions
+        flags = keyword_rules.evaluate(ledger['description'])
+
+        is_credit = ledger['transaction_direction'] == 'CREDIT'
+        is_debit = ledger['transaction_direction'] == 'DEBIT'
+        keys = ['customer_id', 'month']
+        column = FEATURE_INDEX
+
+        monthly_inflows = ledger[is_credit].groupby(keys)['transaction_amount'].sum()
+        monthly_outflows = ledger[is_debit].groupby(keys)['transaction_amount'].sum()
+
+        # 1. Income Analysis (Stability)
+        inflow_groups = monthly_inflows.groupby(level='customer_id')
+        avg_inflow = inflow_groups.mean().reindex(customer_ids, fill_value=0)
+        std_inflow = inflow_groups.std().fillna(0).reindex(customer_ids, fill_value=0)
+        has_inflow = avg_inflow > 0
+        features[:, column['avg_monthly_inflow']] = avg_inflow
+        features[:, column['income_volatility']] = np.where(has_inflow, std_inflow / avg_inflow.where(has_inflow, 1), 1.0)
+
+        # 2. Spending Hygiene
+        avg_outflow = monthly_outflows.groupby(level='customer_id').mean().reindex(customer_ids, fill_value=0)
+        features[:, column['avg_monthly_outflow']] = avg_outflow
+
+        # 3. Net Cash Retention Ratio
+        features[:, column['net_cash_retention_ratio']] = np.where(
+            has_inflow, (avg_inflow - avg_outflow) / avg_inflow.where(has_inflow, 1), 0.0)
+
+        # 4. Cash Surplus Stability (over every month with any activity)
+        active_months = pd.MultiIndex.from_frame(ledger[keys].drop_duplicates())
+        surpluses = (monthly_inflows.reindex(active_months, fill_value=0) -
+                     monthly_outflows.reindex(active_months, fill_value=0))
+        surplus_groups = surpluses.groupby(level='customer_id')
+        surplus_count = surplus_groups.size().reindex(customer_ids, fill_value=0)
+        surplus_mean = surplus_groups.mean().reindex(customer_ids, fill_value=0)
+        surplus_std = surplus_groups.std(ddof=0).fillna(0).reindex(customer_ids, fill_value=0)
+        stable = (surplus_count > 1) & (surplus_mean > 0)
+        surplus_cv = surplus_std / surplus_mean.where(stable, 1)
+        features[:, column['cash_surplus_stability']] = np.where(
+            stable, np.where(surplus_std > 0, np.maximum(0, 1 - surplus_cv), 1.0), 0.0)
+
+        # 5. Bill Miss Count
+        missed = flags['bill_miss'] | ledger['transaction_category'].str.contains('Penalty', case=False, na=False)
+        features[:, column['bill_miss_count']] = missed.groupby(ledger['customer_id']).sum().reindex(
+            customer_ids, fill_value=0)
+
+        # 6. Risky Spend Ratio
+        debits = ledger[is_debit].copy()
+        debit_flags = flags[is_debit]
+        risky_spend_vol = debits['transaction_amount'].where(debit_flags['risky_spend'], 0).groupby(
+            debits['customer_id']).sum().reindex(customer_ids, fill_value=0)
+        has_outflow = avg_outflow > 0
+        features[:, column['risky_spend_ratio']] = np.where(
+            has_outflow, risky_spend_vol / (avg_outflow.where(has_outflow, 1) * 6), 0.0)
+
+        # Trend Data: every month between first and last activity (missing months filled with 0)
+        month_span = ledger.groupby('customer_id')['month'].agg(['min', 'max'])
+        span_lengths = (month_span['max'] - month_span['min'] + 1).to_numpy()
+        span_starts = np.repeat(month_span['min'].to_numpy(), span_lengths)
+        span_offsets = np.arange(span_lengths.sum()) - np.repeat(np.cumsum(span_lengths) - span_lengths, span_lengths)
+        full_period = pd.MultiIndex.from_arrays(
+            [np.repeat(month_span.index.to_numpy(), span_lengths), span_starts + span_offsets], names=keys)
+        inflow_trends = monthly_inflows.reindex(full_period, fill_value=0).to_numpy(dtype=float)
+        outflow_trends = monthly_outflows.reindex(full_period, fill_value=0).to_numpy(dtype=float)
+
+        # Reorder the per-customer month runs into profile order (customers without activity get none)
+        span = month_span.index.get_indexer(customer_ids)
+        lengths = np.where(span >= 0, span_lengths[np.maximum(span, 0)], 0)
+        starts = np.where(span >= 0, (np.cumsum(span_lengths) - span_lengths)[np.maximum(span, 0)], 0)
+        trend_offsets = np.concatenate([[0], np.cumsum(lengths)])
+        take = np.repeat(starts, lengths) + np.arange(trend_offsets[-1]) - np.repeat(trend_offsets[:-1], lengths)
+
+        # Payment Analysis & Lifestyle Scoring
+        active = span >= 0
+        debits['category'] = categorizer.categorize_series(debits['description'])
+        category_spend = debits.groupby(['customer_id', 'category'])['transaction_amount'].sum().astype(float)
+        spend = category_spend.unstack('category').reindex(index=customer_ids, columns=SPENDING_CATEGORIES)
+        spending[active] = spend.to_numpy(dtype=np.float64)[active]
+
+        debit_groups = debits.groupby('customer_id')
+        total_spend = debit_groups['transaction_amount'].sum().reindex(customer_ids, fill_value=0).to_numpy()
+        total_txns = debit_groups.size().reindex(customer_ids, fill_value=0).to_numpy()
+        essential_spend = debits['transaction_amount'].where(
+            debits['category'].isin(self.ESSENTIALS), 0).groupby(debits['customer_id']).sum()
+        discretionary_spend = debits['transaction_amount'].where(
+            debits['category'].isin(self.DISCRETIONARY), 0).groupby(debits['customer_id']).sum()
+        upi_txns = debit_flags['upi'].groupby(debits['customer_id']).sum().reindex(customer_ids, fill_value=0).to_numpy()
+
+        # Placeholders are 0 for every active customer; ratios only where there is spend
+        field = {name: i for i, name in enumerate(LIFESTYLE_FIELDS)}
+        for name in ['stability_affinity', 'digital_savviness', 'luxury_index']:
+            lifestyle[active, field[name]] = 0
+        scored = active & (total_spend > 0)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            lifestyle[scored, field['essential_ratio']] = np.round(
+                essential_spend.reindex(customer_ids, fill_value=0).to_numpy()[scored] / total_spend[scored], 2)
+            lifestyle[scored, field['discretionary_ratio']] = np.round(
+                discretionary_spend.reindex(customer_ids, fill_value=0).to_numpy()[scored] / total_spend[scored], 2)
+        # Python round (not np.round) to keep the exact decimals extract_signals produces
+        lifestyle[scored, field['digital_savviness']] = [
+            round(float(int(upi) / int(txns)) * 100, 1) for upi, txns in zip(upi_txns[scored], total_txns[scored])]
+
+        return SignalBatch(customer_ids, features, trend_offsets, inflow_trends[take], outflow_trends[take],
+                           spending, lifestyle)
+
     def _get_empty_signals(self):
         return {
             "avg_monthly_inflow": 0, "income_volatility": 1.0, 
@@ -184,3 +321,201 @@ class SignalExtractor:
             "cash_surplus_stability": 0, "bill_miss_count": 0,
             "risky_spend_ratio": 0
         }
+
+
+class CustomerAggregates:
+    """
+    Running aggregates for one customer - everything extract_signals needs, kept as sums/counts
+    so new transactions can be folded in without the old ones.
+    Months are integer keys (year * 12 + month - 1).
+    """
+    __slots__ = ['inflows', 'outflows', 'active_months', 'bill_miss_count', 'risky_spend',
+                 'category_spend', 'upi_count']
+
+    def __init__(self):
+        self.inflows = {}        # month -> [credit sum, credit count]
+        self.outflows = {}       # month -> [debit sum, debit count]
+        self.active_months = set()
+        self.bill_miss_count = 0
+        self.risky_spend = 0.0
+        self.category_spend = {} # category -> debit sum
+        self.upi_count = 0
+
+    def to_dict(self):
+        """
+        JSON-serializable snapshot (for persisting the state between refreshes).
+        """
+        return {
+            'inflows': {str(m): v for m, v in self.inflows.items()},
+            'outflows': {str(m): v for m, v in self.outflows.items()},
+            'active_months': sorted(self.active_months),
+            'bill_miss_count': self.bill_miss_count,
+            'risky_spend': self.risky_spend,
+            'category_spend': dict(self.category_spend),
+            'upi_count': self.upi_count
+        }
+
+    @classmethod
+    def from_dict(cls, state):
+        aggregates = cls()
+        aggregates.inflows = {int(m): list(v) for m, v in state['inflows'].items()}
+        aggregates.outflows = {int(m): list(v) for m, v in state['outflows'].items()}
+        aggregates.active_months = set(state['active_months'])
+        aggregates.bill_miss_count = int(state['bill_miss_count'])
+        aggregates.risky_spend = float(state['risky_spend'])
+        aggregates.category_spend = dict(state['category_spend'])
+        aggregates.upi_count = int(state['upi_count'])
+        return aggregates
+
+
+class IncrementalSignalExtractor(SignalExtractor):
+    """
+    Keeps per-customer running aggregates (monthly inflow/outflow sums, category sums,
+    flag and UPI counts) and updates them from deltas of new transactions.
+
+    update() costs O(new rows); signals() rebuilds a customer's signals from the aggregates
+    (O(months + categories)) and matches extract_signals on the full ledger up to
+    floating-point summation order.
+    """
+    def __init__(self):
+        self.aggregates = {}
+
+    def update(self, delta_df):
+        """
+        Folds new transactions (any number of customers) into the running aggregates.
+
+        Returns:
+            list: customer_ids whose aggregates changed
+        """
+        if delta_df.empty:
+            return []
+
+        delta = delta_df[['customer_id', 'transaction_date', 'transaction_amount',
+                          'transaction_direction', 'transaction_category', 'description']].copy()
+        delta['transaction_amount'] = delta['transaction_amount'].astype(float)
+        dates = pd.to_datetime(delta['transaction_date'])
+        delta['month'] = dates.dt.year * 12 + dates.dt.month - 1
+
+        flags = keyword_rules.evaluate(delta['description'])
+        is_credit = delta['transaction_direction'] == 'CREDIT'
+        is_debit = delta['transaction_direction'] == 'DEBIT'
+        keys = ['customer_id', 'month']
+
+        # Monthly sums/counts per direction
+        for mask, attr in [(is_credit, 'inflows'), (is_debit, 'outflows')]:
+            monthly = delta[mask].groupby(keys)['transaction_amount'].agg(['sum', 'count'])
+            for (cid, month), amount, count in zip(monthly.index, monthly['sum'], monthly['count']):
+                totals = getattr(self._get(cid), attr).setdefault(int(month), [0.0, 0])
+                totals[0] += float(amount)
+                totals[1] += int(count)
+
+        for cid, month in delta[keys].drop_duplicates().itertuples(index=False, name=None):
+            self._get(cid).active_months.add(int(month))
+
+        # Flag counts and risky spend
+        missed = flags['bill_miss'] | delta['transaction_category'].str.contains('Penalty', case=False, na=False)
+        for cid, count in missed.groupby(delta['customer_id']).sum().items():
+            self._get(cid).bill_miss_count += int(count)
+
+        debits = delta[is_debit].copy()
+        debit_flags = flags[is_debit]
+        risky = debits['transaction_amount'].where(debit_flags['risky_spend'], 0).groupby(debits['customer_id']).sum()
+        for cid, amount in risky.items():
+            self._get(cid).risky_spend += float(amount)
+        for cid, count in debit_flags['upi'].groupby(debits['customer_id']).sum().items():
+            self._get(cid).upi_count += int(count)
+
+        # Category sums
+        debits['category'] = categorizer.categorize_series(debits['description'])
+        category_spend = debits.groupby(['customer_id', 'category'])['transaction_amount'].sum()
+        for (cid, category), amount in category_spend.items():
+            spend = self._get(cid).category_spend
+            spend[category] = spend.get(category, 0.0) + float(amount)
+
+        return list(pd.unique(delta['customer_id']))
+
+    def signals(self, customer_id):
+        """
+        Returns the customer's signals (same keys and formulas as extract_signals).
+        """
+        state = self.aggregates.get(customer_id)
+        if state is None or not state.active_months:
+            return self._get_empty_signals()
+
+        # 1. Income Analysis (Stability)
+        monthly_inflows = np.array([v[0] for _, v in sorted(state.inflows.items())])
+        if len(monthly_inflows):
+            avg_inflow = monthly_inflows.mean()
+            std_inflow = monthly_inflows.std(ddof=1) if len(monthly_inflows) > 1 else 0
+            income_volatility = std_inflow / avg_inflow if avg_inflow > 0 else 1.0
+        else:
+            avg_inflow = 0
+            income_volatility = 1.0
+
+        # 2. Spending Hygiene
+        monthly_outflows = np.array([v[0] for _, v in sorted(state.outflows.items())])
+        avg_outflow = monthly_outflows.mean() if len(monthly_outflows) else 0
+
+        # 3. Net Cash Retention Ratio
+        net_cash_retention_ratio = 0.0
+        if avg_inflow > 0:
+            net_cash_retention_ratio = (avg_inflow - avg_outflow) / avg_inflow
+
+        # 4. Cash Surplus Stability
+        surpluses = np.array([state.inflows.get(m, [0])[0] - state.outflows.get(m, [0])[0]
+                              for m in sorted(state.active_months)])
+        if len(surpluses) > 1 and np.mean(surpluses) > 0:
+            surplus_mean = np.mean(surpluses)
+            surplus_std = np.std(surpluses)
+            cash_surplus_stability = max(0, 1 - (surplus_std / surplus_mean)) if surplus_std > 0 else 1.0
+        else:
+            cash_surplus_stability = 0.0
+
+        # 6. Risky Spend Ratio
+        risky_spend_ratio = 0.0
+        if avg_outflow > 0:
+            risky_spend_ratio = state.risky_spend / (avg_outflow * 6)
+
+        # Trends: every month between first and last activity (missing months are 0)
+        months = range(min(state.active_months), max(state.active_months) + 1)
+        inflow_trend = [float(state.inflows.get(m, [0.0])[0]) for m in months]
+        outflow_trend = [float(state.outflows.get(m, [0.0])[0]) for m in months]
+
+        # Payment Analysis & Lifestyle Scoring
+        spending_breakdown = {c: float(v) for c, v in sorted(state.category_spend.items())}
+        lifestyle_scores = {'stability_affinity': 0, 'digital_savviness': 0, 'luxury_index': 0}
+        total_spend = sum(spending_breakdown.values())
+        total_txns = sum(v[1] for v in state.outflows.values())
+        if total_txns > 0 and total_spend > 0:
+            essential_spend = sum(v for c, v in spending_breakdown.items() if c in self.ESSENTIALS)
+            discretionary_spend = sum(v for c, v in spending_breakdown.items() if c in self.DISCRETIONARY)
+            lifestyle_scores['essential_ratio'] = round(essential_spend / total_spend, 2)
+            lifestyle_scores['discretionary_ratio'] = round(discretionary_spend / total_spend, 2)
+            lifestyle_scores['digital_savviness'] = round((state.upi_count / total_txns) * 100, 1)
+
+        return {
+            "customer_id": customer_id,
+            "avg_monthly_inflow": avg_inflow,
+            "income_volatility": income_volatility,
+            "avg_monthly_outflow": avg_outflow,
+            "net_cash_retention_ratio": net_cash_retention_ratio,
+            "cash_surplus_stability": cash_surplus_stability,
+            "bill_miss_count": state.bill_miss_count,
+            "risky_spend_ratio": risky_spend_ratio,
+            "inflow_trend": str(inflow_trend),
+            "outflow_trend": str(outflow_trend),
+            "spending_breakdown": json.dumps(spending_breakdown),
+            "lifestyle_scores": json.dumps(lifestyle_scores)
+        }
+
+    def signals_batch(self, customer_ids):
+        """
+        Signals for several customers as a DataFrame (one row per id, in order).
+        """
+        return pd.DataFrame([{**self.signals(cid), 'customer_id': cid} for cid in customer_ids])
+
+    def _get(self, customer_id):
+        state = self.aggregates.get(customer_id)
+        if state is None:
+            state = self.aggregates[customer_id] = CustomerAggregates()
+        return state
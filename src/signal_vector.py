@@ -0,0 +1,184 @@
+import json
+import numpy as np
+import pandas as pd
+
+from src.data_store import SPENDING_CATEGORIES, LIFESTYLE_FIELDS, decode_value
+
+# Feature Vector order (Must match training order in model_trainer.py), with defaults for missing signals
+FEATURE_DEFAULTS = {
+    'avg_monthly_inflow': 0,
+    'income_volatility': 1.0,
+    'avg_monthly_outflow': 0,
+    'net_cash_retention_ratio': 0,
+    'cash_surplus_stability': 0,
+    'bill_miss_count': 0,
+    'risky_spend_ratio': 0
+}
+FEATURE_COLUMNS = list(FEATURE_DEFAULTS.keys())
+FEATURE_INDEX = {name: i for i, name in enumerate(FEATURE_COLUMNS)}
+
+# Lifestyle scores that are placeholders (always 0) and were always stored as ints
+PLACEHOLDER_LIFESTYLE = {'stability_affinity', 'luxury_index'}
+
+def _encode_breakdown(values):
+    # Same text as the extractor always wrote: categories in sorted order, floats
+    return json.dumps({category: float(values[i])
+                       for category, i in sorted((c, i) for i, c in enumerate(SPENDING_CATEGORIES))
+                       if not np.isnan(values[i])})
+
+def _encode_lifestyle(values):
+    scored = not np.isnan(values[LIFESTYLE_FIELDS.index('essential_ratio')])
+    lifestyle = {}
+    for field, value in zip(LIFESTYLE_FIELDS, values):
+        if np.isnan(value):
+            continue
+        # Unscored/placeholder fields were written as int 0
+        if field in PLACEHOLDER_LIFESTYLE or (field == 'digital_savviness' and not scored):
+            lifestyle[field] = int(value)
+        else:
+            lifestyle[field] = float(value)
+    return json.dumps(lifestyle)
+
+class SignalVector:
+    """
+    One customer's signals in typed form.
+
+    features: float64 array in FEATURE_COLUMNS order (what the model consumes)
+    inflow_trend / outflow_trend: float64 arrays of monthly totals
+    spending: float64 array over SPENDING_CATEGORIES (NaN = no spend in that category)
+    lifestyle: float64 array over LIFESTYLE_FIELDS (NaN = not scored)
+
+    get()/[] behave like the signals dict, so code written against extract_signals keeps working.
+    Text encoding happens only in to_signals() (the storage boundary).
+    """
+    __slots__ = ['customer_id', 'features', 'inflow_trend', 'outflow_trend', 'spending', 'lifestyle']
+
+    def __init__(self, customer_id, features, inflow_trend=None, outflow_trend=None, spending=None, lifestyle=None):
+        self.customer_id = customer_id
+        self.features = np.asarray(features, dtype=np.float64)
+        self.inflow_trend = np.asarray(inflow_trend if inflow_trend is not None else [], dtype=np.float64)
+        self.outflow_trend = np.asarray(outflow_trend if outflow_trend is not None else [], dtype=np.float64)
+        self.spending = np.asarray(spending, dtype=np.float64) if spending is not None \
+            else np.full(len(SPENDING_CATEGORIES), np.nan)
+        self.lifestyle = np.asarray(lifestyle, dtype=np.float64) if lifestyle is not None \
+            else np.full(len(LIFESTYLE_FIELDS), np.nan)
+
+    def get(self, name, default=None):
+        if name in FEATURE_INDEX:
+            value = self.features[FEATURE_INDEX[name]]
+            if np.isnan(value):
+                return default
+            return int(value) if name == 'bill_miss_count' else float(value)
+        if name == 'customer_id':
+            return self.customer_id
+        return default
+
+    def __getitem__(self, name):
+        value = self.get(name)
+        if value is None:
+            raise KeyError(name)
+        return value
+
+    def has_activity(self):
+        return len(self.inflow_trend) > 0
+
+    def spending_breakdown(self):
+        return {c: float(v) for c, v in zip(SPENDING_CATEGORIES, self.spending) if not np.isnan(v)}
+
+    def lifestyle_scores(self):
+        return {f: float(v) for f, v in zip(LIFESTYLE_FIELDS, self.lifestyle) if not np.isnan(v)}
+
+    def to_signals(self):
+        """
+        Encodes to the extract_signals dict (str(list) trends, JSON breakdowns) for storage.
+        """
+        signals = {'customer_id': self.customer_id}
+        for name in FEATURE_COLUMNS:
+            signals[name] = self.get(name)
+        if self.has_activity():
+            signals['inflow_trend'] = str([float(x) for x in self.inflow_trend])
+            signals['outflow_trend'] = str([float(x) for x in self.outflow_trend])
+            signals['spending_breakdown'] = _encode_breakdown(self.spending)
+            signals['lifestyle_scores'] = _encode_lifestyle(self.lifestyle)
+        return signals
+
+    @classmethod
+    def from_signals(cls, signals):
+        """
+        Decodes an extract_signals dict (or a stored row) into a SignalVector.
+        """
+        features = [signals.get(name, default) for name, default in FEATURE_DEFAULTS.items()]
+        spending = decode_value(signals.get('spending_breakdown')) or {}
+        lifestyle = decode_value(signals.get('lifestyle_scores')) or {}
+        return cls(
+            signals.get('customer_id'),
+            np.array([np.nan if v is None else v for v in features], dtype=np.float64),
+            decode_value(signals.get('inflow_trend')) or [],
+            decode_value(signals.get('outflow_trend')) or [],
+            [spending.get(c, np.nan) for c in SPENDING_CATEGORIES],
+            [lifestyle.get(f, np.nan) for f in LIFESTYLE_FIELDS]
+        )
+
+
+class SignalBatch:
+    """
+    Signals for many customers as column arrays (the batch form of SignalVector).
+
+    features: (n, 7) float64 matrix in FEATURE_COLUMNS order
+    inflow_trends / outflow_trends: all trends concatenated; customer i's months are
+                                    trend_offsets[i]:trend_offsets[i + 1]
+    spending: (n, len(SPENDING_CATEGORIES)) float64, lifestyle: (n, len(LIFESTYLE_FIELDS)) float64
+    """
+    __slots__ = ['customer_ids', 'features', 'trend_offsets', 'inflow_trends', 'outflow_trends', 'spending', 'lifestyle']
+
+    def __init__(self, customer_ids, features, trend_offsets, inflow_trends, outflow_trends, spending, lifestyle):
+        self.customer_ids = np.asarray(customer_ids, dtype=object)
+        self.features = np.asarray(features, dtype=np.float64)
+        self.trend_offsets = np.asarray(trend_offsets, dtype=np.int64)
+        self.inflow_trends = np.asarray(inflow_trends, dtype=np.float64)
+        self.outflow_trends = np.asarray(outflow_trends, dtype=np.float64)
+        self.spending = np.asarray(spending, dtype=np.float64)
+        self.lifestyle = np.asarray(lifestyle, dtype=np.float64)
+
+    def __len__(self):
+        return len(self.customer_ids)
+
+    def __getitem__(self, i):
+        start, end = self.trend_offsets[i], self.trend_offsets[i + 1]
+        return SignalVector(self.customer_ids[i], self.features[i], self.inflow_trends[start:end],
+                            self.outflow_trends[start:end], self.spending[i], self.lifestyle[i])
+
+    def feature(self, name):
+        """
+        One feature column (float64 array).
+        """
+        return self.features[:, FEATURE_INDEX[name]]
+
+    def to_frame(self):
+        """
+        Encodes to the extract_signals_batch DataFrame (text trends and breakdowns) for storage.
+        Customers without any transactions get NaN trends/breakdowns.
+        """
+        frame = pd.DataFrame({'customer_id': self.customer_ids})
+        for name in FEATURE_COLUMNS:
+            frame[name] = self.feature(name)
+        frame['bill_miss_count'] = frame['bill_miss_count'].astype(int)
+
+        inflow, outflow, spending, lifestyle = [], [], [], []
+        for i in range(len(self)):
+            start, end = self.trend_offsets[i], self.trend_offsets[i + 1]
+            if start == end:
+                inflow.append(np.nan)
+                outflow.append(np.nan)
+                spending.append(np.nan)
+                lifestyle.append(np.nan)
+                continue
+            inflow.append(str(self.inflow_trends[start:end].tolist()))
+            outflow.append(str(self.outflow_trends[start:end].tolist()))
+            spending.append(_encode_breakdown(self.spending[i]))
+            lifestyle.append(_encode_lifestyle(self.lifestyle[i]))
+        frame['inflow_trend'] = inflow
+        frame['outflow_trend'] = outflow
+        frame['spending_breakdown'] = spending
+        frame['lifestyle_scores'] = lifestyle
+        return frame
@@ -0,0 +1,140 @@
+import numpy as np
+import pandas as pd
+
+from src.keyword_rules import keyword_rules
+
+DEFAULT_HORIZONS = (30, 90, 180, 365)
+
+# Signals computed for every horizon (same definitions as SignalExtractor.extract_signals)
+WINDOW_SIGNALS = ['avg_monthly_inflow', 'income_volatility', 'avg_monthly_outflow', 'net_cash_retention_ratio',
+                  'cash_surplus_stability', 'bill_miss_count', 'risky_spend_ratio']
+
+def horizon_months(days):
+    """
+    Whole calendar months covered by a horizon in days (30 -> 1, 90 -> 3, 180 -> 6, 365 -> 12).
+    """
+    return max(int(round(days / 30.4375)), 1)
+
+class RollingSignalEngine:
+    """
+    Computes the signal family over several look-back horizons in one pass.
+
+    The ledger is aggregated once into a (customer x months-ago) grid of monthly sums,
+    counts and sums of squares. Cumulative sums along the month axis then give every
+    window's totals by indexing, so extra horizons cost almost nothing.
+    The squares are taken of each month's deviation from the customer's latest month
+    (shifted data), so variances keep their precision at rupee magnitudes and constant
+    flows come out exactly stable, like extract_signals.
+    Horizons are rounded to whole calendar months ending at the as-of month.
+
+    Output columns are '<signal>_<days>d', e.g. income_volatility_90d. risky_spend_ratio
+    divides by the window's month count (extract_signals assumes 6).
+    """
+    def __init__(self, horizons=DEFAULT_HORIZONS):
+        self.horizons = list(horizons)
+        self.months = {h: horizon_months(h) for h in self.horizons}
+
+    def extract(self, ledger_df, customer_ids=None, as_of=None):
+        """
+        Args:
+            ledger_df (pd.DataFrame): Raw transaction ledger for many customers
+            customer_ids: customers to report, in order (default: every customer in the ledger)
+            as_of: reference date; windows end at its month (default: latest transaction)
+
+        Returns:
+            pd.DataFrame: customer_id plus one column per (signal, horizon)
+        """
+        if customer_ids is None:
+            customer_ids = pd.unique(ledger_df['customer_id'])
+        customer_ids = pd.Index(customer_ids, name='customer_id')
+        n_customers, n_months = len(customer_ids), max(self.months.values())
+
+        ledger = ledger_df[['customer_id', 'transaction_date', 'transaction_amount',
+                            'transaction_direction', 'transaction_category', 'description']]
+        dates = pd.to_datetime(ledger['transaction_date'])
+        months = (dates.dt.year * 12 + dates.dt.month - 1).to_numpy()
+        as_of = pd.Timestamp(as_of) if as_of is not None else dates.max()
+        months_ago = (as_of.year * 12 + as_of.month - 1) - months if len(ledger) else months
+
+        # Rows inside the longest window, for customers we report on
+        rows = customer_ids.get_indexer(ledger['customer_id'])
+        keep = (rows >= 0) & (months_ago >= 0) & (months_ago < n_months)
+        cell = rows[keep] * n_months + months_ago[keep]
+
+        amounts = ledger['transaction_amount'].to_numpy(dtype=float)[keep]
+        is_credit = (ledger['transaction_direction'] == 'CREDIT').to_numpy()[keep]
+        is_debit = (ledger['transaction_direction'] == 'DEBIT').to_numpy()[keep]
+        flags = keyword_rules.evaluate(ledger['description'][keep])
+        missed = (flags['bill_miss'] | ledger['transaction_category'][keep].str.contains(
+            'Penalty', case=False, na=False)).to_numpy()
+        risky = flags['risky_spend'].to_numpy() & is_debit
+
+        def grid(weights):
+            return np.bincount(cell, weights=weights, minlength=n_customers * n_months).reshape(n_customers, n_months)
+
+        # Monthly aggregates (customer x months-ago)
+        inflow = grid(np.where(is_credit, amounts, 0.0))
+        outflow = grid(np.where(is_debit, amounts, 0.0))
+        has_inflow = grid(is_credit.astype(float)) > 0
+        has_outflow = grid(is_debit.astype(float)) > 0
+        active = grid(np.ones(len(cell))) > 0
+        surplus = np.where(active, inflow - outflow, 0.0)
+
+        def shifted(values, mask):
+            # Deviation of every counted month from the customer's most recent counted month
+            latest = values[np.arange(len(values)), mask.argmax(axis=1)]
+            return np.where(mask, values - latest[:, np.newaxis], 0.0)
+
+        in_dev = shifted(inflow, has_inflow)
+        surplus_dev = shifted(surplus, active)
+
+        # Cumulative along the month axis: column k-1 holds the k-month window totals
+        cum = {name: np.cumsum(values, axis=1) for name, values in {
+            'n_in': has_inflow.astype(float), 'in': inflow, 'in_dev': in_dev, 'in_dev_sq': in_dev ** 2,
+            'n_out': has_outflow.astype(float), 'out': outflow,
+            'n_active': active.astype(float), 'surplus': surplus,
+            'surplus_dev': surplus_dev, 'surplus_dev_sq': surplus_dev ** 2,
+            'bill_miss': grid(missed.astype(float)), 'risky': grid(np.where(risky, amounts, 0.0))
+        }.items()}
+
+        signals = pd.DataFrame({'customer_id': customer_ids})
+        with np.errstate(divide='ignore', invalid='ignore'):
+            for horizon in self.horizons:
+                k = self.months[horizon] - 1
+                window = {name: values[:, k] for name, values in cum.items()}
+
+                # 1. Income Analysis (sample std over months with credits)
+                n_in = window['n_in']
+                avg_inflow = np.where(n_in > 0, window['in'] / n_in, 0.0)
+                var_inflow = (window['in_dev_sq'] - window['in_dev'] ** 2 / n_in) / (n_in - 1)
+                std_inflow = np.where(n_in > 1, np.sqrt(np.maximum(var_inflow, 0)), 0.0)
+                income_volatility = np.where(avg_inflow > 0, std_inflow / avg_inflow, 1.0)
+
+                # 2. Spending Hygiene
+                n_out = window['n_out']
+                avg_outflow = np.where(n_out > 0, window['out'] / n_out, 0.0)
+
+                # 3. Net Cash Retention Ratio
+                net_cash_retention_ratio = np.where(avg_inflow > 0, (avg_inflow - avg_outflow) / avg_inflow, 0.0)
+
+                # 4. Cash Surplus Stability (population std over active months)
+                n_active = window['n_active']
+                surplus_mean = window['surplus'] / n_active
+                surplus_shift = window['surplus_dev'] / n_active
+                surplus_std = np.sqrt(np.maximum(window['surplus_dev_sq'] / n_active - surplus_shift ** 2, 0))
+                stable = (n_active > 1) & (surplus_mean > 0)
+                cash_surplus_stability = np.where(
+                    stable, np.where(surplus_std > 0, np.maximum(0, 1 - surplus_std / surplus_mean), 1.0), 0.0)
+
+                # 6. Risky Spend Ratio (against the window's total outflow)
+                risky_spend_ratio = np.where(avg_outflow > 0, window['risky'] / (avg_outflow * (k + 1)), 0.0)
+
+                for name, values in [('avg_monthly_inflow', avg_inflow), ('income_volatility', income_volatility),
+                                     ('avg_monthly_outflow', avg_outflow),
+                                     ('net_cash_retention_ratio', net_cash_retention_ratio),
+                                     ('cash_surplus_stability', cash_surplus_stability),
+                                     ('bill_miss_count', window['bill_miss'].astype(int)),
+                                     ('risky_spend_ratio', risky_spend_ratio)]:
+                    signals[f"{name}_{horizon}d"] = values
+
+        return signals
@@ -3,23 +3,29 @@ import numpy as np
 import uuid
 from datetime import datetime, timedelta
 
+TXN_COLUMNS = ['customer_id', 'transaction_date', 'transaction_amount', 'transaction_direction',
+               'transaction_category', 'transaction_channel', 'description']
+
 class SyntheticGenerator:
-    def __init__(self):
+    def __init__(self, rng=None):
+        # Default random source for profiles, ledgers and silent data (pass a seeded np.random.Generator for reproducible runs)
+        self.rng = rng if rng is not None else np.random.default_rng()
         self.categories = {
             'essential': ['Groceries', 'Utilities', 'Rent', 'Medical', 'Fuel'],
             'discretionary': ['Dining', 'Entertainment', 'Shopping', 'Travel'],
             'income': ['Salary', 'Freelance Payment', 'Transfer In', 'Interest']
         }
 
-    def generate_profile(self, name, emp_type, income, customer_id=None):
+    def generate_profile(self, name, emp_type, income, customer_id=None, rng=None):
         """Creates a customer profile, optionally with a specific ID."""
-        cid = customer_id if customer_id else str(uuid.uuid4())[:8]
+        rng = rng if rng is not None else self.rng
+        cid = customer_id if customer_id else str(uuid.UUID(bytes=rng.bytes(16)))[:8]
         return {
             'customer_id': cid,
             'customer_name': name,
             'employment_type': emp_type,
             'declared_monthly_income': float(income),
-            'city_tier': np.random.choice(['Tier 1', 'Tier 2', 'Tier 3']),
+            'city_tier': str(rng.choice(['Tier 1', 'Tier 2', 'Tier 3'])),
             'application_date': datetime.now().strftime('%Y-%m-%d')
         }
 
@@ -38,16 +44,28 @@ class SyntheticGenerator:
         
         # Let's update the signature to accept 'name' as well for scenario injection.
     
-    def generate_transactions(self, customer_id, emp_type, income, name=""):
+    def generate_transactions(self, customer_id, emp_type, income, name="", rng=None, end_date=None):
         """
         Generates 6 months of raw transaction ledger data.
         Uses predefined behavioral personas for demo simulation only.
+        
+        All daily random events for the 180-day window are drawn as arrays and
+        the ledger columns are built directly (no per-day Python loop).
+        
+        Args:
+            rng (np.random.Generator): Random source (defaults to the generator's own rng)
+            end_date (datetime): Last ledger day (defaults to today)
         """
-        end_date = datetime.now()
+        rng = rng if rng is not None else self.rng
+        end_date = end_date if end_date is not None else datetime.now()
         start_date = end_date - timedelta(days=180)
         
-        txns = []
-        current_date = start_date
+        # Calendar for the window (one entry per day, inclusive)
+        days = pd.date_range(start=start_date.date(), periods=181, freq='D')
+        n_days = len(days)
+        day_of_month = days.day.to_numpy()
+        month = days.month.to_numpy()
+        day_idx = np.arange(n_days)
         
         # Predefined behavioral personas for demo simulation
         name_lower = name.lower()
@@ -61,97 +79,103 @@ class SyntheticGenerator:
         # Scenario 5: Multi-Bank/Aggregation (Patel)
         is_sc5_patel = "patel" in name_lower
         
-        # Monthly fixed patterns
-        while current_date <= end_date:
-            # 1. Income Generation
-            if is_sc3_devi:
-                # Scenario 3: Kirana Store (Shadow Income) - Many small UPI credits
-                if np.random.random() < 0.9: # Almost everyday
-                    credits_count = np.random.randint(5, 12)
-                    for _ in range(credits_count):
-                        amt = np.random.uniform(100, 2000)
-                        txns.append(self._create_txn(customer_id, current_date, amt, 'CREDIT', 'UPI Transfer', 'UPI', 'UPI Credit: Customer Payment'))
-            
-            elif is_sc4_singh:
-                # Scenario 4: Fraud/Ghost - Minimal/No valid income despite claim
-                if current_date.day == 15 and np.random.random() < 0.2: # Very rare
-                    txns.append(self._create_txn(customer_id, current_date, 5000, 'CREDIT', 'Cash Deposit', 'Branch', 'Cash Deposit Self'))
-            
-            elif is_sc5_patel:
-                # Scenario 5: Multi-Bank Aggregation
-                # Split income into two banks
-                if current_date.day == 1:
-                    txns.append(self._create_txn(customer_id, current_date, income * 0.6, 'CREDIT', 'Salary', 'HDFC Bank', 'Salary Credit: Tech Corp (HDFC)'))
-                if current_date.day == 3:
-                     txns.append(self._create_txn(customer_id, current_date, income * 0.4, 'CREDIT', 'Salary', 'SBI Bank', 'Salary Credit: Tech Corp (SBI)'))
-                     
-            elif emp_type == 'Salaried':
-                # Scenario 1 & 2
-                if current_date.day == 1:
-                    base_amt = income
-                    if is_sc1_verma:
-                        # Add Incentive/Bonus every quarter
-                        if current_date.month % 3 == 0:
-                            txns.append(self._create_txn(customer_id, current_date, 15000, 'CREDIT', 'Performance Bonus', 'Bank Transfer', 'Salary Bonus Qtrly'))
-                    
-                    txns.append(self._create_txn(customer_id, current_date, base_amt, 'CREDIT', 'Salary', 'Bank Transfer', 'Salary Credit: Tech Solutions Ltd'))
-            
-            else:
-                # Gig/Self-Employed (Standard)
-                if np.random.random() < 0.3: 
-                    amt = income * np.random.uniform(0.1, 0.4)
-                    txns.append(self._create_txn(customer_id, current_date, amt, 'CREDIT', 'Freelance Payment', 'UPI', 'UPI Credit: Client Payout'))
-
-            # 2. Expenses & Risky Behavior
-            if is_sc2_khan:
-                # Scenario 2: Hidden Risk (Gambling + BNPL)
-                if current_date.day == 10:
-                    txns.append(self._create_txn(customer_id, current_date, 4000, 'DEBIT', 'BNPL_EMI_Afterpay', 'Auto-Debit', 'Afterpay EMI Installment'))
-                    txns.append(self._create_txn(customer_id, current_date, 4000, 'DEBIT', 'BNPL_EMI_Simpl', 'Auto-Debit', 'Simpl Pay Later Bill'))
-                
-                if np.random.random() < 0.4:
-                     txns.append(self._create_txn(customer_id, current_date, np.random.uniform(500, 2000), 'DEBIT', 'Gaming_Wallet_Dream11', 'UPI', 'Dream11 Add Money'))
+        # Each block is one kind of transaction; 'slot' keeps the within-day order stable
+        blocks = []
+        def add(slot, days_hit, amounts, direction, cat, channel, desc):
+            blocks.append((slot, days_hit, np.broadcast_to(amounts, days_hit.shape), direction, cat, channel, desc))
+        
+        # 1. Income Generation
+        if is_sc3_devi:
+            # Scenario 3: Kirana Store (Shadow Income) - Many small UPI credits
+            active = rng.random(n_days) < 0.9 # Almost everyday
+            credits_count = np.where(active, rng.integers(5, 12, n_days), 0)
+            credit_days = np.repeat(day_idx, credits_count)
+            add(0, credit_days, rng.uniform(100, 2000, len(credit_days)), 'CREDIT', 'UPI Transfer', 'UPI', 'UPI Credit: Customer Payment')
+        
+        elif is_sc4_singh:
+            # Scenario 4: Fraud/Ghost - Minimal/No valid income despite claim
+            deposit_days = day_idx[(day_of_month == 15) & (rng.random(n_days) < 0.2)] # Very rare
+            add(0, deposit_days, 5000, 'CREDIT', 'Cash Deposit', 'Branch', 'Cash Deposit Self')
+        
+        elif is_sc5_patel:
+            # Scenario 5: Multi-Bank Aggregation
+            # Split income into two banks
+            add(0, day_idx[day_of_month == 1], income * 0.6, 'CREDIT', 'Salary', 'HDFC Bank', 'Salary Credit: Tech Corp (HDFC)')
+            add(0, day_idx[day_of_month == 3], income * 0.4, 'CREDIT', 'Salary', 'SBI Bank', 'Salary Credit: Tech Corp (SBI)')
+        
+        elif emp_type == 'Salaried':
+            # Scenario 1 & 2
+            if is_sc1_verma:
+                # Add Incentive/Bonus every quarter
+                bonus_days = day_idx[(day_of_month == 1) & (month % 3 == 0)]
+                add(0, bonus_days, 15000, 'CREDIT', 'Performance Bonus', 'Bank Transfer', 'Salary Bonus Qtrly')
+            add(1, day_idx[day_of_month == 1], income, 'CREDIT', 'Salary', 'Bank Transfer', 'Salary Credit: Tech Solutions Ltd')
+        
+        else:
+            # Gig/Self-Employed (Standard)
+            payout_days = day_idx[rng.random(n_days) < 0.3]
+            add(0, payout_days, income * rng.uniform(0.1, 0.4, len(payout_days)), 'CREDIT', 'Freelance Payment', 'UPI', 'UPI Credit: Client Payout')
+        
+        # 2. Expenses & Risky Behavior
+        if is_sc2_khan:
+            # Scenario 2: Hidden Risk (Gambling + BNPL)
+            bnpl_days = day_idx[day_of_month == 10]
+            add(2, bnpl_days, 4000, 'DEBIT', 'BNPL_EMI_Afterpay', 'Auto-Debit', 'Afterpay EMI Installment')
+            add(3, bnpl_days, 4000, 'DEBIT', 'BNPL_EMI_Simpl', 'Auto-Debit', 'Simpl Pay Later Bill')
             
+            wallet_days = day_idx[rng.random(n_days) < 0.4]
+            add(4, wallet_days, rng.uniform(500, 2000, len(wallet_days)), 'DEBIT', 'Gaming_Wallet_Dream11', 'UPI', 'Dream11 Add Money')
+        
+        if not is_sc4_singh:
             # Standard Expense Noise
-            if not is_sc4_singh and np.random.random() < 0.6:
-                cat = np.random.choice(self.categories['essential'] + self.categories['discretionary'])
-                amt = np.random.uniform(50, 5000)
-                txns.append(self._create_txn(customer_id, current_date, amt, 'DEBIT', cat, 'UPI', f'UPI Debit: {cat} Merchant'))
+            spend_days = day_idx[rng.random(n_days) < 0.6]
+            expense_cats = np.array(self.categories['essential'] + self.categories['discretionary'], dtype=object)
+            cats = expense_cats[rng.integers(0, len(expense_cats), len(spend_days))]
+            add(5, spend_days, rng.uniform(50, 5000, len(spend_days)), 'DEBIT', cats, 'UPI',
+                'UPI Debit: ' + cats + ' Merchant')
             
             # Rent/Bills
-            if not is_sc4_singh and current_date.day == 5:
-                rent = income * 0.3
-                txns.append(self._create_txn(customer_id, current_date, rent, 'DEBIT', 'Rent', 'Bank Transfer', 'Rent Transfer'))
-                
-            current_date += timedelta(days=1)
-            
-        return pd.DataFrame(txns)
-
-    def _create_txn(self, cid, date, amount, direction, cat, channel, desc):
-        return {
-            'customer_id': cid,
-            'transaction_date': date.strftime('%Y-%m-%d'),
-            'transaction_amount': round(amount, 2),
-            'transaction_direction': direction,
-            'transaction_category': cat,
-            'transaction_channel': channel,
-            'description': desc # Added for Signal Extractor compatibility
-        }
+            add(6, day_idx[day_of_month == 5], income * 0.3, 'DEBIT', 'Rent', 'Bank Transfer', 'Rent Transfer')
+        
+        blocks = [b for b in blocks if len(b[1])]
+        if not blocks:
+            # Typed empty ledger (keeps transaction_amount numeric when ledgers are concatenated)
+            return pd.DataFrame({c: pd.Series(dtype=float if c == 'transaction_amount' else object) for c in TXN_COLUMNS})
+        
+        def column(i):
+            return np.concatenate([np.broadcast_to(np.asarray(b[i], dtype=object), b[1].shape) for b in blocks])
+        
+        txn_days = np.concatenate([b[1] for b in blocks])
+        slots = np.concatenate([np.full(len(b[1]), b[0]) for b in blocks])
+        order = np.lexsort((slots, txn_days)) # Chronological, stable within a day
+        
+        date_strings = days.strftime('%Y-%m-%d').to_numpy()
+        txns = pd.DataFrame({
+            'customer_id': customer_id,
+            'transaction_date': date_strings[txn_days[order]],
+            'transaction_amount': np.round(np.concatenate([b[2] for b in blocks]).astype(float)[order], 2),
+            'transaction_direction': column(3)[order],
+            'transaction_category': column(4)[order],
+            'transaction_channel': column(5)[order],
+            'description': column(6)[order] # Added for Signal Extractor compatibility
+        })
+        return txns
 
-    def generate_silent_data(self, customer_id, name=""):
+    def generate_silent_data(self, customer_id, name="", rng=None):
         """
         Simulates 'Silent Data' collection from device SDKs.
         Includes Telco, Device, and App usage signals.
         """
+        rng = rng if rng is not None else self.rng
         name_lower = name.lower()
         
         # Default Probabilistic Profile
         data = {
-            'sim_age_days': np.random.randint(100, 2000),
-            'device_model': np.random.choice(['Samsung Galaxy M31', 'Redmi Note 10', 'iPhone 13', 'Vivo V20', 'Oppo A5']),
+            'sim_age_days': int(rng.integers(100, 2000)),
+            'device_model': str(rng.choice(['Samsung Galaxy M31', 'Redmi Note 10', 'iPhone 13', 'Vivo V20', 'Oppo A5'])),
             'is_rooted': False,
             'installed_apps': ['WhatsApp', 'Facebook', 'Instagram', 'Paytm', 'PhonePe', 'Uber'],
-            'geo_variance': np.random.uniform(0.1, 0.4), # Low variance = predictable (Home-Work)
+            'geo_variance': float(rng.uniform(0.1, 0.4)), # Low variance = predictable (Home-Work)
             'utility_bill_payment_history': 'Good'
         }
         
@@ -0,0 +1,62 @@
+import re
+import pandas as pd
+from functools import lru_cache
+
+# Merchant keyword rules in priority order (first matching category wins)
+CATEGORY_RULES = [
+    ('Dining & Food', ['swiggy', 'zomato', 'restaurant', 'cafe', 'food', 'mcdonalds', 'dominos', 'dining']),
+    ('Travel & Commute', ['uber', 'ola', 'fuel', 'petrol', 'parking', 'toll', 'irctc', 'flight', 'airline', 'travel', 'cab']),
+    ('Entertainment', ['netflix', 'spotify', 'movie', 'cinema', 'bookmyshow', 'hotstar', 'prime', 'game', 'entertainment']),
+    ('Shopping', ['amazon', 'flipkart', 'myntra', 'shopping', 'retail', 'store', 'zara', 'h&m']),
+    ('Groceries', ['grocery', 'supermarket', 'mart', 'bigbasket', 'blinkit', 'zepto']),
+    ('Utilities', ['bill', 'electricity', 'water', 'gas', 'broadband', 'jio', 'airtel', 'vi ', 'bsnl', 'utilities']),
+    ('Financial Services', ['emi', 'loan', 'finance', 'insurance', 'premium', 'sip', 'mutual fund', 'zerodha']),
+    ('Cash Withdrawal', ['atm', 'withdrawal', 'cash']),
+    ('Housing', ['rent', 'maintenance']),
+    ('Health & Medical', ['medical', 'pharmacy', 'doctor', 'hospital', 'medicine', 'drug']),
+]
+
+DEFAULT_CATEGORY = 'Others'
+
+
+class TransactionCategorizer:
+    """
+    Labels transaction descriptions with a spending category.
+    All keyword rules are compiled into one regex so each description is scanned once.
+    """
+    def __init__(self, rules=CATEGORY_RULES, default=DEFAULT_CATEGORY, cache_size=65536):
+        self.categories = [category for category, _ in rules]
+        self.default = default
+
+        # One named group per category, ordered by priority. Wrapping the alternation
+        # in a lookahead reports a match at every position (overlapping keywords included),
+        # and at each position the highest-priority category is tried first.
+        groups = [
+            f"(?P<c{i}>{'|'.join(re.escape(k) for k in keywords)})"
+            for i, (_, keywords) in enumerate(rules)
+        ]
+        self.pattern = re.compile('(?=' + '|'.join(groups) + ')')
+
+        # Memoize per description - UPI merchant strings repeat heavily
+        self.categorize = lru_cache(maxsize=cache_size)(self._categorize)
+
+    def _categorize(self, description):
+        best = len(self.categories)
+        for match in self.pattern.finditer(description.lower()):
+            best = min(best, int(match.lastgroup[1:]))
+            if best == 0:
+                break
+        return self.categories[best] if best < len(self.categories) else self.default
+
+    def categorize_series(self, descriptions):
+        """
+        Labels a whole description column (each distinct description is matched once).
+        """
+        if descriptions.empty:
+            return pd.Series([], index=descriptions.index, dtype=object)
+        lookup = {d: self.categorize(d) for d in descriptions.unique()}
+        return descriptions.map(lookup)
+
+
+# Built once per process and shared by all SignalExtractor instances
+categorizer = TransactionCategorizer()
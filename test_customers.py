@@ -0,0 +1,107 @@
+import sys
+import os
+import pandas as pd
+import numpy as np
+
+sys.path.append(os.getcwd())
+
+from src.search_index import CustomerSearchIndex
+from src.customer_index import CustomerIndex
+from src.customer_directory import backfill_names, display_name
+from src.data_store import get_store
+
+def make_customers(n=120):
+    names = ["Amit Verma", "Rahul Khan", "Sita Devi", "Karan Singh", "Priya Gupta", "Ravi Patel"]
+    return pd.DataFrame({
+        'customer_id': [f"ACS{i+1:03d}" for i in range(n)],
+        'customer_name': [names[i % len(names)] for i in range(n)],
+        'employment_type': ["Salaried", "Gig", "Self_Employed"] * (n // 3),
+        'risk_band': ["Low Risk", "Medium Risk", "High Risk", "High Risk"] * (n // 4)
+    })
+
+def test_search_matches_substring_scan():
+    print("Testing the customer search index against a plain substring scan...")
+
+    df = make_customers()
+    index = CustomerSearchIndex(df)
+
+    # Short fragments (below trigram length) are substrings too, not just word prefixes
+    for term in ["5", "01", "s1", "a", "an", "acs", "erm", "acs10", "ravi", "zz", "vi p"]:
+        expected = np.flatnonzero(df['customer_id'].str.lower().str.contains(term, regex=False) |
+                                  df['customer_name'].str.lower().str.contains(term, regex=False))
+        query = f'"{term}"' if " " in term else term
+        assert np.array_equal(index.search(query), expected), term
+
+    # Field scopes and filters combine with the text terms
+    rows = index.search('id:1 band:"high risk" employment:gig')
+    expected = np.flatnonzero(df['customer_id'].str.contains("1") & (df['risk_band'] == "High Risk") &
+                              (df['employment_type'] == "Gig"))
+    assert np.array_equal(rows, expected)
+
+    print("✅ Search index matches the substring scan.")
+
+def test_demo_names_agree_across_pages_and_processes():
+    print("Testing that a customer without a name gets one demo name everywhere...")
+
+    import subprocess
+
+    df = pd.DataFrame({'customer_id': ["ACS001", "ACS002", "ACS003", "ACS004"],
+                       'customer_name': [None, "Unknown", "Priya Gupta", "nan"]})
+    names = backfill_names(df.copy())['customer_name'].tolist()
+    # Scorecard (one id) and Customers page (whole table) pick the same name
+    assert [display_name(cid, name) for cid, name in zip(df['customer_id'], df['customer_name'])] == names
+    assert names[2] == "Priya Gupta"
+
+    # And it does not depend on the process's hash salt
+    code = "from src.customer_directory import display_name; print(display_name('ACS001', None))"
+    for seed in ["1", "2"]:
+        out = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True,
+                             env=dict(os.environ, PYTHONHASHSEED=seed), cwd=os.path.dirname(os.path.abspath(__file__)))
+        assert out.stdout.strip() == names[0]
+
+    print("✅ Demo names are the same on every page and in every process.")
+
+def test_customer_index_follows_store_changes(tmp_path):
+    print("Testing that the primary-key index never serves a stale customer...")
+
+    for backend in ['csv', 'parquet']:
+        store = get_store(backend, root=str(tmp_path), name=f"scored_{backend}")
+        df = make_customers(12)
+        df['credit_score'] = 600
+        store.write(df)
+
+        index = CustomerIndex(store)
+        assert index.get("ACS003")['customer_name'] == "Sita Devi"
+        assert index.get("ACS999") is None
+        assert not index.refresh()
+
+        # Appends are visible at once (from the log), updates win over the indexed row
+        store.append(pd.DataFrame({'customer_id': ["ACS013", "ACS003"], 'customer_name': ["New Customer", "Sita Devi"],
+                                   'credit_score': [710, 820]}))
+        assert index.get("ACS013")['credit_score'] == 710
+        assert index.get("ACS003")['credit_score'] == 820
+
+        # Compaction empties the log: the index must be rebuilt from the new table
+        store.compact()
+        assert store.read_log() is None
+        assert index.get("ACS003")['credit_score'] == 820
+        assert index.get("ACS013")['customer_name'] == "New Customer"
+
+        # Regeneration: same ids, same size, written straight after - another instance must see it too
+        other = CustomerIndex(store)
+        assert other.get("ACS005")['credit_score'] == 600
+        regenerated = store.read()
+        regenerated['credit_score'] = 700
+        store.write(regenerated)
+        assert other.get("ACS005")['credit_score'] == 700
+        assert index.get("ACS005")['credit_score'] == 700
+
+        # Customers removed by a regeneration are gone
+        store.write(regenerated[regenerated['customer_id'] != "ACS013"])
+        assert index.get("ACS013") is None
+
+    print("✅ Index lookups follow appends, compaction and regeneration.")
+
+if __name__ == "__main__":
+    import pytest
+    sys.exit(pytest.main([__file__, "-q"]))
@@ -0,0 +1,226 @@
+import sys
+import os
+import multiprocessing
+import pandas as pd
+import numpy as np
+
+sys.path.append(os.getcwd())
+
+from src.data_store import get_store, decode_value
+from src.id_sequence import get_id_sequence
+
+BACKENDS = ['csv', 'parquet']
+
+def make_rows(ids, score=600):
+    return pd.DataFrame({
+        'customer_id': ids,
+        'customer_name': [f"Customer {cid}" for cid in ids],
+        'credit_score': [score] * len(ids),
+        'inflow_trend': [[1000.0, 1200.5]] * len(ids)
+    })
+
+def sorted_rows(df):
+    return df.sort_values('customer_id').reset_index(drop=True)
+
+def test_append_compact_read_consistency(tmp_path):
+    print("Testing append -> compaction -> read consistency...")
+
+    for backend in BACKENDS:
+        store = get_store(backend, root=str(tmp_path), name=f"scored_{backend}")
+        store.write(make_rows(["ACS001", "ACS002", "ACS003"]))
+
+        # New rows and an update of ACS002 go to the log
+        store.append(make_rows(["ACS004", "ACS005"], score=700))
+        store.append(make_rows(["ACS002"], score=800))
+        assert len(store.read_table()) == 3
+        before = sorted_rows(store.read())
+        assert before['customer_id'].tolist() == ["ACS001", "ACS002", "ACS003", "ACS004", "ACS005"]
+        assert before['credit_score'].tolist() == [600, 800, 600, 700, 700]
+        # Nested values come back the same from the table and from the log
+        assert all(decode_value(v) == [1000.0, 1200.5] for v in before['inflow_trend'])
+
+        # Compaction folds the log in: same rows, log gone
+        assert store.compact() == 3
+        assert store.read_log() is None
+        after = sorted_rows(store.read())
+        assert after['customer_id'].tolist() == before['customer_id'].tolist()
+        assert after['credit_score'].tolist() == before['credit_score'].tolist()
+        assert sorted_rows(store.read_table())['credit_score'].tolist() == before['credit_score'].tolist()
+
+        # Nothing left to fold in
+        assert store.compact() == 0
+
+    print("✅ Reads are consistent across appends and compaction.")
+
+def test_torn_wal_record_is_recovered(tmp_path):
+    print("Testing recovery from a partially written log record...")
+
+    for backend in BACKENDS:
+        store = get_store(backend, root=str(tmp_path), name=f"scored_{backend}")
+        store.write(make_rows(["ACS001"]))
+        store.append(make_rows(["ACS002"]))
+
+        # A crash mid-append leaves half a record without its newline
+        with open(store.log_path, "a") as f:
+            f.write('{"customer_id": "ACS003", "credit_sc')
+        assert sorted_rows(store.read())['customer_id'].tolist() == ["ACS001", "ACS002"]
+
+        # The next append must not be glued onto the torn record
+        store.append(make_rows(["ACS004"]))
+        assert sorted_rows(store.read())['customer_id'].tolist() == ["ACS001", "ACS002", "ACS004"]
+
+        assert store.compact() == 2
+        assert sorted_rows(store.read())['customer_id'].tolist() == ["ACS001", "ACS002", "ACS004"]
+
+    print("✅ Torn log records are skipped and later appends survive.")
+
+def test_reads_during_compaction_see_log_rows_once(tmp_path):
+    print("Testing reads while a compaction is running or was interrupted...")
+
+    for backend in BACKENDS:
+        store = get_store(backend, root=str(tmp_path), name=f"scored_{backend}")
+        store.write(make_rows(["ACS001", "ACS002", "ACS003"]))
+        store.append(make_rows(["ACS004", "ACS005"], score=700))
+        store.append(make_rows(["ACS001"], score=800))
+        expected = ["ACS001", "ACS002", "ACS003", "ACS004", "ACS005"]
+
+        # Compaction has frozen the log but not written the table yet; appends carry on into a fresh log
+        os.replace(store.log_path, store.compacting_path)
+        store.append(make_rows(["ACS006"], score=650))
+        rows = sorted_rows(store.read())
+        assert rows['customer_id'].tolist() == expected + ["ACS006"]
+        assert rows['credit_score'].tolist() == [800, 600, 600, 700, 700, 650]
+
+        # Crash after the table was written but before the frozen log was removed
+        store._write_table(store._merge(store.read_table(), store._read_records(store.compacting_path)))
+        rows = sorted_rows(store.read())
+        assert rows['customer_id'].tolist() == expected + ["ACS006"]
+        assert rows['credit_score'].tolist() == [800, 600, 600, 700, 700, 650]
+
+        # Re-running finishes the interrupted compaction without duplicating anything
+        store.compact()
+        assert not os.path.exists(store.compacting_path)
+        assert sorted_rows(store.read())['credit_score'].tolist() == [800, 600, 600, 700, 700, 650]
+        store.compact()
+        table = sorted_rows(store.read_table())
+        assert table['customer_id'].tolist() == expected + ["ACS006"]
+
+        # Idempotent once the log is empty
+        assert store.compact() == 0
+        assert sorted_rows(store.read_table()).equals(table)
+
+    print("✅ Log rows are seen exactly once during and after compaction.")
+
+def test_background_compaction_with_concurrent_reads(tmp_path):
+    print("Testing reads racing a background compaction...")
+
+    for backend in BACKENDS:
+        store = get_store(backend, root=str(tmp_path), name=f"scored_{backend}")
+        store.write(make_rows([f"ACS{i:04d}" for i in range(500)]))
+        for i in range(0, 300, 10):
+            # Half updates of table rows, half new customers
+            store.append(make_rows([f"ACS{j:04d}" for j in range(250 + i, 260 + i)], score=750))
+
+        thread = store.compact_async()
+        while thread.is_alive():
+            rows = store.read(columns=['customer_id', 'credit_score'])
+            assert len(rows) == 550 and rows['customer_id'].is_unique
+            assert (rows['credit_score'] == 750).sum() == 300
+        thread.join()
+
+        assert store.read_log() is None
+        rows = store.read()
+        assert len(rows) == 550 and (rows['credit_score'] == 750).sum() == 300
+
+    print("✅ Reads racing a background compaction see every row once.")
+
+def test_id_sequence_seeds_and_stays_monotonic(tmp_path):
+    print("Testing the persistent id sequence...")
+
+    store = get_store('csv', root=str(tmp_path))
+    store.write(make_rows(["ACS007", "ACS012", "XYZ999"]))
+    store.append(make_rows(["ACS015"]))
+
+    # Seeded from the highest ACS id in the table and the log
+    first = get_id_sequence(store)
+    assert first.current() is None
+    assert first.next_id() == "ACS016"
+    assert first.allocate(2) == ["ACS017", "ACS018"]
+
+    # A new instance (e.g. another process) continues from the persisted counter, not from the data
+    store.append(make_rows(["ACS500"]))
+    second = get_id_sequence(store)
+    assert second.next_id() == "ACS019"
+    assert first.next_id() == "ACS020"
+    assert second.current() == 20
+
+    second.reset(3)
+    assert first.next_id() == "ACS004"
+
+    print("✅ Id sequence seeds from the data and stays monotonic.")
+
+def next_ids(root, count, out_path):
+    sequence = get_id_sequence(get_store('csv', root=root))
+    ids = [sequence.next_id() for _ in range(count)]
+    with open(out_path, "w") as f:
+        f.write("\n".join(ids))
+
+def test_concurrent_next_id_never_collides(tmp_path):
+    print("Testing concurrent id allocation from several processes...")
+
+    root = str(tmp_path)
+    get_store('csv', root=root).write(make_rows(["ACS001"]))
+
+    context = multiprocessing.get_context('fork' if 'fork' in multiprocessing.get_all_start_methods() else 'spawn')
+    outputs = [os.path.join(root, f"ids_{w}.txt") for w in range(4)]
+    workers = [context.Process(target=next_ids, args=(root, 50, out)) for out in outputs]
+    for p in workers:
+        p.start()
+    for p in workers:
+        p.join()
+        assert p.exitcode == 0
+
+    ids = []
+    for out in outputs:
+        with open(out) as f:
+            issued = f.read().split()
+        # Each process sees its own ids increase
+        assert issued == sorted(issued)
+        ids += issued
+    assert sorted(ids) == [f"ACS{n:03d}" for n in range(2, 202)]
+
+    print("✅ Concurrent allocations never collide.")
+
+def append_many(path_root, backend, worker, count):
+    store = get_store(backend, root=path_root, name=f"scored_{backend}")
+    store.compact_log_bytes = 1 << 40 # Compaction is tested separately
+    for i in range(count):
+        store.append(make_rows([f"W{worker}-{i:03d}"], score=300 + i))
+
+def test_concurrent_appends(tmp_path):
+    print("Testing concurrent appends from several processes...")
+
+    context = multiprocessing.get_context('fork' if 'fork' in multiprocessing.get_all_start_methods() else 'spawn')
+    for backend in BACKENDS:
+        root = str(tmp_path)
+        store = get_store(backend, root=root, name=f"scored_{backend}")
+        store.write(make_rows(["ACS001"]))
+
+        workers = [context.Process(target=append_many, args=(root, backend, w, 40)) for w in range(4)]
+        for p in workers:
+            p.start()
+        for p in workers:
+            p.join()
+            assert p.exitcode == 0
+
+        rows = store.read()
+        assert len(rows) == 1 + 4 * 40
+        assert rows['customer_id'].is_unique
+        store.compact()
+        assert len(store.read()) == 1 + 4 * 40
+
+    print("✅ Concurrent appends are all kept.")
+
+if __name__ == "__main__":
+    import pytest
+    sys.exit(pytest.main([__file__, "-q"]))
@@ -0,0 +1,128 @@
+import sys
+import os
+import pandas as pd
+import numpy as np
+
+sys.path.append(os.getcwd())
+
+from sklearn.linear_model import LinearRegression
+from src.explainability import Explainer, scoring_matrix
+from src.signal_vector import FEATURE_COLUMNS
+from src.data_store import get_store
+from src.explanation_store import ExplanationStore
+from src.explanation_service import ExplanationService
+
+def make_population(n=200, seed=5):
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame(rng.normal(size=(n, len(FEATURE_COLUMNS))), columns=FEATURE_COLUMNS)
+    df['customer_id'] = [f"ACS{i+1:03d}" for i in range(n)]
+    model = LinearRegression().fit(df[FEATURE_COLUMNS].to_numpy(), rng.normal(650, 80, size=n))
+    df['credit_score'] = model.predict(df[FEATURE_COLUMNS].to_numpy())
+    return df, model
+
+def test_linear_explanations_are_exact():
+    print("Testing closed-form linear explanations...")
+
+    df, model = make_population()
+    explainer = Explainer(df=df, model=model)
+    explainer.fit()
+    assert explainer.method == 'linear'
+
+    # Contributions plus the base value reproduce every prediction
+    predictions = model.predict(scoring_matrix(df))
+    assert np.allclose(explainer.base_value + explainer.impacts.sum(axis=1), predictions, rtol=0, atol=1e-9)
+
+    print("✅ Linear explanations add up to the model output.")
+
+def test_batch_explanations_match_single():
+    print("Testing batch top-k explanations against the per-customer path...")
+
+    df, model = make_population()
+    # Shuffled, non-default index: lookups must go by id, not by label
+    explainer = Explainer(df=df.sample(frac=1, random_state=0).set_index('customer_id', drop=False), model=model)
+
+    customer_ids = ["ACS010", "ACS001", "MISSING", "ACS150"]
+    batch = explainer.get_explanations(customer_ids, top_k=3)
+    assert list(pd.unique(batch['customer_id'])) == ["ACS010", "ACS001", "ACS150"]
+
+    for cid in ["ACS010", "ACS001", "ACS150"]:
+        single = explainer.get_explanation_for_customer(cid)['contributions'][:3]
+        rows = batch[batch['customer_id'] == cid]
+        assert rows['feature'].tolist() == [c['feature'] for c in single]
+        assert np.allclose(rows['impact'], [c['impact'] for c in single])
+
+    print("✅ Batch explanations match the per-customer path.")
+
+class NoModelScorer:
+    # No scoring model loaded -> surrogate SHAP path
+    model = None
+    model_info = None
+
+def test_background_explanations_match_sync(tmp_path):
+    print("Testing chunked background explanations against the synchronous surrogate...")
+
+    root = str(tmp_path)
+    df, _ = make_population(n=300)
+    df['declared_monthly_income'] = df['avg_monthly_inflow'] * 1000 + 50000
+    df['income_volatility'] = df['income_volatility'].abs()
+    store = get_store('csv', root=root)
+    store.write(df)
+
+    service = ExplanationService(explanations=ExplanationStore(root=os.path.join(root, "explanations")),
+                                 workers=2, chunk_rows=64)
+    version = service.submit(store, NoModelScorer())
+    assert service.wait(version, timeout=120)['state'] == 'ready'
+    assert service.jobs == {}
+    service.shutdown()
+
+    explainer = Explainer(df=store.read_table())
+    explainer.train_surrogate_model()
+    published = service.explanations.load(version)
+    assert published.method == 'surrogate'
+    assert np.allclose(np.asarray(published.shap_values), explainer.impacts, atol=1e-6)
+
+    print("✅ Background explanations match the synchronous path.")
+
+class LinearScorer:
+    model_info = None
+    def __init__(self, model):
+        self.model = model
+
+def test_background_job_keys_on_the_table_it_read(tmp_path):
+    print("Testing that a queued job publishes under the version of the table it explained...")
+
+    import threading
+    from src.explanation_store import data_version_key
+
+    root = str(tmp_path)
+    df, model = make_population(n=120)
+    store = get_store('csv', root=root)
+    store.write(df)
+    scorer = LinearScorer(model)
+
+    service = ExplanationService(explanations=ExplanationStore(root=os.path.join(root, "explanations")), workers=1)
+    # Hold the job queue so the table can change between submit and run
+    gate = threading.Event()
+    service._job_pool.submit(gate.wait)
+    submitted = service.submit(store, scorer)
+    assert service.status(submitted)['state'] == 'queued'
+
+    store.write(df.iloc[:100])
+    current = data_version_key(store, scorer)
+    assert current != submitted
+    gate.set()
+    service.wait(submitted, timeout=60)
+
+    # Published for the table it read; the finished job is not kept around
+    assert not service.explanations.has(submitted)
+    assert len(service.explanations.load(current)) == 100
+    assert service.jobs == {}
+    assert service.submit(store, scorer) == current and service.status(current)['state'] == 'ready'
+    assert service.get(current, "ACS001") is not None
+    service.shutdown()
+
+    print("✅ Jobs publish under the table they read and are dropped when done.")
+
+if __name__ == "__main__":
+    import pytest
+    sys.exit(pytest.main([__file__, "-q"]))
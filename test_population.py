@@ -0,0 +1,264 @@
+import sys
+import os
+import pandas as pd
+import numpy as np
+
+sys.path.append(os.getcwd())
+
+from src.synthetic_generator import SyntheticGenerator
+from src.signal_extractor import SignalExtractor
+from src.scoring_engine import MLScorer, LabelGenerator, score_population
+from src.artifact_store import ArtifactStore, rescore_from_artifacts, row_stamp, row_stamps
+
+def make_ledgers(n=4, seed=17):
+    gen = SyntheticGenerator(rng=np.random.default_rng(seed))
+    emp_types = ["Salaried", "Self_Employed", "Gig", "Salaried"]
+    profiles = pd.DataFrame({'customer_id': [f"ACS{i+1:03d}" for i in range(n)]})
+    ledger = pd.concat([gen.generate_transactions(cid, emp_types[i % len(emp_types)], 50000, name="Ravi Patel")
+                        for i, cid in enumerate(profiles['customer_id'])], ignore_index=True)
+    return ledger, profiles
+
+def test_artifacts_round_trip_rescore(tmp_path):
+    print("Testing save -> load -> rescore through the artifact store...")
+
+    ledger, profiles = make_ledgers()
+    extractor = SignalExtractor()
+    scorer = MLScorer()
+    labeler = LabelGenerator()
+    batch = extractor.extract_batch(ledger, profiles)
+
+    artifacts = ArtifactStore(root=str(tmp_path))
+    artifacts.save_batch(ledger, batch)
+    assert all(artifacts.has(cid) for cid in profiles['customer_id'])
+
+    # Stored ledgers come back unchanged
+    loaded = artifacts.load_ledgers(profiles['customer_id'])
+    assert len(loaded) == len(ledger)
+    assert np.allclose(loaded['transaction_amount'], ledger['transaction_amount'])
+
+    # Re-extracting from them reproduces the signals and scores (customers without artifacts are skipped)
+    rescored = rescore_from_artifacts(list(profiles['customer_id']) + ["ACS999"], artifacts, scorer=scorer, labeler=labeler)
+    expected = batch.to_frame()
+    scores = score_population(batch, scorer, labeler)
+    assert rescored['customer_id'].tolist() == profiles['customer_id'].tolist()
+    assert np.allclose(rescored['income_volatility'], expected['income_volatility'], rtol=1e-12)
+    assert rescored['credit_score'].tolist() == scores['credit_score'].tolist()
+    assert rescored['discipline_score'].tolist() == scores['discipline_score'].tolist()
+
+    print("✅ Stored ledgers re-score like the original extraction.")
+
+def test_migration_rescores_from_stored_ledgers(tmp_path):
+    print("Testing that the migration re-extracts customers with stored ledgers...")
+
+    from migrate_data import migrate
+
+    ledger, profiles = make_ledgers()
+    extractor = SignalExtractor()
+    scorer = MLScorer()
+    batch = extractor.extract_batch(ledger, profiles)
+
+    # The stored population has a stale signal for ACS001 and ACS002; only their ledgers know better
+    population = batch.to_frame()
+    population = pd.concat([population, score_population(batch, scorer)], axis=1)
+    population['customer_name'] = "Ravi Patel"
+    population.loc[[0, 1], 'income_volatility'] = 5.0
+    input_path = str(tmp_path / "population.csv")
+    population.to_csv(input_path, index=False)
+
+    artifacts = ArtifactStore(root=str(tmp_path / "artifacts"))
+    artifacts.save("ACS001", ledger[ledger['customer_id'] == "ACS001"], batch[0], stamp=row_stamp(population.iloc[0]))
+    # ACS002's artifacts belong to whoever held the id before (another name): not used
+    previous_owner = population.iloc[1].copy()
+    previous_owner['customer_name'] = "Sita Devi"
+    artifacts.save("ACS002", ledger[ledger['customer_id'] == "ACS002"], batch[1], stamp=row_stamp(previous_owner))
+
+    result = migrate(input_path, backend='csv', scorer=scorer, artifacts=artifacts)
+    assert result['from_ledgers'] == 1
+    migrated = pd.read_csv(result['output'])
+    assert np.isclose(migrated['income_volatility'].iat[0], batch.feature('income_volatility')[0])
+    assert migrated['income_volatility'].iat[1] == 5.0
+    assert migrated['credit_score'].iat[0] == population['credit_score'].iat[0]
+
+    print("✅ Customers with stored ledgers are re-extracted from them.")
+
+def test_artifacts_follow_the_rows_they_were_built_for(tmp_path):
+    print("Testing that artifacts are stamped with their row and cleared by a fresh regeneration...")
+
+    import regenerate_full_population as regen
+    from src.data_store import get_store
+    from src.artifact_store import get_artifact_store
+
+    store = get_store('csv', root=str(tmp_path))
+    regen.regenerate_population(6, chunk_size=3, store=store, seed=5, resume=False, save_artifacts=True)
+    artifacts = get_artifact_store(store)
+    assert artifacts.root == str(tmp_path / "artifacts")
+
+    # Stamps survive the trip through the stored table
+    rows = store.read()
+    stamps = row_stamps(rows)
+    for (_, row), stamp in zip(rows.iterrows(), stamps):
+        assert row_stamp(row) == stamp
+        assert artifacts.load_signals(row['customer_id'], stamp) is not None
+    assert artifacts.load_signals("ACS001") is not None
+
+    # Another person under the same id gets nothing back
+    other = rows.iloc[0].copy()
+    other['declared_monthly_income'] += 1
+    assert artifacts.load_signals("ACS001", row_stamp(other)) is None
+    assert not artifacts.has("ACS001", row_stamp(other))
+    assert rescore_from_artifacts(["ACS001"], artifacts, stamps=[row_stamp(other)]).empty
+
+    # A fresh regeneration reuses ACS001..n for new people: old artifacts go, even without --artifacts
+    regen.regenerate_population(6, chunk_size=3, store=store, seed=6, resume=False)
+    assert not os.path.exists(artifacts.root)
+    assert artifacts.load_signals("ACS001") is None
+
+    print("✅ Artifacts are only served for the row they were built for.")
+
+def test_seeded_generator_is_reproducible():
+    print("Testing that a seeded generator reproduces profiles, ledgers and silent data...")
+
+    from datetime import datetime
+    end_date = datetime(2026, 6, 30)
+
+    def generate(seed):
+        gen = SyntheticGenerator(rng=np.random.default_rng(seed))
+        out = []
+        for name, emp_type in [("Amit Verma", "Salaried"), ("Rahul Khan", "Gig"), ("Sita Devi", "Self_Employed")]:
+            profile = gen.generate_profile(name, emp_type, 50000)
+            ledger = gen.generate_transactions(profile['customer_id'], emp_type, 50000, name=name, end_date=end_date)
+            out.append((profile, ledger, gen.generate_silent_data(profile['customer_id'], name=name)))
+        return out
+
+    first, second = generate(42), generate(42)
+    for (p1, l1, s1), (p2, l2, s2) in zip(first, second):
+        assert p1 == p2
+        assert l1.equals(l2)
+        assert s1 == s2
+
+    # A different seed gives a different population
+    other = generate(43)
+    assert not all(l1.equals(l2) for (_, l1, _), (_, l2, _) in zip(first, other))
+    assert [p['customer_id'] for p, _, _ in first] != [p['customer_id'] for p, _, _ in other]
+
+    print("✅ Same seed, same profiles, ledgers and silent data.")
+
+def test_regeneration_resumes_byte_identical(tmp_path):
+    print("Testing that an interrupted regeneration resumes to the same bytes...")
+
+    import json
+    import regenerate_full_population as regen
+    from src.data_store import get_store
+
+    base = str(tmp_path)
+    n, chunk_size, seed = 10, 3, 2024
+
+    # Uninterrupted run
+    full_store = get_store('csv', root=os.path.join(base, "full"))
+    os.makedirs(os.path.dirname(full_store.path))
+    regen.regenerate_population(n, chunk_size=chunk_size, store=full_store, seed=seed, resume=False)
+
+    # Same run, killed while scoring chunk 2 (after chunks 0 and 1 were saved)
+    store = get_store('csv', root=os.path.join(base, "resumed"))
+    os.makedirs(os.path.dirname(store.path))
+    score_chunk = regen.score_chunk
+    calls = []
+    def crashing_chunk(*args, **kwargs):
+        calls.append(args[0])
+        if len(calls) == 3:
+            raise KeyboardInterrupt
+        return score_chunk(*args, **kwargs)
+    regen.score_chunk = crashing_chunk
+    try:
+        regen.regenerate_population(n, chunk_size=chunk_size, store=store, seed=seed, resume=False)
+        assert False, "the run should have been interrupted"
+    except KeyboardInterrupt:
+        pass
+    finally:
+        regen.score_chunk = score_chunk
+
+    partial_path, checkpoint_path = store.path + ".partial.csv", store.path + ".checkpoint"
+    with open(checkpoint_path) as f:
+        state = json.load(f)
+    assert state['next_index'] == 2 * chunk_size
+    assert os.path.getsize(partial_path) == state['bytes']
+    assert not store.exists()
+
+    # A half-written chunk after the checkpoint must be cut off on resume
+    with open(partial_path, "a") as f:
+        f.write("ACS007,half a row")
+    regen.regenerate_population(n, chunk_size=chunk_size, store=store, seed=seed, resume=True)
+
+    with open(full_store.path, "rb") as f:
+        expected = f.read()
+    with open(store.path, "rb") as f:
+        assert f.read() == expected
+    assert not os.path.exists(checkpoint_path)
+    assert len(store.read()) == n
+
+    print("✅ Resumed regeneration is byte-identical to an uninterrupted run.")
+
+def test_model_registry_loads_once_and_hot_swaps(tmp_path):
+    print("Testing the model registry (one load per process, hot swap on change)...")
+
+    import joblib
+    from sklearn.linear_model import LinearRegression
+    from src.model_registry import model_registry
+    from src.data_store import atomic_write
+
+    def fit(slope):
+        X = np.arange(14, dtype=float).reshape(2, 7)
+        return LinearRegression().fit(np.vstack([X, X + 1]), [600, 600 + slope, 610, 610 + slope])
+
+    def deploy(model, path):
+        # As model_trainer does: written next to the live file, then renamed into place
+        atomic_write(path, lambda tmp_path: joblib.dump(model, tmp_path), fsync=True)
+
+    path = str(tmp_path / "model_test.pkl")
+    deploy(fit(5), path)
+
+    first, second = MLScorer(model_path=path), MLScorer(model_path=path)
+    assert first.model is second.model
+    assert model_registry.info(path)['load_count'] == 1
+    old_version = first.model_info['version']
+
+    # Same size, rewritten straight away: the next scorer gets the new model
+    deploy(fit(50), path)
+    third = MLScorer(model_path=path)
+    assert third.model is not first.model
+    assert third.model_info['load_count'] == 2
+    assert third.model_info['version'] != old_version
+    assert not np.allclose(third.model.coef_, first.model.coef_)
+    assert MLScorer(model_path=path).model is third.model
+
+    print("✅ Registry loads once per file and serves a replaced model.")
+
+def test_training_data_independent_of_worker_count():
+    print("Testing that sharded training data does not depend on the worker count...")
+
+    from datetime import datetime
+    from src.model_trainer import build_training_data, SHARD_ROUNDS, TRAINING_PROFILES, TRAINING_AS_OF
+
+    # Enough rows for several shards (the last one partial)
+    n_samples = SHARD_ROUNDS * len(TRAINING_PROFILES) + 40
+    X1, y1 = build_training_data(n_samples, seed=7, workers=1)
+    X2, y2 = build_training_data(n_samples, seed=7, workers=2)
+    assert X1.shape == (n_samples, 7) and len(y1) == n_samples
+    assert np.array_equal(X1, X2)
+    assert np.array_equal(y1, y2)
+
+    # And a different seed gives different data
+    X3, _ = build_training_data(n_samples, seed=8, workers=2)
+    assert not np.array_equal(X1, X3)
+
+    # Ledgers end on a fixed date, not today: the seed alone reproduces the data on any day
+    X4, y4 = build_training_data(n_samples, seed=7, workers=1, as_of=datetime.strptime(TRAINING_AS_OF, '%Y-%m-%d'))
+    assert np.array_equal(X1, X4) and np.array_equal(y1, y4)
+    X5, _ = build_training_data(n_samples, seed=7, workers=1, as_of="2026-03-31")
+    assert np.array_equal(X5, build_training_data(n_samples, seed=7, workers=2, as_of="2026-03-31")[0])
+
+    print("✅ Training data is identical for 1 and 2 workers.")
+
+if __name__ == "__main__":
+    import pytest
+    sys.exit(pytest.main([__file__, "-q"]))